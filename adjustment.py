@@ -0,0 +1,126 @@
+"""Split and dividend adjustment of as-traded prices.
+
+The shipped ``data/*.parquet`` files are already adjusted: ``close`` (and
+``open`` / ``high`` / ``low``) is scaled for every later split and
+dividend, so a strategy trading ``close`` earns the total return and sees
+no jump on a split date.  Sources with as-traded prices are adjusted
+once, at ingest, by ``adjust_prices`` (``csv_to_parquet.py
+--adjust-prices``), which gives them the same meaning.
+
+Adjustment follows the usual back-adjustment convention: on an ex-date
+*t*, every earlier price is multiplied by ``1 - dividend / close[t - 1]``
+and divided by the split ratio, so the latest prices are as traded.
+Volumes and dividends are adjusted for splits only.
+
+``adjust_prices`` also stores ``TOTAL_RETURN_COLUMN``, the growth of one
+unit invested at the ticker's first close with dividends reinvested.  On
+adjusted prices that is simply ``close / first close``.
+"""
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from indicators import ticker_runs
+
+# Growth of 1 invested at the first close, dividends reinvested.
+TOTAL_RETURN_COLUMN = "total_return_index"
+
+# Columns adjust_prices reads.  ``dividends`` and ``stock splits`` default
+# to none when absent.
+ADJUSTMENT_INPUTS = ("open", "high", "low", "close")
+
+
+def adjustment_factors(
+    close: np.ndarray, dividends: np.ndarray, splits: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Back-adjustment factors of one ticker's date-sorted, as-traded rows.
+
+    Args:
+        close: As-traded closes.
+        dividends: Cash dividend per share on each ex-date, 0 elsewhere.
+        splits: Split ratio (new shares per old) on each split date, 0
+            elsewhere.
+
+    Returns:
+        ``(price_factor, split_factor)``: multiply prices by the first,
+        volumes by the second and dividends by its inverse.  Both are 1 on
+        the last row.
+    """
+    ratio = np.where(np.nan_to_num(splits) > 0, splits, 1.0)
+    previous = np.concatenate(([np.nan], close[:-1]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # A dividend paid with a split is per new share: yield on close / ratio.
+        kept = 1 - np.nan_to_num(dividends * ratio / previous)
+    # Row i is scaled by the events of every later row.
+    price_event = np.append(kept[1:] / ratio[1:], 1.0)
+    split_event = np.append(ratio[1:], 1.0)
+    return np.cumprod(price_event[::-1])[::-1], np.cumprod(split_event[::-1])[::-1]
+
+
+def add_total_return_index(frame: pd.DataFrame) -> pd.DataFrame:
+    """Store ``TOTAL_RETURN_COLUMN`` from the (adjusted) ``close`` of *frame*.
+
+    Each ticker is divided by its first non-NaN close in date order.
+
+    Returns:
+        The same frame, for chaining.
+    """
+    order, boundaries = ticker_runs(frame)
+    close = frame["close"].to_numpy(dtype=np.float64, na_value=np.nan)[order]
+    index = np.empty(len(frame))
+    for start, stop in zip(boundaries[:-1], boundaries[1:]):
+        run = close[start:stop]
+        valid = np.flatnonzero(~np.isnan(run))
+        index[order[start:stop]] = run / run[valid[0]] if valid.size else np.nan
+    frame[TOTAL_RETURN_COLUMN] = index
+    return frame
+
+
+def adjust_prices(frame: pd.DataFrame) -> pd.DataFrame:
+    """Back-adjust the as-traded prices of *frame* in place.
+
+    Prices are scaled for splits and dividends, ``volume`` and
+    ``dividends`` for splits, each ticker over its own rows in date order.
+    ``TOTAL_RETURN_COLUMN`` is added.  Indicators computed from the
+    as-traded prices are left alone (see ``indicators.recompute_indicators``).
+
+    Do not call this on prices that are already adjusted, such as the
+    shipped data.
+
+    Raises:
+        ValueError: If an ``ADJUSTMENT_INPUTS`` column is missing.
+
+    Returns:
+        The same frame, for chaining.
+    """
+    missing = [col for col in ADJUSTMENT_INPUTS if col not in frame.columns]
+    if missing:
+        raise ValueError(f"Cannot adjust prices without column(s) {missing}.")
+
+    order, boundaries = ticker_runs(frame)
+
+    def column(name: str) -> np.ndarray:
+        if name not in frame.columns:
+            return np.zeros(len(frame))
+        return frame[name].to_numpy(dtype=np.float64, na_value=np.nan)[order]
+
+    close, dividends, splits = column("close"), column("dividends"), column("stock splits")
+    price_factor = np.empty(len(frame))
+    split_factor = np.empty(len(frame))
+    for start, stop in zip(boundaries[:-1], boundaries[1:]):
+        rows = slice(start, stop)
+        price_factor[order[rows]], split_factor[order[rows]] = adjustment_factors(
+            close[rows], dividends[rows], splits[rows]
+        )
+
+    for col in ADJUSTMENT_INPUTS:
+        frame[col] = frame[col].to_numpy(dtype=np.float64, na_value=np.nan) * price_factor
+    if "dividends" in frame.columns:
+        dividends = frame["dividends"].to_numpy(dtype=np.float64, na_value=np.nan)
+        frame["dividends"] = dividends / split_factor
+    if "volume" in frame.columns:
+        volume = frame["volume"].to_numpy(dtype=np.float64, na_value=np.nan) * split_factor
+        frame["volume"] = pd.array(np.round(volume), dtype="Int64")
+    return add_total_return_index(frame)
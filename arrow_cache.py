@@ -0,0 +1,117 @@
+"""Memory-mapped Arrow IPC cache of fully loaded data sources.
+
+``load_all_data(cache_dir=...)`` loads through ``load_cached``: the first
+load writes the combined frame to an uncompressed Arrow file, and later
+loads map it instead of decoding Parquet.
+"""
+
+import hashlib
+import os
+import time
+from typing import Callable, Dict, Optional, Sequence
+
+import pandas as pd
+import pyarrow as pa
+from pyarrow import ipc
+
+from fingerprint import source_signature
+from parquet_io import projection, source_paths
+
+# Directory for the memory-mapped Arrow IPC cache of full loads.  Unset
+# (the default) disables the cache.  Cache files are keyed on the
+# fingerprint of every source file (``fingerprint.file_fingerprint``), so
+# editing, adding or removing a Parquet file rebuilds the cache on the next
+# load.
+DEFAULT_CACHE_DIR = os.environ.get("TRADEREWIND_CACHE_DIR") or None
+_CACHE_SIGNATURE_KEY = b"traderewind.signature"
+
+
+def _cache_path(cache_dir: str, source: str, compact: bool) -> str:
+    """Return the cache file for *source*; one file per source and precision."""
+    key = hashlib.sha256(os.path.abspath(source).encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{key}{'-compact' if compact else ''}.arrow")
+
+
+def _read_cache(path: str, signature: str) -> Optional[pa.Table]:
+    """Memory-map the cache at *path*, or return ``None`` if it is stale."""
+    if not os.path.isfile(path):
+        return None
+    try:
+        reader = ipc.open_file(pa.memory_map(path))
+    except (OSError, pa.ArrowInvalid):
+        return None
+    metadata = reader.schema.metadata or {}
+    if metadata.get(_CACHE_SIGNATURE_KEY) != signature.encode():
+        return None
+    return reader.read_all()
+
+
+def _write_cache(path: str, frame: pd.DataFrame, signature: str) -> None:
+    """Write *frame* to *path* as an uncompressed Arrow IPC file.
+
+    Float columns keep NaN as a value rather than a null, so reading them
+    back needs no validity mask and pandas can use the mapped buffers
+    without copying.  The file is written beside *path* and renamed into
+    place, so a concurrent reader never sees a partial file.
+    """
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    for position, name in enumerate(table.column_names):
+        if frame[name].dtype.kind == "f":
+            table = table.set_column(
+                position, name, pa.array(frame[name].to_numpy(), from_pandas=False)
+            )
+    table = table.replace_schema_metadata(
+        {**(table.schema.metadata or {}), _CACHE_SIGNATURE_KEY: signature.encode()}
+    )
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    partial = f"{path}.{os.getpid()}.tmp"
+    with ipc.new_file(partial, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(partial, path)
+
+
+def load_cached(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    source: str,
+    cache_dir: str,
+    load: Callable[[], pd.DataFrame],
+    columns: Optional[Sequence[str]] = None,
+    timings: Optional[Dict[str, float]] = None,
+    compact: bool = False,
+) -> pd.DataFrame:
+    """Load *source* through the Arrow IPC cache in *cache_dir*.
+
+    The cache always holds every column; a projection only selects which
+    mapped columns are converted.  Columns read from the cache are backed
+    by the mapping and are read-only.
+
+    Args:
+        source: Directory of per-ticker files, or a consolidated file.
+        cache_dir: Directory holding the cache files.
+        load: Reads every column of *source* from Parquet; called when the
+            cache is missing or stale.
+        columns: Columns to return; ``None`` returns every column.
+        timings: Optional dict filled with ``path -> seconds`` per read.
+        compact: Whether *load* returns compact (float32) indicators; each
+            precision has its own cache file.
+
+    Raises:
+        ValueError: If no Parquet files are found.
+    """
+    paths = source_paths(source)
+    if not paths:
+        raise ValueError("No Parquet files found.")
+    signature = source_signature(paths)
+    path = _cache_path(cache_dir, source, compact)
+
+    started = time.perf_counter()
+    table = _read_cache(path, signature)
+    if table is None:
+        frame = load()
+        _write_cache(path, frame, signature)
+        table = _read_cache(path, signature)
+    elif timings is not None:
+        timings[path] = time.perf_counter() - started
+
+    if columns is not None:
+        table = table.select([c for c in projection(columns) if c in table.column_names])
+    return table.to_pandas(split_blocks=True)
@@ -7,9 +7,13 @@ Adding a new strategy requires **no changes here** - register it in
 ``strategies/__init__.py`` instead.
 """
 
-from data_loading import load_all_data
-from strategies import run_strategy
-from metrics import compute_metrics
+import copy
+import threading
+from collections import OrderedDict
+
+from data_loading import StockDataset, shared_dataset
+from strategies import REQUIRED_COLUMNS, run_strategy
+from metrics import METRIC_COLUMNS, compute_metrics
 from stock_history import get_stock_history
 from charts import strategy_dashboard
 
@@ -18,20 +22,60 @@ class InvalidTickerError(Exception):
     """Raised when a requested ticker is not found in the dataset."""
 
 
-# Load all parquet data once at module import (same pattern as original).
-df = load_all_data()
+# Columns a backtest needs: what the strategies read plus what the metrics
+# read.  Everything else in the Parquet files is left undecoded.
+BACKTEST_COLUMNS = tuple(dict.fromkeys(REQUIRED_COLUMNS + METRIC_COLUMNS))
+
+# Backtests whose results main_backtest keeps, keyed on the dataset
+# fingerprint and the arguments, least recently used first.
+RESULT_CACHE_SIZE = 64
+_RESULTS: "OrderedDict[tuple, tuple]" = OrderedDict()
+_RESULTS_LOCK = threading.Lock()
+
+
+def get_dataset() -> StockDataset:
+    """Return the dataset backtests run on: ``data_loading.shared_dataset()``.
+
+    It is created on the first backtest (not at import) and shared with
+    every page and session in the process.  It is a lazy handle over
+    ``./data``, so each backtest reads only the requested ticker's file.
+    """
+    return shared_dataset()
+
 
+def preload(materialize: bool = False) -> StockDataset:
+    """Create the dataset now rather than on the first backtest.
 
-def main_backtest(
+    Args:
+        materialize: Also load every ticker into memory, so later backtests
+            slice the combined frame instead of reading files.
+
+    Returns:
+        The process-wide dataset.
+    """
+    return shared_dataset(materialize)
+
+
+def main_backtest(  # pylint: disable=too-many-arguments
     stock: str,
     start_date,
     end_date,
     strategy: str,
     initial_capital: float,
+    *,
+    columns=BACKTEST_COLUMNS,
     **strategy_kwargs,
 ):
     """Run a full backtest and return results, summary metrics, and a chart.
 
+    Results are cached under the dataset's fingerprint
+    (``StockDataset.fingerprint``) and the arguments, so repeating a
+    backtest skips the run and any change to the data files runs it afresh.
+    A result is stored only if the fingerprint is unchanged after the run,
+    so it always matches the data it was keyed on.  Every call returns its
+    own copies.  Datasets without a fingerprint, and unhashable arguments,
+    are never cached.
+
     Args:
         stock: Ticker symbol or company name (e.g. ``"AAPL"``).
         start_date: ISO-format date string or ``None`` (uses earliest date).
@@ -39,6 +83,9 @@ def main_backtest(
         strategy: Strategy name, e.g. ``"Buy and Hold"`` or
             ``"Moving Average Crossover"`` (case-insensitive).
         initial_capital: Starting cash in dollars.
+        columns: Dataset columns to load for the backtest. Defaults to
+            ``BACKTEST_COLUMNS``; pass extra names to carry them into
+            ``results_df``, or ``None`` to load every column.
         **strategy_kwargs: Extra keyword arguments forwarded to the strategy
             (e.g. ``lookback_days``, ``trade_proportion`` for momentum).
 
@@ -49,11 +96,55 @@ def main_backtest(
         InvalidTickerError: If no data is found for *stock*.
         ValueError: Propagated from strategy or date validation.
     """
-    if df is None or df.empty:
+    dataset = get_dataset()
+    if dataset is None or dataset.empty:
         raise InvalidTickerError(f"No data found for ticker '{stock}'.")
 
-    prices = get_stock_history(stock, start_date, end_date, df)
-    results = run_strategy(prices, strategy, initial_capital, df, **strategy_kwargs)
+    fingerprint = getattr(dataset, "fingerprint", lambda: None)()
+    key = (
+        stock, start_date, end_date, strategy, initial_capital,
+        None if columns is None else tuple(columns),
+        tuple(sorted(strategy_kwargs.items())),
+    )
+    try:
+        hash(key)
+    except TypeError:
+        fingerprint = None
+    if fingerprint is None:
+        return _run_backtest(dataset, *key)
+
+    with _RESULTS_LOCK:
+        outputs = _RESULTS.get((fingerprint, key))
+        if outputs is not None:
+            _RESULTS.move_to_end((fingerprint, key))
+    if outputs is None:
+        outputs = _run_backtest(dataset, *key)
+        # Data that changed during the run may not match the fingerprint.
+        if dataset.fingerprint() == fingerprint:
+            with _RESULTS_LOCK:
+                _RESULTS[(fingerprint, key)] = outputs
+                while len(_RESULTS) > RESULT_CACHE_SIZE:
+                    _RESULTS.popitem(last=False)
+    return _copied(outputs)
+
+
+def _copied(outputs: tuple) -> tuple:
+    """Copy a cached result, so callers cannot change it for later hits."""
+    frame, metrics, figure, table = outputs
+    return (
+        frame.copy(),
+        copy.deepcopy(metrics),
+        copy.deepcopy(figure),
+        None if table is None else table.copy(),
+    )
+
+
+def _run_backtest(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    dataset, stock, start_date, end_date, strategy, initial_capital, columns, kwargs_items
+):
+    """Run one backtest of main_backtest on *dataset*."""
+    prices = get_stock_history(stock, start_date, end_date, dataset, columns=columns)
+    results = run_strategy(prices, strategy, initial_capital, dataset, **dict(kwargs_items))
     summary = compute_metrics(results, initial_capital)
     fig, metrics_df = strategy_dashboard(results, strategy, summary, initial_capital)
 
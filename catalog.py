@@ -0,0 +1,212 @@
+"""Ticker catalog of a stock data source.
+
+The catalog is a small JSON file beside the data (``catalog_path``) with
+one entry per ticker: company name, sector, first / last date and row
+count.  Ticker pickers and the stocks info page read it in milliseconds
+instead of loading prices.
+"""
+
+import json
+import os
+from typing import Dict, Optional, Sequence, Tuple
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from fingerprint import source_signature, ticker_fingerprints
+from parquet_io import (
+    DATA_DIR,
+    concat_frames,
+    read_consolidated,
+    read_parquet_files,
+    source_paths,
+    ticker_delta_paths,
+)
+
+# Ticker catalog written beside the data (see write_catalog): one entry per
+# ticker with its company name, sector, first / last date and row count.
+CATALOG_NAME = "_catalog.json"
+CATALOG_LABELS = ("company_name", "sector")
+
+
+def catalog_path(source: str = DATA_DIR) -> str:
+    """Return where the catalog of *source* lives.
+
+    ``<dir>/_catalog.json`` for a directory of per-ticker files, and
+    ``<stem>_catalog.json`` beside a consolidated file.
+    """
+    if os.path.isdir(source):
+        return os.path.join(source, CATALOG_NAME)
+    return f"{os.path.splitext(source)[0]}{CATALOG_NAME}"
+
+
+def build_catalog(
+    source: str = DATA_DIR, tickers: Optional[Sequence[str]] = None
+) -> pd.DataFrame:
+    """Summarise the tickers in *source*, reading only the columns needed.
+
+    Args:
+        source: Directory of per-ticker files, or a consolidated file.
+        tickers: Tickers to summarise; ``None`` summarises every ticker.
+
+    Returns:
+        DataFrame indexed by ticker (sorted) with ``company_name``,
+        ``sector`` (``None`` where the data has no such column),
+        ``first_date`` / ``last_date`` (UTC) and ``rows``.
+
+    Raises:
+        ValueError: If no Parquet files are found.
+    """
+    paths = source_paths(source)
+    if not paths:
+        raise ValueError("No Parquet files found.")
+    present = pq.read_schema(paths[0]).names
+    labels = [col for col in CATALOG_LABELS if col in present]
+    columns = ["ticker", "date", *labels]
+    if os.path.isfile(source):
+        frame = read_consolidated(source, tickers, columns)
+    else:
+        if tickers is not None:
+            paths = [
+                path
+                for ticker in tickers
+                for path in (
+                    os.path.join(source, f"{ticker}.parquet"),
+                    *ticker_delta_paths(source, ticker),
+                )
+            ]
+        frame = concat_frames(read_parquet_files(paths, columns))
+    grouped = frame.groupby("ticker", observed=True, sort=True)
+    catalog = pd.DataFrame({col: grouped[col].first().astype(object) for col in labels})
+    for col in CATALOG_LABELS:
+        if col not in catalog.columns:
+            catalog[col] = None
+    catalog["first_date"] = grouped["date"].min()
+    catalog["last_date"] = grouped["date"].max()
+    catalog["rows"] = grouped.size()
+    catalog.index = catalog.index.astype(str)
+    catalog.index.name = "ticker"
+    return catalog[[*CATALOG_LABELS, "first_date", "last_date", "rows"]]
+
+
+def _stored_catalog(source: str) -> dict:
+    """Return the contents of the catalog file of *source*, or ``{}``."""
+    try:
+        with open(catalog_path(source), encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return {}
+
+
+def _catalog_entries(source: str) -> Tuple[str, Dict[str, dict]]:
+    """Return the signature of *source* and a current catalog entry per ticker.
+
+    Each entry records its ticker's fingerprint (``ticker_fingerprints``),
+    so entries of unchanged tickers are taken from the catalog file and
+    only the tickers whose files changed are read.
+
+    Raises:
+        ValueError: If no Parquet files are found.
+    """
+    signature = source_signature(source_paths(source))
+    fingerprints = ticker_fingerprints(source)
+    if not fingerprints:
+        raise ValueError("No Parquet files found.")
+    previous = _stored_catalog(source).get("tickers", {})
+    entries = {
+        ticker: previous[ticker]
+        for ticker, fingerprint in fingerprints.items()
+        if previous.get(ticker, {}).get("fingerprint") == fingerprint
+    }
+    changed = [ticker for ticker in fingerprints if ticker not in entries]
+    if changed:
+        for ticker, row in build_catalog(source, changed).iterrows():
+            entries[ticker] = {
+                **{col: row[col] for col in CATALOG_LABELS},
+                "first_date": row["first_date"].isoformat(),
+                "last_date": row["last_date"].isoformat(),
+                "rows": int(row["rows"]),
+                "fingerprint": fingerprints.get(ticker),
+            }
+    return signature, dict(sorted(entries.items()))
+
+
+def _catalog_frame(entries: Dict[str, dict]) -> pd.DataFrame:
+    """Turn stored catalog entries into the ``build_catalog`` frame."""
+    columns = [*CATALOG_LABELS, "first_date", "last_date", "rows"]
+    catalog = pd.DataFrame.from_dict(entries, orient="index").reindex(columns=columns)
+    catalog.index.name = "ticker"
+    for col in ("first_date", "last_date"):
+        catalog[col] = pd.to_datetime(catalog[col], utc=True, format="ISO8601")
+    return catalog
+
+
+def write_catalog(source: str = DATA_DIR) -> str:
+    """Update the catalog of *source* at ``catalog_path(source)``.
+
+    The catalog records the signature of the files it was built from, so
+    ``read_catalog`` ignores it once they change.  Entries of tickers whose
+    files have not changed since the last catalog are kept, so after an
+    incremental conversion only the converted tickers are read.
+
+    Returns:
+        Path of the catalog file.
+    """
+    return _store_catalog(source, *_catalog_entries(source))
+
+
+def _store_catalog(source: str, signature: str, entries: Dict[str, dict]) -> str:
+    """Write *entries*, built from files with *signature*, as the catalog of *source*."""
+    path = catalog_path(source)
+    partial = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(partial, "w", encoding="utf-8") as handle:
+            json.dump({"signature": signature, "tickers": entries}, handle, indent=1)
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    return path
+
+
+def read_catalog(source: str = DATA_DIR) -> Optional[pd.DataFrame]:
+    """Read the catalog of *source*, or return ``None`` if missing or stale.
+
+    Only the catalog file is read, plus a ``stat`` of each source file to
+    check it is current; no price data is touched.
+    """
+    paths = source_paths(source)
+    stored = _stored_catalog(source)
+    if not paths or not stored or stored.get("signature") != source_signature(paths):
+        return None
+    return _catalog_frame(stored["tickers"])
+
+
+# Catalogs built by load_catalog when no current file exists, keyed on the
+# source and its signature.
+_CATALOGS: Dict[Tuple[str, str], pd.DataFrame] = {}
+
+
+def load_catalog(source: str = DATA_DIR) -> pd.DataFrame:
+    """Return the ticker catalog of *source* (see ``build_catalog``).
+
+    Reads the catalog file when it is current, which takes milliseconds.
+    Otherwise the catalog is updated from the data as in ``write_catalog``
+    and written for later processes; if that fails (a read-only source),
+    it is kept in memory for this process and source signature instead.
+
+    Raises:
+        ValueError: If no Parquet files are found.
+    """
+    catalog = read_catalog(source)
+    if catalog is not None:
+        return catalog
+    key = (os.path.abspath(source), source_signature(source_paths(source)))
+    if key not in _CATALOGS:
+        signature, entries = _catalog_entries(source)
+        try:
+            _store_catalog(source, signature, entries)
+        except OSError:
+            pass
+        _CATALOGS[key] = _catalog_frame(entries)
+    return _CATALOGS[key]
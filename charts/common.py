@@ -210,10 +210,14 @@ def prepare_plot_df(raw_df: pd.DataFrame) -> pd.DataFrame:
         raw_df: Raw strategy results DataFrame.
 
     Returns:
-        Clean copy ready for charting.
+        Frame ready for charting.  Only ``date`` is new; the other columns
+        share their data with *raw_df*, so treat it as read-only.
     """
-    plot_df = raw_df.copy()
-    plot_df["date"] = pd.to_datetime(plot_df["date"]).dt.tz_localize(None)
-    plot_df = plot_df.dropna(subset=["daily_value", "daily_returns"])
-    plot_df = plot_df.reset_index(drop=True)
+    complete = raw_df[["daily_value", "daily_returns"]].notna().all(axis=1)
+    plot_df = (raw_df if complete.all() else raw_df[complete]).copy(deep=False)
+    dates = plot_df["date"]
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates)
+    plot_df["date"] = dates.dt.tz_localize(None)
+    plot_df.index = pd.RangeIndex(len(plot_df))
     return plot_df
@@ -3,46 +3,731 @@
 Usage::
 
     python csv_to_parquet.py <input_dir> <output_dir> [--pattern "*.csv"]
+
+    # Only reconvert CSVs that changed since the last run (see MANIFEST_NAME)
+    python csv_to_parquet.py <input_dir> <output_dir> --incremental
+
+    # Convert on 8 worker processes
+    python csv_to_parquet.py <input_dir> <output_dir> --workers 8
+
+    # Stream CSVs larger than memory, writing one Parquet file per ticker
+    python csv_to_parquet.py <input_dir> <output_dir> --stream --split-by-ticker
+
+    # One consolidated file sorted by (ticker, date), one row group per ticker
+    python csv_to_parquet.py <input_dir> <output_file> --consolidate
+
+    # Recompute the indicator columns from OHLCV while converting
+    python csv_to_parquet.py <input_dir> <output_dir> --recompute-indicators
+
+    # Sources with as-traded prices: adjust for splits and dividends, add
+    # the total-return index and recompute the indicators
+    python csv_to_parquet.py <input_dir> <output_dir> --adjust-prices
+
+    # Only diff the sources' indicator columns against a recomputation
+    python csv_to_parquet.py data --pattern "*.parquet" --verify-indicators
+
+Every run ends by writing the ticker catalog of the output (see
+``catalog.write_catalog``), unless ``--no-catalog`` is given or the
+output has no Parquet files or no ``ticker`` column.
 """
 
 from pathlib import Path
 import argparse
+import hashlib
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from adjustment import TOTAL_RETURN_COLUMN, adjust_prices
+from catalog import write_catalog
+from data_loading import FILE_STATS_KEY
+from indicators import (
+    DEFAULT_ATOL,
+    DEFAULT_RTOL,
+    format_verification,
+    recompute_indicators,
+    verify_indicators,
+)
+from parquet_io import (
+    CATEGORICAL_COLUMNS,
+    INDICATOR_COLUMNS,
+    compact_frame,
+    concat_frames,
+    to_utc_dates,
+)
+
+# Compression for the consolidated layout.  zstd decodes about as fast as
+# snappy while producing noticeably smaller files.
+DEFAULT_COMPRESSION = "zstd"
+DEFAULT_COMPRESSION_LEVEL = 6
+
+# Bytes of CSV parsed per block by stream_csv_file.  Arrow reads a few dozen
+# blocks ahead, so peak memory is roughly 40 blocks whatever the file size
+# (about 45 MB at 1 MiB on a 440 MB file; 170 MB at 4 MiB).
+DEFAULT_BLOCK_SIZE = 1 << 20
+
+# Rows stream_csv_file(split_by_ticker=True) holds in memory, across all
+# tickers, before spilling the largest ticker's rows to a part file (about
+# 120 MB of the shipped 30-column schema), and the rows per row group of
+# each ticker's file (a shipped ticker's whole history fits in one).
+DEFAULT_BUFFER_ROWS = 1 << 19
+DEFAULT_ROW_GROUP_ROWS = 1 << 16
+
+PRICE_COLUMNS = ("open", "high", "low", "close", "dividends", "stock splits")
+
+# Types of the columns documented in the README.  Conversion casts every
+# one of them that is present (see apply_schema); other columns pass
+# through as pandas infers them.
+STOCK_SCHEMA = pa.schema(
+    [pa.field("date", pa.timestamp("ns", tz="UTC"))]
+    + [pa.field(col, pa.float64()) for col in PRICE_COLUMNS]
+    + [pa.field("volume", pa.int64())]
+    + [pa.field(col, pa.string()) for col in CATEGORICAL_COLUMNS]
+    + [pa.field(col, pa.float64()) for col in INDICATOR_COLUMNS]
+    + [pa.field(TOTAL_RETURN_COLUMN, pa.float64())]
+)
+
+# Version of the per-ticker Parquet layout written by convert_csv_file.
+# Bump it whenever the output changes so incremental runs rewrite every file.
+SCHEMA_VERSION = 2
+
+# Written to the output folder by convert_folder: for each source file, the
+# size, mtime and sha256 it had when converted and the schema it was
+# converted with.
+MANIFEST_NAME = "_manifest.json"
+
+
+def categorize(frame: pd.DataFrame) -> pd.DataFrame:
+    """Store ``CATEGORICAL_COLUMNS`` as categoricals (Parquet dictionaries).
+
+    The pandas dtype is recorded in the file's metadata, so readers get the
+    categorical back without converting.
+
+    Returns:
+        The same frame, for chaining.
+    """
+    for col in CATEGORICAL_COLUMNS:
+        if col in frame.columns:
+            frame[col] = frame[col].astype("category")
+    return frame
+
+
+def _cast_column(values: pd.Series, field: pa.Field) -> pd.Series:
+    """Cast *values* to *field*'s type; entries that do not fit become null."""
+    if pa.types.is_timestamp(field.type):
+        return to_utc_dates(values, errors="coerce")
+    if pa.types.is_string(field.type):
+        return values.astype(object).where(values.notna(), None)
+    numbers = pd.to_numeric(values, errors="coerce")
+    if pa.types.is_integer(field.type):
+        numbers = numbers.where(numbers % 1 == 0)
+        return numbers.astype("Int64")
+    return numbers.astype(np.float64)
+
+
+def apply_schema(frame: pd.DataFrame, source, errors: str = "strict") -> pd.DataFrame:
+    """Cast the ``STOCK_SCHEMA`` columns of *frame* in place.
 
+    Typed columns keep a stray string from turning a whole column into
+    Python objects, and typed dates give the footer statistics a
+    chronological order.
 
-def convert_csv_file(csv_path: Path, out_dir: Path) -> Path:
+    Args:
+        frame: Frame read from *source*.
+        source: Where the frame came from, for error messages.
+        errors: ``"strict"`` rejects a value that does not fit its column's
+            type; ``"coerce"`` stores it as null instead.
+
+    Raises:
+        ValueError: In strict mode, naming the first offending column.
+
+    Returns:
+        The same frame, for chaining.
+    """
+    if errors not in ("strict", "coerce"):
+        raise ValueError(f"errors must be 'strict' or 'coerce', not {errors!r}.")
+    for field in STOCK_SCHEMA:
+        if field.name not in frame.columns:
+            continue
+        raw = frame[field.name]
+        typed = _cast_column(raw, field)
+        rejected = typed.isna().to_numpy() & raw.notna().to_numpy()
+        if errors == "strict" and rejected.any():
+            raise ValueError(
+                f"{source}: {int(rejected.sum())} value(s) in '{field.name}' are not "
+                f"{field.type}, e.g. {raw[rejected].iloc[0]!r}."
+            )
+        frame[field.name] = typed
+    return frame
+
+
+def _file_stats(frame: pd.DataFrame) -> dict:
+    """Row count, date range and per-column null counts for FILE_STATS_KEY."""
+    dates = frame["date"].dropna() if "date" in frame.columns else pd.Series([], dtype=object)
+    return {
+        "rows": len(frame),
+        "date_min": dates.min().isoformat() if len(dates) else None,
+        "date_max": dates.max().isoformat() if len(dates) else None,
+        "null_counts": {col: int(count) for col, count in frame.isna().sum().items()},
+        "schema_version": SCHEMA_VERSION,
+    }
+
+
+def write_with_stats(
+    frame: pd.DataFrame, path: Path, row_group_size: Optional[int] = None
+) -> None:
+    """Write *frame* to *path* with its ``_file_stats`` in the footer.
+
+    The file is written beside *path* and renamed, so a failed conversion
+    never leaves a truncated file that an incremental run would trust.
+    *row_group_size* caps the rows per row group (``None``: Arrow's default).
+    """
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        FILE_STATS_KEY: json.dumps(_file_stats(frame)).encode(),
+    })
+    partial = path.with_name(path.name + ".tmp")
+    pq.write_table(table, partial, row_group_size=row_group_size)
+    os.replace(partial, path)
+
+
+def convert_csv_file(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    csv_path: Path,
+    out_dir: Path,
+    compact: bool = False,
+    errors: str = "strict",
+    indicators: bool = False,
+    adjust: bool = False,
+) -> Path:
     """Convert a single CSV file to Parquet in out_dir.
 
+    Columns are cast to ``STOCK_SCHEMA`` (dates as UTC timestamps), and the
+    row count, date range and null counts are stored in the file's metadata
+    (see ``data_loading.read_file_stats``).
+
     Args:
         csv_path: Path to the source CSV file.
         out_dir: Directory where the Parquet file will be written.
+        compact: Store indicator columns as float32
+            (see ``parquet_io.INDICATOR_COLUMNS``).
+        errors: ``"strict"`` (default) rejects values that do not fit the
+            schema; ``"coerce"`` stores them as null.
+        indicators: Recompute the indicator columns from OHLCV instead of
+            keeping the CSV's (see ``indicators.compute_indicators``).
+        adjust: The CSV holds as-traded prices: adjust them for splits and
+            dividends and add the total-return index, before any indicator
+            recomputation (see ``adjustment.adjust_prices``).
+
+    Raises:
+        ValueError: In strict mode, if a value does not fit the schema, or
+            with *indicators* or *adjust*, if a price column is missing.
 
     Returns:
         Path to the newly created Parquet file.
     """
-    frame = pd.read_csv(csv_path)
+    frame = apply_schema(pd.read_csv(csv_path), csv_path, errors)
+    if adjust:
+        adjust_prices(frame)
+    if indicators:
+        recompute_indicators(frame)
+    categorize(frame)
+    if compact:
+        compact_frame(frame)
     parquet_path = out_dir / (csv_path.stem + ".parquet")
-    frame.to_parquet(parquet_path, index=False)
+    write_with_stats(frame, parquet_path)
     return parquet_path
 
 
-def convert_folder(
+def _file_sha256(path: Path) -> str:
+    """Return the sha256 of *path*, read in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_manifest(out_dir: Path) -> Dict[str, dict]:
+    """Return the manifest in *out_dir*, or an empty one if absent or unreadable."""
+    try:
+        with open(out_dir / MANIFEST_NAME, encoding="utf-8") as handle:
+            manifest = json.load(handle)
+    except (OSError, ValueError):
+        return {}
+    return manifest.get("files", {}) if isinstance(manifest, dict) else {}
+
+
+def _write_manifest(out_dir: Path, entries: Dict[str, dict]) -> None:
+    """Write the manifest atomically (a crash leaves the previous one)."""
+    partial = out_dir / f"{MANIFEST_NAME}.tmp"
+    with open(partial, "w", encoding="utf-8") as handle:
+        json.dump({"files": entries}, handle, indent=1, sort_keys=True)
+    os.replace(partial, out_dir / MANIFEST_NAME)
+
+
+def _is_current(entry: Optional[dict], source: dict, out_dir: Path) -> bool:
+    """True when *entry* says the source was converted as it is now.
+
+    Size and mtime settle most files without reading them; a file that was
+    only touched is recognised by its content hash.
+    """
+    if not entry or not (out_dir / entry.get("output", "")).is_file():
+        return False
+    for key in ("schema_version", "compact", "errors", "indicators", "adjust", "size"):
+        if entry.get(key) != source[key]:
+            return False
+    return entry.get("mtime_ns") == source["mtime_ns"] or entry.get("sha256") == source["sha256"]
+
+
+def _convert_task(task) -> tuple:
+    """Convert one source for convert_folder; runs in a worker process.
+
+    Args:
+        task: ``(csv_path, out_dir, compact, errors, indicators, adjust,
+            sha256)``; *sha256* is ``None`` when the source has not been
+            hashed yet.
+
+    Returns:
+        ``(parquet_name, sha256, error, seconds)``.  On failure
+        *parquet_name* is ``None`` and *error* holds the message: errors are
+        returned rather than raised so one bad file cannot hide the others.
+    """
+    csv_path, out_dir, compact, errors, indicators, adjust, sha256 = task
+    started = time.perf_counter()
+    try:
+        sha256 = sha256 or _file_sha256(csv_path)
+        parquet_path = convert_csv_file(
+            csv_path, out_dir, compact, errors, indicators, adjust
+        )
+    except Exception as exc:  # pylint: disable=broad-exception-caught
+        return None, sha256, f"{type(exc).__name__}: {exc}", time.perf_counter() - started
+    return parquet_path.name, sha256, None, time.perf_counter() - started
+
+
+def convert_folder(  # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
     in_dir: Path,
     out_dir: Path,
     pattern: str = "*.csv",
-) -> None:
+    compact: bool = False,
+    incremental: bool = False,
+    workers: Optional[int] = 1,
+    errors: str = "strict",
+    indicators: bool = False,
+    adjust: bool = False,
+) -> Dict[str, object]:
     """Convert all CSV files in in_dir matching pattern into out_dir.
 
+    Every run records each source in ``MANIFEST_NAME`` in out_dir.  With
+    *incremental*, sources whose size, mtime (or content hash), schema
+    version, precision, errors mode, indicator recomputation and price
+    adjustment match their manifest entry, and whose Parquet file still
+    exists, are skipped.  A file that fails to convert is reported and left
+    out of the manifest, so the next run retries it.
+
+    CSV parsing is CPU-bound, so with *workers* > 1 the conversions run on
+    a process pool.  Results are gathered in input order, so the output,
+    the report and the manifest do not depend on scheduling.
+
     Args:
         in_dir: Directory containing source CSV files.
         out_dir: Directory to write Parquet files (created if missing).
         pattern: Glob pattern for selecting files (default: ``"*.csv"``).
+        compact: Store indicator columns as float32.
+        incremental: Skip sources unchanged since they were last converted.
+        workers: Worker processes; ``1`` (default) converts in-process and
+            ``None`` uses one per CPU.
+        errors: ``"strict"`` or ``"coerce"`` (see ``convert_csv_file``).
+        indicators: Recompute the indicator columns (see ``convert_csv_file``).
+        adjust: Adjust as-traded prices (see ``convert_csv_file``).
+
+    Returns:
+        Report dict with ``converted`` and ``skipped`` (lists of source
+        names), ``failed`` (source name -> error message), ``timings``
+        (source name -> seconds spent on it), ``workers`` and ``seconds``
+        (whole run).
     """
+    started = time.perf_counter()
     out_dir.mkdir(parents=True, exist_ok=True)
+    previous = _read_manifest(out_dir)
+    entries: Dict[str, dict] = {}
+    pending = []
+    report: Dict[str, object] = {
+        "converted": [], "skipped": [], "failed": {}, "timings": {},
+    }
+
     for csv_path in sorted(in_dir.glob(pattern)):
-        if csv_path.is_file():
-            parquet_path = convert_csv_file(csv_path, out_dir)
-            print(f"Wrote {parquet_path}")
+        if not csv_path.is_file():
+            continue
+        file_started = time.perf_counter()
+        stat = csv_path.stat()
+        source = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": None,
+            "schema_version": SCHEMA_VERSION,
+            "compact": compact,
+            "errors": errors,
+            "indicators": indicators,
+            "adjust": adjust,
+        }
+        entry = previous.get(csv_path.name)
+        if incremental and entry and entry.get("mtime_ns") != stat.st_mtime_ns:
+            source["sha256"] = _file_sha256(csv_path)
+        if incremental and _is_current(entry, source, out_dir):
+            entries[csv_path.name] = {**entry, "mtime_ns": stat.st_mtime_ns}
+            report["skipped"].append(csv_path.name)
+            report["timings"][csv_path.name] = time.perf_counter() - file_started
+        else:
+            pending.append((csv_path, source))
+
+    tasks = [
+        (path, out_dir, compact, errors, indicators, adjust, source["sha256"])
+        for path, source in pending
+    ]
+    workers = min(workers or os.cpu_count() or 1, max(len(tasks), 1))
+    report["workers"] = workers
+    with ProcessPoolExecutor(workers) if workers > 1 else nullcontext() as pool:
+        if pool is None:
+            results = map(_convert_task, tasks)
+        else:
+            results = pool.map(_convert_task, tasks, chunksize=max(1, len(tasks) // (4 * workers)))
+        for (csv_path, source), (parquet_name, sha256, error, seconds) in zip(pending, results):
+            report["timings"][csv_path.name] = seconds
+            if error is not None:
+                report["failed"][csv_path.name] = error
+                continue
+            entries[csv_path.name] = {**source, "sha256": sha256, "output": parquet_name}
+            report["converted"].append(csv_path.name)
+            print(f"Wrote {out_dir / parquet_name}")
+
+    _write_manifest(out_dir, entries)
+    report["seconds"] = time.perf_counter() - started
+    return report
+
+
+def format_report(report: Dict[str, object]) -> str:
+    """Summarise a convert_folder report: counts, total time, failures."""
+    lines = [
+        f"Converted {len(report['converted'])}, skipped {len(report['skipped'])}, "
+        f"failed {len(report['failed'])} in {report['seconds']:.2f}s "
+        f"with {report.get('workers', 1)} worker(s)"
+    ]
+    timings = report["timings"]
+    slowest = sorted(report["converted"], key=lambda name: -timings[name])[:5]
+    lines += [f"  {timings[name] * 1000:7.1f} ms  {name}" for name in slowest]
+    lines += [f"  FAILED {name}: {error}" for name, error in report["failed"].items()]
+    return "\n".join(lines)
+
+
+def _stream_column_types(compact: bool) -> Dict[str, pa.DataType]:
+    """``STOCK_SCHEMA`` as column types for the streaming CSV reader.
+
+    Columns absent from the CSV are ignored by the reader.
+    """
+    types = {field.name: field.type for field in STOCK_SCHEMA}
+    if compact:
+        types.update({col: pa.float32() for col in INDICATOR_COLUMNS})
+    return types
+
+
+def _table_stats(table: pa.Table, stats: Optional[dict] = None) -> dict:
+    """Fold *table* into *stats*, the ``_file_stats`` of the rows seen so far."""
+    stats = stats or {
+        "rows": 0,
+        "date_min": None,
+        "date_max": None,
+        "null_counts": dict.fromkeys(table.column_names, 0),
+        "schema_version": SCHEMA_VERSION,
+    }
+    stats["rows"] += table.num_rows
+    for name, column in zip(table.column_names, table.columns):
+        stats["null_counts"][name] += column.null_count
+    if "date" in table.column_names and table.num_rows:
+        bounds = pc.min_max(table.column("date")).as_py()  # pylint: disable=no-member
+        if bounds["min"] is not None:
+            low, high = bounds["min"].isoformat(), bounds["max"].isoformat()
+            # Same offset (UTC) throughout, so ISO strings compare in time order.
+            stats["date_min"] = min(filter(None, (stats["date_min"], low)))
+            stats["date_max"] = max(filter(None, (stats["date_max"], high)))
+    return stats
+
+
+def _split_by_ticker(table: pa.Table) -> Dict[str, pa.Table]:
+    """Split *table* into one table per ticker, keeping row order within each."""
+    table = table.sort_by([("ticker", "ascending")])
+    tickers = table.column("ticker").to_numpy(zero_copy_only=False)
+    if tickers.size == 0:
+        return {}
+    bounds = [0, *(np.flatnonzero(tickers[1:] != tickers[:-1]) + 1), len(tickers)]
+    return {
+        tickers[start]: table.slice(start, stop - start)
+        for start, stop in zip(bounds[:-1], bounds[1:])
+    }
+
+
+def stream_csv_file(  # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+    csv_path: Path,
+    out_dir: Path,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    split_by_ticker: bool = False,
+    compact: bool = False,
+    buffer_rows: int = DEFAULT_BUFFER_ROWS,
+    row_group_rows: int = DEFAULT_ROW_GROUP_ROWS,
+) -> List[Path]:
+    """Convert a CSV of any size to Parquet, one block at a time.
+
+    Arrow's streaming CSV reader parses *block_size* bytes at a time, so
+    peak memory is bounded by the block size (and *buffer_rows*) rather
+    than the file size.  ``STOCK_SCHEMA`` columns are typed up front, so a
+    value that does not fit raises as in strict ``convert_csv_file``; other
+    columns are typed by the first block.
+
+    Without splitting, each block is written straight out as a row group
+    through one ``ParquetWriter``.  When splitting, a date-ordered dump
+    holds a few rows of every ticker per block, so rows are buffered per
+    ticker instead: past *buffer_rows* in total, the largest buffer is
+    spilled to a closed part file, and each ticker's file is written at the
+    end from its parts and buffer in row groups of *row_group_rows*.  Only
+    one file is open for writing at a time, however many tickers there are.
+
+    Each output carries the same file statistics as ``convert_csv_file``,
+    and is written beside its target and renamed once every output is
+    complete.  Partial and part files are removed, also on failure.
+
+    Args:
+        csv_path: Path to the source CSV file.
+        out_dir: Directory where the Parquet file(s) will be written.
+        block_size: Bytes of CSV parsed per block.
+        split_by_ticker: Write ``<TICKER>.parquet`` per ticker (the
+            ``data/`` layout) instead of one ``<stem>.parquet``.
+        compact: Store indicator columns as float32.
+        buffer_rows: Rows buffered across tickers before spilling.
+        row_group_rows: Rows per row group of each ticker's file (the
+            last may be smaller).
+
+    Raises:
+        ValueError: If split_by_ticker is set and the CSV has no ticker column.
+        pyarrow.ArrowInvalid: If a value does not fit its column's type.
+
+    Returns:
+        Paths of the Parquet files written, sorted.
+    """
+    # pylint: disable=too-many-statements
+    reader = pa_csv.open_csv(
+        csv_path,
+        read_options=pa_csv.ReadOptions(block_size=block_size),
+        convert_options=pa_csv.ConvertOptions(
+            column_types=_stream_column_types(compact)
+        ),
+    )
+    if split_by_ticker and "ticker" not in reader.schema.names:
+        raise ValueError(f"{csv_path} has no 'ticker' column to split by.")
+    dictionary_columns = [c for c in CATEGORICAL_COLUMNS if c in reader.schema.names]
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stats: Dict[str, dict] = {}
+    buffers: Dict[str, List[pa.Table]] = {}
+    buffered: Dict[str, int] = {}
+    parts: Dict[str, List[Path]] = {}
+    partials: Dict[Path, Path] = {}
+    temporary: List[Path] = []
+
+    def writer_for(path: Path) -> pq.ParquetWriter:
+        temporary.append(path)
+        return pq.ParquetWriter(path, reader.schema, use_dictionary=dictionary_columns)
+
+    def spill(name: str) -> None:
+        part = out_dir / f"{name}.parquet.{len(parts.setdefault(name, []))}.tmp"
+        with writer_for(part) as writer:
+            writer.write_table(pa.concat_tables(buffers.pop(name)))
+        parts[name].append(part)
+
+    def finish(name: str) -> None:
+        target = out_dir / f"{name}.parquet"
+        partials[target] = target.with_name(target.name + ".tmp")
+        spilled = (pq.read_table(part) for part in parts.get(name, []))
+        pending: List[pa.Table] = []
+        written = False
+        with writer_for(partials[target]) as writer:
+            for table in itertools.chain(spilled, buffers.pop(name, [])):
+                pending.append(table)
+                if sum(rows.num_rows for rows in pending) >= row_group_rows:
+                    whole = pa.concat_tables(pending)
+                    cut = whole.num_rows - whole.num_rows % row_group_rows
+                    writer.write_table(whole.slice(0, cut), row_group_size=row_group_rows)
+                    pending, written = [whole.slice(cut)], True
+            rest = pa.concat_tables(pending) if pending else reader.schema.empty_table()
+            if rest.num_rows or not written:
+                writer.write_table(rest)
+            writer.add_key_value_metadata({FILE_STATS_KEY: json.dumps(stats[name])})
+
+    try:
+        if split_by_ticker:
+            total = 0
+            for batch in reader:
+                for ticker, rows in _split_by_ticker(pa.Table.from_batches([batch])).items():
+                    buffers.setdefault(ticker, []).append(rows)
+                    buffered[ticker] = buffered.get(ticker, 0) + rows.num_rows
+                    stats[ticker] = _table_stats(rows, stats.get(ticker))
+                    total += rows.num_rows
+                while total > buffer_rows:
+                    largest = max(buffered, key=buffered.get)
+                    total -= buffered.pop(largest)
+                    spill(largest)
+            for ticker in sorted(stats):
+                finish(ticker)
+        else:
+            name = csv_path.stem
+            target = out_dir / f"{name}.parquet"
+            partials[target] = target.with_name(target.name + ".tmp")
+            with writer_for(partials[target]) as writer:
+                for table in itertools.chain(
+                    (pa.Table.from_batches([batch]) for batch in reader),
+                    [reader.schema.empty_table()],
+                ):
+                    writer.write_table(table)
+                    stats[name] = _table_stats(table, stats.get(name))
+                writer.add_key_value_metadata({FILE_STATS_KEY: json.dumps(stats[name])})
+        for target, partial in partials.items():
+            os.replace(partial, target)
+    finally:
+        for path in temporary:
+            if path.exists():
+                path.unlink()
+    return sorted(partials)
+
+
+def read_source_file(path: Path) -> pd.DataFrame:
+    """Read a CSV or Parquet source file (chosen by suffix) into a DataFrame."""
+    if path.suffix.lower() == ".parquet":
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def consolidate_folder(  # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+    in_dir: Path,
+    out_path: Path,
+    pattern: str = "*.csv",
+    compression: str = DEFAULT_COMPRESSION,
+    compression_level: Optional[int] = DEFAULT_COMPRESSION_LEVEL,
+    compact: bool = False,
+    indicators: bool = False,
+    adjust: bool = False,
+    errors: str = "strict",
+) -> Path:
+    """Write every file in in_dir matching pattern into one Parquet file.
+
+    Rows are sorted by ``(ticker, date)`` and each ticker is written as its
+    own row group, so the footer statistics of ``ticker`` and ``date``
+    locate any ticker / date window without scanning the data.  Columns are
+    cast to ``STOCK_SCHEMA`` (see ``apply_schema``), so dates are stored as UTC
+    timestamps and those statistics order correctly; the file statistics
+    of ``convert_csv_file`` are written too.
+
+    Sources may be CSV or Parquet (chosen by suffix), which lets the
+    existing per-ticker ``data/*.parquet`` files be consolidated directly.
+
+    Args:
+        in_dir: Directory containing source files.
+        out_path: Parquet file to write (parent created if missing).
+        pattern: Glob pattern for selecting files (default: ``"*.csv"``).
+        compression: Parquet compression codec.
+        compression_level: Codec level, or ``None`` for the codec default.
+        compact: Store indicator columns as float32.
+        indicators: Recompute the indicator columns from OHLCV, one source
+            file at a time (see ``indicators.compute_indicators``).
+        adjust: Adjust as-traded prices first (see ``convert_csv_file``).
+        errors: ``"strict"`` or ``"coerce"``, as in ``apply_schema``.
+
+    Raises:
+        ValueError: If no source files match pattern, a value does not fit
+            the schema in strict mode, or with *indicators* or *adjust*, a
+            price column is missing.
+
+    Returns:
+        Path to the consolidated Parquet file.
+    """
+    frames = []
+    for path in sorted(in_dir.glob(pattern)):
+        if path.is_file():
+            frame = apply_schema(read_source_file(path), path, errors)
+            if adjust:
+                adjust_prices(frame)
+            if indicators:
+                recompute_indicators(frame)
+            frames.append(categorize(frame))
+    if not frames:
+        raise ValueError(f"No files matching '{pattern}' in {in_dir}.")
+
+    combined = concat_frames(frames, compact).reset_index(drop=True)
+    combined = combined.sort_values(["ticker", "date"], kind="stable", ignore_index=True)
+
+    table = pa.Table.from_pandas(combined, preserve_index=False)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        FILE_STATS_KEY: json.dumps(_file_stats(combined)).encode(),
+    })
+    tickers = combined["ticker"].to_numpy()
+    boundaries = [0, *(np.flatnonzero(tickers[1:] != tickers[:-1]) + 1), len(combined)]
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with pq.ParquetWriter(
+        out_path,
+        table.schema,
+        compression=compression,
+        compression_level=compression_level,
+        use_dictionary=[c for c in CATEGORICAL_COLUMNS if c in combined.columns],
+    ) as writer:
+        for start, stop in zip(boundaries[:-1], boundaries[1:]):
+            writer.write_table(table.slice(start, stop - start), row_group_size=stop - start)
+
+    return out_path
+
+
+def verify_folder(
+    in_dir: Path,
+    pattern: str = "*.csv",
+    rtol: float = DEFAULT_RTOL,
+    atol: float = DEFAULT_ATOL,
+) -> Dict[str, dict]:
+    """Diff the indicator columns of every source file against a recomputation.
+
+    Nothing is written.  Sources may be CSV or Parquet, as for
+    ``consolidate_folder``, so the shipped ``data/*.parquet`` files can be
+    checked directly.
+
+    Args:
+        in_dir: Directory containing source files.
+        pattern: Glob pattern for selecting files (default: ``"*.csv"``).
+        rtol: Relative tolerance (see ``indicators.verify_indicators``).
+        atol: Absolute tolerance.
+
+    Raises:
+        ValueError: If no source files match pattern.
+
+    Returns:
+        Source name -> ``indicators.verify_indicators`` report, sorted.
+    """
+    reports = {
+        path.name: verify_indicators(apply_schema(read_source_file(path), path), rtol, atol)
+        for path in sorted(in_dir.glob(pattern))
+        if path.is_file()
+    }
+    if not reports:
+        raise ValueError(f"No files matching '{pattern}' in {in_dir}.")
+    return reports
 
 
 def parse_args() -> argparse.Namespace:
@@ -51,20 +736,191 @@ def parse_args() -> argparse.Namespace:
         description="Convert a folder of CSV files to Parquet files."
     )
     parser.add_argument("input_dir", type=Path, help="Folder containing CSV files")
-    parser.add_argument("output_dir", type=Path, help="Folder to write Parquet files")
+    parser.add_argument(
+        "output_dir",
+        type=Path,
+        nargs="?",
+        help="Folder to write Parquet files (the output file with --consolidate)",
+    )
     parser.add_argument(
         "--pattern",
         type=str,
         default="*.csv",
         help="Glob pattern for CSVs (default: *.csv)",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--consolidate",
+        action="store_true",
+        help="Write one Parquet file sorted by (ticker, date), one row group per ticker",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=f"Only convert CSVs that changed since the last run ({MANIFEST_NAME}); "
+        "not with --stream or --consolidate",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for per-file conversion; 0 uses one per CPU (default: 1); "
+        "not with --stream or --consolidate",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream each CSV in blocks (for files larger than memory)",
+    )
+    parser.add_argument(
+        "--split-by-ticker",
+        action="store_true",
+        help="With --stream, write one <TICKER>.parquet per ticker",
+    )
+    parser.add_argument(
+        "--block-size",
+        type=int,
+        default=DEFAULT_BLOCK_SIZE >> 20,
+        help=f"With --stream, MiB of CSV per block (default: {DEFAULT_BLOCK_SIZE >> 20})",
+    )
+    parser.add_argument(
+        "--float32",
+        action="store_true",
+        help="Store indicator columns as float32 (prices stay float64)",
+    )
+    parser.add_argument(
+        "--no-catalog",
+        action="store_true",
+        help="Do not write the ticker catalog of the output",
+    )
+    parser.add_argument(
+        "--coerce",
+        action="store_true",
+        help="Store values that do not fit the schema as null instead of failing "
+        "(not with --stream)",
+    )
+    parser.add_argument(
+        "--recompute-indicators",
+        action="store_true",
+        help="Recompute the indicator columns from OHLCV (not with --stream)",
+    )
+    parser.add_argument(
+        "--adjust-prices",
+        action="store_true",
+        help="Sources hold as-traded prices: adjust them for splits and dividends, "
+        "add the total-return index and recompute the indicators (not with --stream)",
+    )
+    parser.add_argument(
+        "--verify-indicators",
+        action="store_true",
+        help="Only diff the sources' indicator columns against a recomputation",
+    )
+    parser.add_argument(
+        "--compression",
+        type=str,
+        default=DEFAULT_COMPRESSION,
+        help=f"Codec for --consolidate (default: {DEFAULT_COMPRESSION})",
+    )
+    parser.add_argument(
+        "--compression-level",
+        type=int,
+        default=DEFAULT_COMPRESSION_LEVEL,
+        help=f"Codec level for --consolidate (default: {DEFAULT_COMPRESSION_LEVEL})",
+    )
+    args = parser.parse_args()
+    if args.output_dir is None and not args.verify_indicators:
+        parser.error("output_dir is required unless --verify-indicators is given")
+    if args.stream and args.consolidate:
+        parser.error("--stream cannot be used with --consolidate")
+    if args.stream and (args.recompute_indicators or args.adjust_prices):
+        # A ticker's rows can span blocks, so its history is never whole.
+        parser.error("--recompute-indicators and --adjust-prices cannot be used with --stream")
+    # Options only the per-file conversion (convert_folder) honours.
+    per_file = [
+        flag
+        for flag, given in (("--incremental", args.incremental), ("--workers", args.workers != 1))
+        if given
+    ]
+    if args.stream and (per_file or args.coerce):
+        # Streamed values are typed by Arrow's reader, which cannot coerce.
+        parser.error(f"{' and '.join(per_file + ['--coerce'] * args.coerce)} "
+                     "cannot be used with --stream")
+    if args.consolidate and per_file:
+        parser.error(f"{' and '.join(per_file)} cannot be used with --consolidate")
+    # Indicators of as-traded prices would not match the adjusted ones.
+    args.recompute_indicators = args.recompute_indicators or args.adjust_prices
+    return args
+
+
+def _write_output_catalog(out: Path) -> str:
+    """Write the ticker catalog of the output *out*, or say why it was skipped.
+
+    Outputs without Parquet files or without a ``ticker`` column (a generic
+    CSV) have no catalog.
+    """
+    paths = [out] if out.is_file() else sorted(out.glob("*.parquet"))
+    if not paths:
+        return f"Skipped the ticker catalog: no Parquet files in {out}"
+    for path in paths:
+        if "ticker" not in pq.read_schema(path).names:
+            return f"Skipped the ticker catalog: {path.name} has no 'ticker' column"
+    return f"Wrote {write_catalog(str(out))}"
 
 
 def main() -> None:
     """Entry point: parse args and run the folder conversion."""
     args = parse_args()
-    convert_folder(args.input_dir, args.output_dir, args.pattern)
+    if args.verify_indicators:
+        reports = verify_folder(args.input_dir, args.pattern)
+        failing = [
+            name for name, report in reports.items()
+            if any(result["mismatched"] for result in report["columns"].values())
+        ]
+        for name in failing:
+            print(f"{name}: {format_verification(reports[name])}")
+        print(f"Verified {len(reports)} file(s): {len(failing)} with mismatched indicators")
+        if failing:
+            raise SystemExit(1)
+        return
+    if args.consolidate:
+        out_path = consolidate_folder(
+            args.input_dir,
+            args.output_dir,
+            args.pattern,
+            args.compression,
+            args.compression_level,
+            args.float32,
+            args.recompute_indicators,
+            args.adjust_prices,
+            "coerce" if args.coerce else "strict",
+        )
+        print(f"Wrote {out_path}")
+    elif args.stream:
+        for csv_path in sorted(args.input_dir.glob(args.pattern)):
+            for parquet_path in stream_csv_file(
+                csv_path,
+                args.output_dir,
+                args.block_size << 20,
+                args.split_by_ticker,
+                args.float32,
+            ):
+                print(f"Wrote {parquet_path}")
+    else:
+        report = convert_folder(
+            args.input_dir,
+            args.output_dir,
+            args.pattern,
+            args.float32,
+            args.incremental,
+            args.workers or None,
+            "coerce" if args.coerce else "strict",
+            args.recompute_indicators,
+            args.adjust_prices,
+        )
+        print(format_report(report))
+        if report["failed"]:
+            raise SystemExit(1)
+    if not args.no_catalog:
+        print(_write_output_catalog(args.output_dir))
 
 
 if __name__ == "__main__":
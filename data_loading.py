@@ -1,37 +1,820 @@
-"""Utilities for loading all stock data from Parquet files into a single DataFrame."""
+"""Utilities for loading stock data from the Parquet files in ./data.
 
+``load_all_data`` reads every file and concatenates them into a single
+DataFrame.  ``StockDataset`` is the lazy alternative: it knows which file
+holds each ticker and only reads the tickers a caller actually asks for,
+so a single-ticker backtest touches one file instead of the whole universe.
+
+Both also understand the consolidated layout written by
+``csv_to_parquet.py --consolidate``: one file sorted by ``(ticker, date)``
+with one row group per ticker, where ticker and date filters are answered
+from row-group statistics (``read_consolidated``).
+
+A directory may also hold delta files appended by ``store_update.py``
+(see ``DELTA_DIR``); every reader here merges them after their ticker's
+base file, so appended rows look like part of the history.
+
+The readers themselves live in ``parquet_io``, the footer fingerprints in
+``fingerprint``, the Arrow IPC cache of full loads in ``arrow_cache`` and
+the ticker catalog in ``catalog``.
+"""
+
+import argparse
 import glob
+import json
 import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
+
+from arrow_cache import DEFAULT_CACHE_DIR, load_cached
+from catalog import CATALOG_NAME, read_catalog, write_catalog
+from fingerprint import dataset_fingerprint, row_group_fingerprints, source_signature
+from parquet_io import (
+    DATA_DIR,
+    DEFAULT_LOAD_WORKERS,
+    compact_frame,
+    concat_frames,
+    date_filters,
+    normalize_dates,
+    projection,
+    read_consolidated,
+    read_parquet_files,
+    read_parquet_timed,
+    source_paths,
+    ticker_delta_paths,
+    ticker_row_groups,
+)
+
+# Parquet metadata key under which csv_to_parquet stores each file's row
+# count, date range and per-column null counts (see read_file_stats).
+FILE_STATS_KEY = b"traderewind.stats"
+
+
+def _date_bounds(
+    metadata, row_groups: Iterable[int]
+) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+    """Return the UTC ``(min, max)`` of ``date`` over *row_groups* from the footer.
+
+    String dates compare as written, which orders daily ISO dates
+    correctly.  Returns ``None`` when any row group lacks statistics.
+    """
+    date_idx = metadata.schema.to_arrow_schema().get_field_index("date")
+    if date_idx < 0:
+        return None
+    lows, highs = [], []
+    for group in row_groups:
+        stats = metadata.row_group(group).column(date_idx).statistics
+        if stats is None or not stats.has_min_max:
+            return None
+        lows.append(stats.min)
+        highs.append(stats.max)
+    if not lows:
+        return None
+    return pd.to_datetime(min(lows), utc=True), pd.to_datetime(max(highs), utc=True)
+
+
+def memory_report(frame: pd.DataFrame) -> pd.DataFrame:
+    """Report the resident memory of each column of *frame*.
+
+    Categorical columns also show what they would cost as Python object
+    strings (the pre-categorical layout), so the saving is visible.
+
+    Returns:
+        DataFrame indexed by column with ``dtype``, ``bytes``,
+        ``object_bytes`` and ``saving`` columns, plus a ``TOTAL`` row.
+    """
+    rows = {}
+    for col in frame.columns:
+        series = frame[col]
+        used = int(series.memory_usage(index=False, deep=True))
+        as_object = used
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            sizes = np.array(
+                [sys.getsizeof(value) for value in series.cat.categories]
+                + [sys.getsizeof(None)],
+                dtype=np.int64,
+            )
+            # Code -1 (missing) picks the trailing None size.
+            as_object = int(8 * len(series) + sizes[series.cat.codes.to_numpy()].sum())
+        rows[col] = {
+            "dtype": str(series.dtype),
+            "bytes": used,
+            "object_bytes": as_object,
+            "saving": as_object - used,
+        }
+    report = pd.DataFrame.from_dict(rows, orient="index")
+    report.loc["TOTAL"] = ["", *report[["bytes", "object_bytes", "saving"]].sum()]
+    return report
+
+
+def read_file_stats(path: str) -> Optional[dict]:
+    """Return the statistics csv_to_parquet stored in *path*'s footer.
+
+    Only the footer is read.  The result has ``rows``, ``date_min`` and
+    ``date_max`` (ISO strings in UTC, or ``None``), ``null_counts`` per
+    column and the ``schema_version`` the file was written with.
+
+    Returns:
+        The statistics, or ``None`` for a file written without them.
+    """
+    metadata = pq.read_metadata(path).metadata or {}
+    raw = metadata.get(FILE_STATS_KEY)
+    return json.loads(raw) if raw is not None else None
+
+
+def sort_by_ticker(frame: pd.DataFrame) -> pd.DataFrame:
+    """Return *frame* with each ticker's rows contiguous and a fresh RangeIndex.
+
+    Unsorted frames are sorted by ``(ticker, date)``.  Frames that are
+    already grouped in ticker order (as per-ticker files concatenate) are
+    left in their existing order and not copied: the result shares their
+    columns (a mapped Arrow cache stays mapped), and only the index is new.
+    """
+    if "ticker" in frame.columns and not frame["ticker"].is_monotonic_increasing:
+        keys = ["ticker", "date"] if "date" in frame.columns else ["ticker"]
+        return frame.sort_values(keys, kind="stable", ignore_index=True)
+    # A new index rather than reset_index(), which would copy every column.
+    frame = frame.copy(deep=False)
+    frame.index = pd.RangeIndex(len(frame))
+    return frame
+
+
+def build_ticker_index(frame: pd.DataFrame) -> Dict[str, slice]:
+    """Map each ticker to the contiguous row slice holding its history.
+
+    Args:
+        frame: Combined frame whose rows are grouped by ticker
+            (see ``sort_by_ticker``).
 
+    Rows without a ticker are left out of the index.
 
-def load_all_data() -> pd.DataFrame:
+    Raises:
+        ValueError: If a ticker's rows are not contiguous.
+
+    Returns:
+        Dict of ticker -> positional ``slice`` for use with ``frame.iloc``.
+    """
+    column = frame["ticker"]
+    missing = column.isna().to_numpy()
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        keys = column.cat.codes.to_numpy()
+        labels = column.cat.categories
+    else:
+        # One key for every null, so a run of them is a single run.
+        keys = column.to_numpy(dtype=object).copy()
+        keys[missing] = None
+        labels = None
+    if len(keys) == 0:
+        return {}
+    starts = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+    bounds = [0, *starts.tolist(), len(keys)]
+
+    index: Dict[str, slice] = {}
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        if missing[start]:
+            # Code -1 would otherwise look up the last category.
+            continue
+        ticker = keys[start] if labels is None else labels[keys[start]]
+        if ticker in index:
+            raise ValueError(
+                f"Rows for ticker '{ticker}' are not contiguous; "
+                "sort the frame with sort_by_ticker first."
+            )
+        index[ticker] = slice(start, stop)
+    return index
+
+
+def load_all_data(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    columns: Optional[Sequence[str]] = None,
+    max_workers: Optional[int] = None,
+    timings: Optional[Dict[str, float]] = None,
+    source: Optional[str] = None,
+    compact: bool = False,
+    cache_dir: Optional[str] = None,
+) -> pd.DataFrame:
     """Load all Parquet files from the ./data directory and concatenate them.
 
+    Args:
+        columns: Columns to read. Parquet only decodes the requested column
+            chunks, so a narrow projection cuts both I/O and memory.
+            ``None`` (default) reads every column.
+        max_workers: Number of reader threads (see ``read_parquet_files``).
+        timings: Optional dict filled with ``path -> seconds`` per file.
+        source: Directory of per-ticker files, or a consolidated Parquet
+            file. ``None`` (default) uses ``DATA_DIR``.
+        compact: Store ``INDICATOR_COLUMNS`` as float32, roughly halving
+            their memory; prices stay float64.
+        cache_dir: Directory for the memory-mapped Arrow IPC cache. A
+            current cache is mapped instead of reading Parquet; a missing
+            or stale one is rebuilt. ``None`` (default) reads Parquet.
+
     Raises:
         ValueError: If no Parquet files are found.
 
     Returns:
-        Combined DataFrame of all loaded Parquet files.
+        Combined DataFrame of all loaded Parquet files, grouped by ticker
+        (see ``sort_by_ticker``) with a fresh RangeIndex and ``date`` as
+        UTC datetimes (see ``normalize_dates``).
     """
-    parquet_paths = glob.glob(os.path.join("data", "*.parquet"))
-    all_stocks = []
+    if cache_dir:
+        source = source or DATA_DIR
+        return load_cached(
+            source,
+            cache_dir,
+            lambda: load_all_data(
+                max_workers=max_workers, timings=timings, source=source, compact=compact
+            ),
+            columns,
+            timings,
+            compact,
+        )
 
-    for parquet_path in parquet_paths:
-        parquet_df = pd.read_parquet(parquet_path)
-        all_stocks.append(parquet_df)
+    if source is not None and os.path.isfile(source):
+        started = time.perf_counter()
+        combined_df = read_consolidated(source, columns=columns)
+        if timings is not None:
+            timings[source] = time.perf_counter() - started
+        if compact:
+            compact_frame(combined_df)
+        return sort_by_ticker(combined_df)
+
+    parquet_paths = source_paths(source or DATA_DIR)
+    all_stocks = read_parquet_files(parquet_paths, columns, max_workers, timings)
 
     if not all_stocks:
         raise ValueError("No Parquet files found.")
 
-    combined_df = pd.concat(all_stocks)
-    return combined_df
+    combined_df = concat_frames(all_stocks, compact)
+    return sort_by_ticker(combined_df)
+
+
+def _row_keys(column: pd.Series) -> np.ndarray:
+    """Comparable per-row keys: category codes when available, else values."""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return column.cat.codes.to_numpy()
+    return column.to_numpy()
+
+
+class TickerResolver:
+    """Constant-time resolution of a ticker or company name to a ticker.
+
+    Built once from the dataset's ``(ticker, company_name)`` pairs: a ticker
+    set, a company name -> tickers map, and case-insensitive aliases for
+    both, so each lookup is a few dict probes instead of a scan over every
+    row.
+    """
+
+    def __init__(self, pairs: Iterable[Tuple[str, Optional[str]]]) -> None:
+        """Index ``(ticker, company_name)`` pairs; the name may be ``None``."""
+        tickers = set()
+        by_name: Dict[str, set] = {}
+        ticker_aliases: Dict[str, set] = {}
+        name_aliases: Dict[str, set] = {}
+        for ticker, name in pairs:
+            tickers.add(ticker)
+            ticker_aliases.setdefault(str(ticker).casefold(), set()).add(ticker)
+            if isinstance(name, str):
+                by_name.setdefault(name, set()).add(ticker)
+                name_aliases.setdefault(name.casefold(), set()).add(ticker)
+        self._tickers = frozenset(tickers)
+        self._by_name = {name: sorted(found) for name, found in by_name.items()}
+        self._aliases = [
+            {alias: sorted(found) for alias, found in aliases.items()}
+            for aliases in (ticker_aliases, name_aliases)
+        ]
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "TickerResolver":
+        """Build a resolver from the rows of a combined frame.
+
+        Only rows where the ``(ticker, company_name)`` pair changes are
+        visited, so a frame grouped by ticker costs one vectorised pass.
+        """
+        columns = [col for col in ("ticker", "company_name") if col in frame.columns]
+        if frame.empty or "ticker" not in columns:
+            return cls([])
+        changed = np.zeros(len(frame), dtype=bool)
+        changed[0] = True
+        for col in columns:
+            keys = _row_keys(frame[col])
+            changed[1:] |= keys[1:] != keys[:-1]
+        rows = frame.iloc[np.flatnonzero(changed)]
+        names = rows["company_name"] if "company_name" in columns else [None] * len(rows)
+        return cls(zip(rows["ticker"], names))
+
+    def __contains__(self, ticker) -> bool:
+        return ticker in self._tickers
+
+    def tickers_for_company(self, company_name: str) -> List[str]:
+        """Return every ticker whose company name equals *company_name*."""
+        return list(self._by_name.get(company_name, []))
+
+    def resolve(self, stock) -> Optional[str]:
+        """Return the ticker *stock* refers to, or ``None`` if nothing matches.
+
+        Tried in order: exact ticker, exact company name, ticker ignoring
+        case, company name ignoring case.
+
+        Raises:
+            ValueError: If a company name maps to several tickers.
+        """
+        if stock in self._tickers:
+            return stock
+        candidates = [self._by_name.get(stock)]
+        if isinstance(stock, str):
+            candidates += [aliases.get(stock.casefold()) for aliases in self._aliases]
+        for matches in candidates:
+            if not matches:
+                continue
+            if len(matches) > 1:
+                raise ValueError(
+                    f"Company name '{stock}' maps to multiple tickers: {matches}"
+                )
+            return matches[0]
+        return None
+
+
+def _first_company_name(path: str) -> Tuple[bool, Optional[str]]:
+    """Return whether *path* has rows, and its first ``company_name``."""
+    parquet_file = pq.ParquetFile(path)
+    for group in range(parquet_file.num_row_groups):
+        column = parquet_file.read_row_group(group, columns=["company_name"]).column(0)
+        if len(column):
+            return True, column[0].as_py()
+    return False, None
+
+
+class StockDataset:  # pylint: disable=too-many-instance-attributes
+    """Lazy handle over the stock data on disk.
+
+    Creating the handle reads no price data.  For a directory, each file is
+    named after the ticker it holds (``data/AAPL.parquet``), so the
+    ticker -> file map comes from a directory listing.  For a consolidated
+    file, the ticker -> row group map comes from the footer statistics.
+    Data is read on demand by ``history`` and ``load``.
+
+    ``materialize`` (or ``StockDataset.from_frame``) holds the whole dataset
+    in memory instead, grouped by ticker with a ticker -> row slice index,
+    so ``history`` becomes an ``iloc`` slice rather than a file read or a
+    boolean scan over every row.
+
+    The handle exposes ``empty`` like a DataFrame so it can be passed
+    wherever the combined dataset used to be checked for emptiness.
+    """
+
+    def __init__(
+        self,
+        source: str = DATA_DIR,
+        compact: bool = False,
+        cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+    ) -> None:
+        """Index the data in *source* by ticker.
+
+        Args:
+            source: Directory containing one ``<TICKER>.parquet`` per stock,
+                or a consolidated file from ``csv_to_parquet.py --consolidate``.
+            compact: Return ``INDICATOR_COLUMNS`` as float32
+                (see ``load_all_data``).
+            cache_dir: Arrow IPC cache used when every ticker is loaded
+                (see ``load_all_data``); ``None`` disables it.
+        """
+        self.source = source
+        self.compact = compact
+        self.cache_dir = cache_dir
+        self._metadata = None
+        self._row_groups: Dict[str, List[int]] = {}
+        if os.path.isfile(source):
+            self._metadata = pq.read_metadata(source)
+            self._row_groups = ticker_row_groups(self._metadata)
+            self._paths: Dict[str, str] = {ticker: source for ticker in self._row_groups}
+        else:
+            parquet_paths = sorted(glob.glob(os.path.join(source, "*.parquet")))
+            self._paths = {
+                os.path.splitext(os.path.basename(path))[0]: path
+                for path in parquet_paths
+            }
+        self._company_names: Optional[Dict[str, str]] = None
+        self._resolver: Optional[TickerResolver] = None
+        # Ticker -> (fingerprint of its files, date range).
+        self._date_ranges: Dict[str, Tuple[str, Optional[Tuple[pd.Timestamp, pd.Timestamp]]]] = {}
+        self._frame: Optional[pd.DataFrame] = None
+        self._row_slices: Dict[str, slice] = {}
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "StockDataset":
+        """Wrap an already loaded combined frame in an indexed dataset.
+
+        The frame is grouped by ticker (see ``sort_by_ticker``) before it is
+        indexed; the caller's frame is not modified.
+        """
+        dataset = cls.__new__(cls)
+        dataset.source = None
+        dataset.compact = False
+        dataset.cache_dir = None
+        dataset._metadata = None
+        dataset._row_groups = {}
+        dataset._paths = {}
+        dataset._company_names = None
+        dataset._resolver = None
+        dataset._date_ranges = {}
+        dataset._set_frame(frame)
+        return dataset
+
+    def _set_frame(self, frame: pd.DataFrame) -> None:
+        """Hold *frame* in memory and index it by ticker."""
+        frame = sort_by_ticker(frame)
+        self._row_slices = build_ticker_index(frame)
+        self._frame = frame
+
+    def _tickers_index(self) -> Dict[str, object]:
+        """Return whichever ticker map backs the handle."""
+        return self._row_slices if self._frame is not None else self._paths
+
+    def __len__(self) -> int:
+        return len(self._tickers_index())
+
+    def __contains__(self, ticker) -> bool:
+        return ticker in self._tickers_index()
+
+    @property
+    def empty(self) -> bool:
+        """True when the dataset holds no tickers."""
+        return not self._tickers_index()
+
+    @property
+    def tickers(self) -> List[str]:
+        """Sorted list of the tickers available in the dataset."""
+        return sorted(self._tickers_index())
+
+    @property
+    def is_materialized(self) -> bool:
+        """True once the whole dataset is held in memory."""
+        return self._frame is not None
+
+    def memory_footprint(self) -> Dict[str, object]:
+        """Report how much of the dataset is held in memory.
+
+        Returns:
+            Dict with ``tickers``, ``materialized``, ``rows`` (0 for a lazy
+            handle) and ``bytes``, the deep memory usage of the in-memory
+            frame (0 for a lazy handle, whose reads are not retained).
+        """
+        frame = self._frame
+        return {
+            "tickers": len(self),
+            "materialized": frame is not None,
+            "rows": 0 if frame is None else len(frame),
+            "bytes": 0 if frame is None else int(frame.memory_usage(index=False, deep=True).sum()),
+        }
+
+    def materialize(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        max_workers: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """Load every ticker into memory and index it by ticker.
+
+        Later ``history`` calls slice this frame instead of reading files.
+
+        Args:
+            columns: Columns to keep in memory; ``None`` keeps every column.
+            max_workers: Number of reader threads (see ``read_parquet_files``).
+
+        Returns:
+            The in-memory combined frame, grouped by ticker.
+        """
+        if self._frame is None:
+            self._set_frame(self.load(columns=columns, max_workers=max_workers))
+        return self._frame
+
+    def path_for(self, ticker: str) -> str:
+        """Return the Parquet file that holds *ticker* (its base file).
+
+        Raises:
+            KeyError: If the ticker has no file in the dataset.
+        """
+        try:
+            return self._paths[ticker]
+        except KeyError as exc:
+            raise KeyError(f"No data file for ticker '{ticker}'.") from exc
+
+    def paths_for(self, ticker: str) -> List[str]:
+        """Return the base file of *ticker* followed by its delta files.
+
+        The delta files are listed on every call, so rows appended (or
+        compacted) after the handle was created are read like the rest.
+
+        Raises:
+            KeyError: If the ticker has no file in the dataset.
+        """
+        path = self.path_for(ticker)
+        if self._metadata is not None:
+            return [path]
+        return [path, *ticker_delta_paths(self.source, ticker)]
+
+    def fingerprint(self, ticker: Optional[str] = None) -> Optional[str]:
+        """Return the fingerprint of the dataset, or of one *ticker*.
+
+        See ``dataset_fingerprint`` and ``ticker_fingerprints``; results
+        derived from the data can be cached under it.  Takes milliseconds
+        for the dataset and a ``stat`` or two for a ticker.
+
+        Returns:
+            The fingerprint, or ``None`` for a dataset built from a frame
+            (``from_frame``), which has no files to fingerprint.
+
+        Raises:
+            KeyError: If the ticker is not in the dataset.
+        """
+        if self.source is None:
+            return None
+        if ticker is None:
+            return dataset_fingerprint(self.source)
+        if self._metadata is not None:
+            self.path_for(ticker)
+            return row_group_fingerprints(self.source)[ticker]
+        return source_signature(self.paths_for(ticker))
+
+    def date_range(self, ticker: str) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """Return the UTC ``(first, last)`` date of *ticker* without reading its rows.
+
+        The range comes from the Parquet footer statistics of the ticker's
+        files (base and deltas), or from a current catalog
+        (``read_catalog``) when a file has none.  It is cached per ticker
+        under the fingerprint of the ticker's files, so an append or a
+        compaction after the handle was created is picked up.
+        Returns ``None`` for an in-memory dataset or when neither source
+        knows the range; callers then derive it from the data.
+
+        Raises:
+            KeyError: If the ticker has no file in the dataset.
+        """
+        if self._frame is not None:
+            return None
+        paths = self.paths_for(ticker)
+        signature = source_signature(paths) if self._metadata is None else ""
+        cached = self._date_ranges.get(ticker)
+        if cached is None or cached[0] != signature:
+            if self._metadata is None:
+                bounds = None
+                for path in paths:
+                    metadata = pq.read_metadata(path)
+                    part = _date_bounds(metadata, range(metadata.num_row_groups))
+                    if part is None:
+                        bounds = None
+                        break
+                    bounds = part if bounds is None else (bounds[0], part[1])
+            else:
+                bounds = _date_bounds(self._metadata, self._row_groups[ticker])
+            if bounds is None:
+                catalog = read_catalog(self.source)
+                if catalog is not None and ticker in catalog.index:
+                    bounds = tuple(catalog.loc[ticker, ["first_date", "last_date"]])
+            cached = self._date_ranges[ticker] = (signature, bounds)
+        return cached[1]
+
+    def history(
+        self,
+        ticker: str,
+        columns: Optional[Sequence[str]] = None,
+        start=None,
+        end=None,
+    ) -> pd.DataFrame:
+        """Return the history of a single ticker.
+
+        In memory this is a positional slice of the combined frame; on disk
+        it reads one file and any delta files (or one row group of a
+        consolidated file).
+
+        *start* and *end* are pushed into the Parquet reader, so row groups
+        and rows outside the window are skipped before conversion to pandas.
+        They are a read hint rather than an exact filter: an in-memory
+        dataset returns the whole slice, and a file with string dates keeps
+        up to a day either side (see ``date_filters``).
+
+        Args:
+            ticker: Ticker to read.
+            columns: Columns to read; ``None`` reads every column.
+            start: Earliest date needed (UTC); ``None`` for no bound.
+            end: Latest date needed (UTC); ``None`` for no bound.
+        """
+        if self._frame is not None:
+            if ticker not in self._row_slices:
+                raise KeyError(f"No data for ticker '{ticker}'.")
+            rows = self._frame.iloc[self._row_slices[ticker]]
+            return rows if columns is None else rows[projection(columns)]
+
+        path = self.path_for(ticker)
+        if self._metadata is None:
+            frames = []
+            for part in self.paths_for(ticker):
+                filters = None
+                if start is not None or end is not None:
+                    date_type = pq.read_schema(part).field("date").type
+                    filters = date_filters(date_type, start, end) or None
+                frames.append(read_parquet_timed(part, projection(columns), filters)[0])
+            if len(frames) > 1:
+                frame = concat_frames(frames).reset_index(drop=True)
+            else:
+                frame = frames[0]
+        elif start is not None or end is not None:
+            frame = read_consolidated(path, [ticker], columns, start, end)
+        else:
+            parquet_file = pq.ParquetFile(path, metadata=self._metadata)
+            frame = parquet_file.read_row_groups(
+                self._row_groups[ticker],
+                columns=projection(columns),
+                use_pandas_metadata=True,
+            ).to_pandas()
+            normalize_dates(frame)
+        return compact_frame(frame) if self.compact else frame
+
+    def load(
+        self,
+        tickers: Optional[Iterable[str]] = None,
+        columns: Optional[Sequence[str]] = None,
+        max_workers: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """Read and concatenate the files for *tickers*.
+
+        Args:
+            tickers: Tickers to read. ``None`` reads every ticker.
+            columns: Columns to read; ``None`` reads every column.
+            max_workers: Number of reader threads (see ``read_parquet_files``).
+
+        Raises:
+            ValueError: If there is nothing to read.
+
+        Returns:
+            Combined DataFrame of the requested tickers, in the order given.
+        """
+        if self._frame is not None:
+            if tickers is None:
+                frame = self._frame
+            else:
+                frame = pd.concat([self.history(ticker) for ticker in tickers])
+            return frame if columns is None else frame[projection(columns)]
+
+        if tickers is None and self.cache_dir and self._paths:
+            return load_all_data(
+                columns,
+                max_workers,
+                source=self.source,
+                compact=self.compact,
+                cache_dir=self.cache_dir,
+            )
+
+        selected = self.tickers if tickers is None else list(tickers)
+        if self._metadata is not None:
+            for ticker in selected:
+                self.path_for(ticker)
+            if not selected:
+                raise ValueError("No Parquet files found.")
+            frame = read_consolidated(self.source, selected, columns)
+            return compact_frame(frame) if self.compact else frame
+
+        paths = [path for ticker in selected for path in self.paths_for(ticker)]
+        frames = read_parquet_files(paths, columns, max_workers)
+        if not frames:
+            raise ValueError("No Parquet files found.")
+        return concat_frames(frames, self.compact)
+
+    def company_names(self) -> Dict[str, str]:
+        """Return a ticker -> company name map.
+
+        Names come from the current catalog (``read_catalog``) when there
+        is one.  Otherwise only the first row group of the ``company_name``
+        column is read, from every file concurrently.  Either way this
+        happens once per handle.
+        """
+        if self._company_names is None and self._frame is not None:
+            self._company_names = {
+                ticker: self._frame["company_name"].iat[rows.start]
+                for ticker, rows in self._row_slices.items()
+            }
+        if self._company_names is None and self._metadata is not None:
+            pairs = read_consolidated(self.source, columns=["ticker", "company_name"])
+            pairs = pairs.drop_duplicates("ticker")
+            self._company_names = dict(zip(pairs["ticker"], pairs["company_name"]))
+        if self._company_names is None:
+            catalog = read_catalog(self.source)
+            if catalog is not None:
+                names = catalog["company_name"].to_dict()
+                self._company_names = {
+                    ticker: None if pd.isna(names[ticker]) else names[ticker]
+                    for ticker in self._paths
+                    if ticker in names
+                }
+        if self._company_names is None:
+            with ThreadPoolExecutor(max_workers=max(DEFAULT_LOAD_WORKERS, 1)) as pool:
+                firsts = pool.map(_first_company_name, self._paths.values())
+                self._company_names = {
+                    ticker: name
+                    for ticker, (found, name) in zip(self._paths, firsts)
+                    if found
+                }
+        return self._company_names
+
+    def resolver(self) -> TickerResolver:
+        """Return the dataset's ``TickerResolver``, built once per handle."""
+        if self._resolver is None:
+            names = self.company_names()
+            self._resolver = TickerResolver(
+                (ticker, names.get(ticker)) for ticker in self.tickers
+            )
+        return self._resolver
+
+    def resolve(self, stock) -> Optional[str]:
+        """Resolve a ticker or company name (see ``TickerResolver.resolve``).
+
+        An exact ticker is answered from the ticker index, so company names
+        are only read when *stock* is not a ticker.
+        """
+        if stock in self:
+            return stock
+        return self.resolver().resolve(stock)
+
+    def tickers_for_company(self, company_name: str) -> List[str]:
+        """Return every ticker whose company name equals *company_name*."""
+        return self.resolver().tickers_for_company(company_name)
+
+
+# One dataset for the whole process (every Streamlit page and session, and
+# the backtester), created on first use by shared_dataset().
+_SHARED: Dict[str, Tuple[str, StockDataset]] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_dataset(materialize: bool = False) -> StockDataset:
+    """Return the process-wide ``StockDataset`` over ``DATA_DIR``.
+
+    The first call creates it under a lock, so concurrent callers share a
+    single instance, and with it the per-handle caches (ticker index,
+    company names, footer statistics).  Callers must treat it as read-only.
+
+    Every call checks ``dataset_fingerprint`` (a few milliseconds) and
+    replaces the instance once the files change, for example after
+    ``store_update.py append`` or ``compact``, so new tickers and rows are
+    seen without restarting.  A materialized instance is replaced by a
+    materialized one.
+
+    Args:
+        materialize: Also load every ticker into memory (once), so later
+            ``history`` calls slice the combined frame instead of reading
+            files.
+    """
+    signature = source_signature(source_paths(DATA_DIR))
+    signed, dataset = _SHARED.get(DATA_DIR, (None, None))
+    if signed != signature or (materialize and not dataset.is_materialized):
+        with _SHARED_LOCK:
+            signed, dataset = _SHARED.get(DATA_DIR, (None, None))
+            if signed != signature:
+                materialize = materialize or (dataset is not None and dataset.is_materialized)
+                dataset = StockDataset(DATA_DIR)
+                _SHARED[DATA_DIR] = (signature, dataset)
+            if materialize:
+                dataset.materialize()
+    return dataset
 
 
 def main():
-    """Run a simple demonstration of loading data and printing the head."""
-    all_stocks_df = load_all_data()
+    """Load the data, print the head and report the slowest file reads.
+
+    ``python data_loading.py --catalog [SOURCE]`` writes the ticker catalog
+    of SOURCE (default ``DATA_DIR``) instead.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--catalog",
+        nargs="?",
+        const=DATA_DIR,
+        metavar="SOURCE",
+        help=f"Write the ticker catalog ({CATALOG_NAME}) of SOURCE and exit",
+    )
+    args = parser.parse_args()
+    if args.catalog is not None:
+        print(f"Wrote {write_catalog(args.catalog)}")
+        return
+
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+    all_stocks_df = load_all_data(columns=["date", "ticker", "close"], timings=timings)
+    elapsed = time.perf_counter() - started
     print(all_stocks_df.head())
+    print(memory_report(all_stocks_df))
+    print(
+        f"Read {len(timings)} files in {elapsed:.2f}s "
+        f"with {DEFAULT_LOAD_WORKERS} workers"
+    )
+    for path, seconds in sorted(timings.items(), key=lambda item: -item[1])[:5]:
+        print(f"  {seconds * 1000:7.1f} ms  {path}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,141 @@
+"""Fingerprint the Parquet files of a stock data source.
+
+``dataset_fingerprint`` and ``ticker_fingerprints`` identify the data
+from file sizes, mtimes and Parquet footers, without reading any column
+data, so anything derived from it can be cached under them.
+"""
+
+import glob
+import hashlib
+import os
+from typing import Dict, Sequence, Tuple
+
+import pyarrow.parquet as pq
+
+from parquet_io import DATA_DIR, delta_paths, source_paths, ticker_row_groups
+
+# Mixed into every source_signature.  Bumped whenever the layout of a
+# cached frame changes, which invalidates every cache keyed on a signature.
+CACHE_FORMAT_VERSION = 2
+
+# Footer digests by absolute path, with the size and mtime they were read
+# at, so an unchanged file costs one stat (see file_fingerprint).
+_FOOTERS: Dict[str, Tuple[int, int, str]] = {}
+
+# Per-ticker fingerprints of consolidated files, by absolute path, with the
+# file fingerprint they were computed from.
+_ROW_GROUP_FINGERPRINTS: Dict[str, Tuple[str, Dict[str, str]]] = {}
+
+
+def _footer_digest(path: str, size: int) -> str:
+    """Hash the Parquet footer of *path* (schema, row groups, statistics).
+
+    Only the footer bytes are read.  Returns ``""`` for a non-Parquet file.
+    """
+    with open(path, "rb") as handle:
+        handle.seek(max(size - 8, 0))
+        trailer = handle.read(8)
+        if len(trailer) < 8 or trailer[4:] != b"PAR1":
+            return ""
+        length = int.from_bytes(trailer[:4], "little")
+        handle.seek(max(size - 8 - length, 0))
+        return hashlib.sha256(handle.read(length)).hexdigest()
+
+
+def file_fingerprint(path: str) -> str:
+    """Fingerprint one Parquet file from its name, size, mtime and footer.
+
+    The footer holds every row group's row count, sizes and column
+    statistics, so a rewrite is caught even when it keeps the size and
+    mtime (a copy preserving times, a coarse-grained file system).  Footers
+    are re-read only when the size or mtime changes; otherwise this costs
+    one ``stat``.  No column data is read.
+    """
+    stat = os.stat(path)
+    key = os.path.abspath(path)
+    known = _FOOTERS.get(key)
+    if known is None or known[:2] != (stat.st_size, stat.st_mtime_ns):
+        known = (stat.st_size, stat.st_mtime_ns, _footer_digest(path, stat.st_size))
+        _FOOTERS[key] = known
+    text = f"{os.path.basename(path)}\0{stat.st_size}\0{stat.st_mtime_ns}\0{known[2]}"
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def source_signature(paths: Sequence[str]) -> str:
+    """Combine the ``file_fingerprint`` of each file in *paths*, in order.
+
+    The signature changes whenever a file is added, removed, rewritten or
+    touched, without reading any column data.  It keys every cache of the
+    data (the Arrow cache, price matrices, the catalog).
+    """
+    digest = hashlib.sha256(f"v{CACHE_FORMAT_VERSION}".encode())
+    for path in paths:
+        digest.update(f"{file_fingerprint(path)}\n".encode())
+    return digest.hexdigest()
+
+
+def dataset_fingerprint(source: str = DATA_DIR) -> str:
+    """Return the fingerprint of the whole dataset in *source*.
+
+    Equal fingerprints mean the same files with the same contents, so a
+    cache of anything derived from the data can key on it.  Computing it
+    takes milliseconds (a listing and a ``stat`` per file, plus a footer
+    read for files changed since the last call).
+
+    Raises:
+        ValueError: If no Parquet files are found.
+    """
+    paths = source_paths(source)
+    if not paths:
+        raise ValueError("No Parquet files found.")
+    return source_signature(paths)
+
+
+def row_group_fingerprints(path: str) -> Dict[str, str]:
+    """Per-ticker fingerprints of a consolidated file, from its footer.
+
+    A ticker's fingerprint covers its row groups' row counts, compressed
+    sizes and column statistics.
+    """
+    key = os.path.abspath(path)
+    current = file_fingerprint(path)
+    known = _ROW_GROUP_FINGERPRINTS.get(key)
+    if known is None or known[0] != current:
+        metadata = pq.read_metadata(path)
+        digests: Dict[str, "hashlib._Hash"] = {}
+        for ticker, groups in ticker_row_groups(metadata).items():
+            digest = digests[ticker] = hashlib.sha256(ticker.encode())
+            for group in groups:
+                row_group = metadata.row_group(group)
+                digest.update(f"{row_group.num_rows}".encode())
+                for position in range(row_group.num_columns):
+                    chunk = row_group.column(position)
+                    stats = chunk.statistics
+                    bounds = ()
+                    if stats is not None and stats.has_min_max:
+                        bounds = (stats.min, stats.max)
+                    digest.update(f"\0{chunk.total_compressed_size}\0{bounds}".encode())
+        known = (current, {ticker: digest.hexdigest() for ticker, digest in digests.items()})
+        _ROW_GROUP_FINGERPRINTS[key] = known
+    return known[1]
+
+
+def ticker_fingerprints(source: str = DATA_DIR) -> Dict[str, str]:
+    """Return a fingerprint per ticker of the dataset in *source*.
+
+    A ticker's fingerprint changes only when its own data does: for a
+    directory it combines the ``file_fingerprint`` of its base and delta
+    files; for a consolidated file it comes from the ticker's row groups in
+    the footer.  No column data is read.
+
+    Returns:
+        Dict of ticker -> fingerprint, sorted by ticker.
+    """
+    if os.path.isfile(source):
+        return dict(sorted(row_group_fingerprints(source).items()))
+    deltas = delta_paths(source)
+    fingerprints = {}
+    for path in sorted(glob.glob(os.path.join(source, "*.parquet"))):
+        ticker = os.path.splitext(os.path.basename(path))[0]
+        fingerprints[ticker] = source_signature([path, *deltas.get(ticker, [])])
+    return fingerprints
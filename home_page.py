@@ -8,7 +8,7 @@ import streamlit as st
 import pandas as pd
 
 from backtester import InvalidTickerError, main_backtest
-from data_loading import load_all_data
+from data_loading import shared_dataset
 from strategies import (
     display_name_to_key,
     get_strategy_display_names,
@@ -19,9 +19,8 @@ from ui_shared import apply_shared_ui
 apply_shared_ui()
 
 def _available_tickers():
-    """Return sorted list of unique ticker symbols (uppercase) from the full dataset."""
-    df = load_all_data()
-    return sorted(set(df["ticker"].dropna().astype(str).str.upper()))
+    """Return sorted list of unique ticker symbols (uppercase) from the data folder."""
+    return sorted({ticker.upper() for ticker in shared_dataset().tickers})
 
 st.title("Trade Rewind")
 st.caption("A tool to understand stock backtesting.")
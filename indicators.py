@@ -0,0 +1,232 @@
+"""Recompute the derived indicator columns from raw OHLCV.
+
+The shipped files carry ``parquet_io.INDICATOR_COLUMNS`` precomputed.
+``compute_indicators`` rebuilds every one of them from ``high``, ``low``,
+``close`` and ``volume``, so they can be regenerated when the prices
+change, and ``verify_indicators`` diffs a frame's stored indicators
+against a fresh computation::
+
+    frame[list(INDICATOR_COLUMNS)] = compute_indicators(frame)
+    print(format_verification(verify_indicators(frame)))
+
+Each ticker is handled in one pass over its date-sorted rows, with every
+indicator a vectorized rolling / exponential kernel over the whole
+history.  The definitions reproduce the shipped values:
+
+* ``return_Nd``: N-day simple return; ``log_return``: 1-day log return.
+* ``sma_N`` / ``bb_middle``: N-day mean of ``close``; ``bb_upper`` /
+  ``bb_lower``: ``bb_middle`` ± 2 sample standard deviations (20 days).
+* ``ema_12``: exponential mean, span 12, seeded with the first close.
+  ``macd`` is ``ema_12`` minus the span-26 mean; ``macd_signal`` its
+  span-9 mean.
+* ``rsi_14``: 14-day mean gain against mean loss (simple, not Wilder
+  smoothing), counting the first row as neither.
+* ``atr_14``: 14-day mean true range, the first row's range being
+  ``high - low``.
+* ``volatility_20d``: 20-day sample standard deviation of ``return_1d``
+  (daily, not annualised).
+* ``volume_sma_20`` / ``volume_ratio``: 20-day mean volume and today's
+  volume over it.
+* ``high_52w`` / ``low_52w``: highest ``high`` / lowest ``low`` over 252
+  rows.
+
+Windows count rows, so a value is NaN until a ticker has enough history.
+"""
+
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from parquet_io import INDICATOR_COLUMNS
+
+# Columns compute_indicators reads.
+OHLCV_INPUTS = ("high", "low", "close", "volume")
+
+# Rows in a 52-week window.
+TRADING_YEAR = 252
+
+# Default tolerance of verify_indicators: float32 (compact) files and
+# differences in summation order both stay well inside it.
+DEFAULT_RTOL = 1e-5
+DEFAULT_ATOL = 1e-8
+
+
+def _ticker_indicators(
+    high: pd.Series, low: pd.Series, close: pd.Series, volume: pd.Series
+) -> Dict[str, pd.Series]:
+    """Every indicator of one ticker, from its date-sorted OHLCV."""
+    # pylint: disable=too-many-locals
+    previous = close.shift()
+    return_1d = close / previous - 1
+    delta = close.diff()
+    mean_gain = delta.where(delta > 0, 0.0).rolling(14).mean()
+    mean_loss = (-delta).where(delta < 0, 0.0).rolling(14).mean()
+    true_range = pd.concat(
+        [high - low, (high - previous).abs(), (low - previous).abs()], axis=1
+    ).max(axis=1)
+    ema_12 = close.ewm(span=12, adjust=False).mean()
+    macd = ema_12 - close.ewm(span=26, adjust=False).mean()
+    window_20 = close.rolling(20)
+    sma_20 = window_20.mean()
+    band = 2 * window_20.std()
+    volume_sma_20 = volume.rolling(20).mean()
+    return {
+        "return_1d": return_1d,
+        "return_5d": close / close.shift(5) - 1,
+        "return_20d": close / close.shift(20) - 1,
+        "log_return": np.log(close / previous),
+        "sma_20": sma_20,
+        "sma_50": close.rolling(50).mean(),
+        "sma_200": close.rolling(200).mean(),
+        "ema_12": ema_12,
+        "rsi_14": 100 - 100 / (1 + mean_gain / mean_loss),
+        "macd": macd,
+        "macd_signal": macd.ewm(span=9, adjust=False).mean(),
+        "atr_14": true_range.rolling(14).mean(),
+        "volatility_20d": return_1d.rolling(20).std(),
+        "volume_sma_20": volume_sma_20,
+        "volume_ratio": volume / volume_sma_20,
+        "high_52w": high.rolling(TRADING_YEAR).max(),
+        "low_52w": low.rolling(TRADING_YEAR).min(),
+        "bb_middle": sma_20,
+        "bb_upper": sma_20 + band,
+        "bb_lower": sma_20 - band,
+    }
+
+
+def ticker_runs(frame: pd.DataFrame) -> tuple:
+    """Row order sorting *frame* by ``(ticker, date)``, and each ticker's run.
+
+    Per-ticker kernels (here and in ``adjustment``) gather each column in
+    this order, process one run at a time and scatter the results back.
+
+    Returns:
+        ``(order, boundaries)``: ``frame.iloc[order]`` is sorted and ticker
+        *i* occupies ``boundaries[i]:boundaries[i + 1]`` of it.  A frame
+        without a ``ticker`` column is a single run.
+    """
+    keys = [key for key in ("ticker", "date") if key in frame.columns]
+    order = np.arange(len(frame))
+    if keys:
+        keyed = frame[keys].reset_index(drop=True)
+        if "ticker" in keys:
+            keyed["ticker"] = keyed["ticker"].astype(str)
+        order = keyed.sort_values(keys, kind="stable").index.to_numpy()
+    if "ticker" not in frame.columns:
+        return order, [0, len(frame)]
+    tickers = frame["ticker"].astype(str).to_numpy()[order]
+    return order, [0, *(np.flatnonzero(tickers[1:] != tickers[:-1]) + 1), len(frame)]
+
+
+def compute_indicators(frame: pd.DataFrame) -> pd.DataFrame:
+    """Compute ``INDICATOR_COLUMNS`` from the OHLCV of *frame*.
+
+    Rows may be in any order and hold any number of tickers; each ticker
+    is computed over its own rows in date order.
+
+    Args:
+        frame: Rows with ``OHLCV_INPUTS``, and ``date`` / ``ticker`` when
+            there is more than one row per ticker.
+
+    Raises:
+        ValueError: If an ``OHLCV_INPUTS`` column is missing.
+
+    Returns:
+        Float64 frame of the indicators, with *frame*'s index.
+    """
+    missing = [col for col in OHLCV_INPUTS if col not in frame.columns]
+    if missing:
+        raise ValueError(f"Cannot compute indicators without column(s) {missing}.")
+
+    order, boundaries = ticker_runs(frame)
+    inputs = {
+        col: frame[col].to_numpy(dtype=np.float64, na_value=np.nan)[order]
+        for col in OHLCV_INPUTS
+    }
+    values = {col: np.empty(len(frame)) for col in INDICATOR_COLUMNS}
+    for start, stop in zip(boundaries[:-1], boundaries[1:]):
+        run = {col: pd.Series(inputs[col][start:stop]) for col in OHLCV_INPUTS}
+        for col, series in _ticker_indicators(**run).items():
+            # Scatter back from sorted order to the frame's row order.
+            values[col][order[start:stop]] = series.to_numpy()
+    return pd.DataFrame(values, index=frame.index, columns=list(INDICATOR_COLUMNS))
+
+
+def recompute_indicators(frame: pd.DataFrame) -> pd.DataFrame:
+    """Overwrite the ``INDICATOR_COLUMNS`` of *frame* in place.
+
+    Missing indicator columns are added after the existing columns.
+
+    Returns:
+        The same frame, for chaining.
+    """
+    computed = compute_indicators(frame)
+    for col in INDICATOR_COLUMNS:
+        frame[col] = computed[col]
+    return frame
+
+
+def verify_indicators(
+    frame: pd.DataFrame, rtol: float = DEFAULT_RTOL, atol: float = DEFAULT_ATOL
+) -> Dict[str, object]:
+    """Diff the stored indicators of *frame* against ``compute_indicators``.
+
+    A value matches when both are NaN, or both are numbers within *rtol*
+    (relative) or *atol* (absolute) of each other.
+
+    Args:
+        frame: Rows with ``OHLCV_INPUTS`` and the stored indicators.
+        rtol: Relative tolerance.
+        atol: Absolute tolerance.
+
+    Returns:
+        Report dict with ``rows``, ``missing`` (indicator columns absent
+        from *frame*) and ``columns``: for every indicator present, a dict
+        of ``mismatched`` (row count), ``max_abs_diff`` (over rows where
+        both are numbers) and ``tickers`` (sorted tickers with a mismatch).
+    """
+    computed = compute_indicators(frame)
+    tickers = (
+        frame["ticker"].astype(str).to_numpy()
+        if "ticker" in frame.columns
+        else np.full(len(frame), "")
+    )
+    report: Dict[str, object] = {"rows": len(frame), "missing": [], "columns": {}}
+    for col in INDICATOR_COLUMNS:
+        if col not in frame.columns:
+            report["missing"].append(col)
+            continue
+        stored = frame[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        fresh = computed[col].to_numpy()
+        both = ~np.isnan(stored) & ~np.isnan(fresh)
+        with np.errstate(invalid="ignore"):
+            bad = ~np.isclose(stored, fresh, rtol=rtol, atol=atol, equal_nan=True)
+        diff = np.abs(stored[both] - fresh[both])
+        report["columns"][col] = {
+            "mismatched": int(bad.sum()),
+            "max_abs_diff": float(diff.max()) if diff.size else 0.0,
+            "tickers": sorted(set(tickers[bad]) - {""}),
+        }
+    return report
+
+
+def format_verification(report: Dict[str, object]) -> str:
+    """Summarise a verify_indicators report, one line per mismatching column."""
+    columns = report["columns"]
+    failing = [col for col, result in columns.items() if result["mismatched"]]
+    lines: List[str] = [
+        f"Checked {len(columns)} indicator(s) over {report['rows']} rows: "
+        f"{len(failing)} mismatched"
+    ]
+    if report["missing"]:
+        lines.append(f"  missing: {', '.join(report['missing'])}")
+    for col in failing:
+        result = columns[col]
+        shown = ", ".join(result["tickers"][:5])
+        more = len(result["tickers"]) - 5
+        lines.append(
+            f"  {col}: {result['mismatched']} row(s), max diff {result['max_abs_diff']:.3g}"
+            + (f" ({shown}{f' and {more} more' if more > 0 else ''})" if shown else "")
+        )
+    return "\n".join(lines)
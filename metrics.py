@@ -4,11 +4,26 @@
 function and returns a flat dict of scalar metrics ready for display.
 """
 
-from typing import Any, Dict
+from typing import Any, Dict, Sequence
 
 import numpy as np
 import pandas as pd
 
+# Dataset columns compute_metrics reads in addition to the strategy output
+# (``daily_value`` / ``daily_returns``).  Callers use this to project the
+# history they load down to what the metrics actually need.
+METRIC_COLUMNS = (
+    "close",
+    "sma_200",
+    "return_1d",
+    "return_5d",
+    "return_20d",
+    "rsi_14",
+    "atr_14",
+    "volatility_20d",
+    "volume_ratio",
+)
+
 
 def compute_metrics(  # pylint: disable=too-many-locals
     results_df: pd.DataFrame, initial_capital: float
@@ -26,8 +41,9 @@ def compute_metrics(  # pylint: disable=too-many-locals
     Returns:
         Dict of metric name → scalar value (float).
     """
-    result = results_df.copy()
-    result = result.dropna(subset=["daily_value", "daily_returns"])
+    # Read-only: rows are filtered only when some are missing, and never copied otherwise.
+    complete = results_df[["daily_value", "daily_returns"]].notna().all(axis=1)
+    result = results_df if complete.all() else results_df[complete]
 
     daily_returns = result["daily_returns"]
 
@@ -76,3 +92,60 @@ def compute_metrics(  # pylint: disable=too-many-locals
         "Average 20D Volatility": avg_volatility_20d,
         "Average Volume Ratio": avg_volume_ratio,
     }
+
+
+def _forward_fill(values: np.ndarray) -> np.ndarray:
+    """Carry the last non-NaN value of each column down over NaNs."""
+    rows = np.where(np.isnan(values), 0, np.arange(len(values))[:, None])
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return values[rows, np.arange(values.shape[1])]
+
+
+def compute_matrix_metrics(
+    daily_value: np.ndarray, initial_capital: float, tickers: Sequence[str]
+) -> pd.DataFrame:
+    """Compute the calculated metrics of many backtests at once.
+
+    Vectorized counterpart of the first block of ``compute_metrics`` for a
+    date × ticker value matrix (e.g. from
+    ``strategies.buy_and_hold.buy_and_hold_matrix``).  NaN values are days
+    a ticker has no data; each column matches ``compute_metrics`` on that
+    ticker's rows alone.
+
+    Args:
+        daily_value: Portfolio values, shape ``(dates, tickers)``.
+        initial_capital: Starting cash in dollars, per ticker.
+        tickers: Column labels.
+
+    Returns:
+        DataFrame indexed by ticker with ``Total Return``,
+        ``Annualized Return``, ``Annualized Sharpe Ratio``, ``Max Drawdown``,
+        ``Annualized Volatility`` and ``Win Rate`` columns.  Tickers without
+        any value are NaN.
+    """
+    valid = ~np.isnan(daily_value)
+    days = valid.sum(axis=0)
+    filled = _forward_fill(daily_value)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        daily_returns = np.full(daily_value.shape, np.nan)
+        daily_returns[1:] = daily_value[1:] / filled[:-1] - 1
+        # Each ticker's first value has no prior day: a zero return, as in
+        # the strategies' ``pct_change().fillna(0)``.
+        first = valid & (np.cumsum(valid, axis=0) == 1)
+        daily_returns[first] = 0.0
+
+        total_return = filled[-1] / initial_capital - 1
+        mean = np.nansum(daily_returns, axis=0) / days
+        std = np.sqrt(np.nansum((daily_returns - mean) ** 2, axis=0) / (days - 1))
+        drawdown = daily_value / np.fmax.accumulate(daily_value, axis=0) - 1
+        return pd.DataFrame(
+            {
+                "Total Return": total_return,
+                "Annualized Return": (1 + total_return) ** (252 / days) - 1,
+                "Annualized Sharpe Ratio": mean / std * np.sqrt(252),
+                "Max Drawdown": np.fmin.reduce(drawdown, axis=0),
+                "Annualized Volatility": std * np.sqrt(252),
+                "Win Rate": (daily_returns > 0).sum(axis=0) / days,
+            },
+            index=pd.Index(tickers, name="ticker"),
+        )
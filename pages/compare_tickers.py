@@ -1,7 +1,7 @@
 """Compare multiple tickers under one or more strategies.
 
 This page reuses the existing pipeline:
-- `data_loading.load_all_data`
+- `data_loading.shared_dataset`
 - `stock_history.get_stock_history`
 - `strategies.run_strategy`
 
@@ -25,7 +25,8 @@ if REPO_ROOT not in sys.path:
 # These imports need the path above to work. 
 # With this, we will have to disable pylint errors for the imports.
 # pylint: disable=wrong-import-position,import-error
-from data_loading import load_all_data
+from backtester import BACKTEST_COLUMNS
+from data_loading import StockDataset, shared_dataset
 from metrics import compute_metrics
 from stock_history import get_stock_history
 from strategies import (
@@ -110,7 +111,10 @@ def prepare_dates(df: pd.DataFrame) -> pd.DataFrame:
         A copy of the table with dates cleaned up.
     """
     out = df.copy()
-    out["date"] = pd.to_datetime(out["date"]).dt.tz_localize(None)
+    dates = out["date"]
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates)
+    out["date"] = dates.dt.tz_localize(None)
     return out
 
 
@@ -296,15 +300,9 @@ def plot_moving_averages(
 COMPARISON_EXTRA_PLOTTERS["moving average crossover"] = plot_moving_averages
 
 
-@st.cache_data(show_spinner=False)
-def load_data_cached() -> pd.DataFrame:
-    """Load all the stock data once and remember it so we don't load again."""
-    return load_all_data()
-
-
-def available_tickers(data_df: pd.DataFrame) -> List[str]:
+def available_tickers(dataset: StockDataset) -> List[str]:
     """Get a sorted list of all ticker symbols in the data."""
-    return sorted(set(data_df["ticker"].dropna().astype(str).str.upper()))
+    return sorted({ticker.upper() for ticker in dataset.tickers})
 
 
 apply_shared_ui()
@@ -316,7 +314,8 @@ st.caption("Layer multiple tickers on the same strategy chart.")
 if st.button("Back to main page", type="secondary"):
     st.switch_page("home_page.py")
 
-data = load_data_cached()
+# The process-wide dataset; tickers are read only when compared.
+data = shared_dataset()
 all_tickers = available_tickers(data)
 
 st.write("")
@@ -402,7 +401,9 @@ if run:
 
         for ticker in selected_tickers:
             try:
-                prices = get_stock_history(ticker, start_arg, end_arg, data)
+                prices = get_stock_history(
+                    ticker, start_arg, end_arg, data, columns=BACKTEST_COLUMNS
+                )
                 results = run_strategy(prices, strategy_name, float(initial_capital), data)
                 summary = compute_metrics(results, float(initial_capital))
             except (ValueError, TypeError, UserWarning) as exc:
@@ -2,7 +2,10 @@
 
 import streamlit as st
 
-from data_loading import load_all_data
+import pandas as pd
+
+from catalog import load_catalog
+from data_loading import shared_dataset
 from ui_shared import apply_shared_ui
 
 apply_shared_ui()
@@ -15,16 +18,20 @@ if st.button("Back to main page", type="secondary"):
 
 st.write("")
 
-stocks_df = load_all_data()
-unique_pairs = (
-    stocks_df[["ticker", "company_name"]]
-    .drop_duplicates()
-    .sort_values("ticker")
+# Names, sectors and date ranges come from the catalog file, read in
+# milliseconds.  The first load without a current one builds it from the
+# ticker, date and label columns (not prices) and writes it for next time.
+catalog = load_catalog()
+company_names = catalog["company_name"].to_dict()
+footprint = shared_dataset().memory_footprint()
+st.caption(
+    f"{footprint['tickers']} tickers; "
+    f"{footprint['bytes'] / 2**20:.1f} MB of price data held in memory."
 )
 
 options = [
-    f"{row['ticker']}: {row['company_name']}"
-    for _, row in unique_pairs.iterrows()
+    f"{ticker}: {company_names[ticker]}"
+    for ticker in sorted(company_names)
 ]
 
 st.write("### Search and select a ticker")
@@ -36,6 +43,12 @@ selected_label = st.selectbox(
 
 if selected_label:
     st.success(f"You selected: {selected_label}")
+    entry = catalog.loc[selected_label.split(":", 1)[0]]
+    st.write(
+        f"Sector: {'Unknown' if pd.isna(entry['sector']) else entry['sector']} · "
+        f"{entry['first_date']:%Y-%m-%d} to {entry['last_date']:%Y-%m-%d} "
+        f"({entry['rows']} trading days)"
+    )
 
 st.write("")
 st.write("### All tickers")
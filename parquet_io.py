@@ -0,0 +1,326 @@
+"""Locate and read the Parquet files of a stock data source.
+
+A source is either a directory of per-ticker files (``data/AAPL.parquet``)
+or one consolidated file written by ``csv_to_parquet.py --consolidate``,
+sorted by ``(ticker, date)`` with one row group per ticker.  A directory
+may also hold rows appended by ``store_update.py`` under ``DELTA_DIR``.
+``source_paths`` lists the files behind either layout, and the readers
+here return frames with UTC dates and categorical string columns.
+"""
+
+import glob
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+DATA_DIR = "data"
+
+# String columns repeated on every row of a ticker.  They are loaded as
+# pandas categoricals (Arrow dictionaries): each row stores a small integer
+# code instead of a Python string, and equality checks compare codes.
+CATEGORICAL_COLUMNS = ("ticker", "company_name", "sector")
+
+# Derived indicator columns that the opt-in compact mode stores as float32.
+# Prices (open/high/low/close), volume, dividends and splits stay float64,
+# and strategies compute portfolio values from ``close``, so cash and
+# position accounting is unaffected.  Relative error of float32 is ~6e-8;
+# on the shipped AAPL history every compute_metrics output of every
+# strategy agrees with the float64 path to better than 1e-6 relative
+# (TestCompactMode in tests/test_additional_modules.py).
+INDICATOR_COLUMNS = (
+    "return_1d",
+    "return_5d",
+    "return_20d",
+    "log_return",
+    "sma_20",
+    "sma_50",
+    "sma_200",
+    "ema_12",
+    "rsi_14",
+    "macd",
+    "macd_signal",
+    "atr_14",
+    "volatility_20d",
+    "volume_sma_20",
+    "volume_ratio",
+    "high_52w",
+    "low_52w",
+    "bb_middle",
+    "bb_upper",
+    "bb_lower",
+)
+
+# Threads used to read Parquet files when the caller does not say.  Reading
+# is I/O and Arrow decoding, both of which release the GIL.  Override with
+# the TRADEREWIND_LOAD_WORKERS environment variable; 1 reads serially.
+DEFAULT_LOAD_WORKERS = int(
+    os.environ.get("TRADEREWIND_LOAD_WORKERS", min(32, (os.cpu_count() or 1) + 4))
+)
+
+# Subdirectory of a per-ticker data directory holding appended rows not yet
+# compacted into the base files:
+# ``_delta/<TICKER>/<TICKER>-<YYYYmmddTHHMMSS>.parquet`` (for example
+# ``AAPL-20300102T000000.parquet``), stamped with their first date and time
+# (UTC), so name order is date order.
+DELTA_DIR = "_delta"
+
+
+def projection(columns: Optional[Sequence[str]]) -> Optional[List[str]]:
+    """Normalise a ``columns=`` argument: ``None`` keeps every column."""
+    if columns is None:
+        return None
+    return list(dict.fromkeys(columns))
+
+
+def to_utc_dates(values: pd.Series, errors: str = "raise") -> pd.Series:
+    """Return *values* as tz-aware UTC datetimes.
+
+    A column that is already UTC is returned as-is, so callers can run this
+    on every read for the price of a dtype check.  ISO strings with a UTC
+    offset (``2016-01-04 00:00:00-05:00``, as in the shipped files) are
+    parsed by a single vectorised Arrow cast, far faster than
+    ``pd.to_datetime`` on mixed offsets; anything else falls back to
+    ``pd.to_datetime(..., utc=True, errors=errors)``.
+    """
+    dtype = values.dtype
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        return values if str(dtype.tz) == "UTC" else values.dt.tz_convert("UTC")
+    if dtype == object or isinstance(dtype, pd.StringDtype):
+        try:
+            parsed = pa.array(values, type=pa.string()).cast(pa.timestamp("ns", tz="UTC"))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            pass
+        else:
+            return pd.Series(parsed.to_pandas().array, index=values.index, name=values.name)
+    return pd.to_datetime(values, utc=True, errors=errors)
+
+
+def normalize_dates(frame: pd.DataFrame) -> pd.DataFrame:
+    """Convert the ``date`` column of *frame* to UTC datetimes in place.
+
+    Applied once as data is read, so downstream code can trust the column
+    instead of reparsing it.  Unparseable dates become ``NaT``.
+
+    Returns:
+        The same frame, for chaining.
+    """
+    if "date" in frame.columns:
+        frame["date"] = to_utc_dates(frame["date"], errors="coerce")
+    return frame
+
+
+def read_parquet_timed(path: str, columns: Optional[List[str]], filters=None):
+    """Read one Parquet file and return ``(frame, seconds)``."""
+    started = time.perf_counter()
+    frame = pd.read_parquet(
+        path,
+        columns=columns,
+        filters=filters,
+        read_dictionary=list(CATEGORICAL_COLUMNS),
+    )
+    normalize_dates(frame)
+    return frame, time.perf_counter() - started
+
+
+def date_filters(date_type: pa.DataType, start=None, end=None) -> list:
+    """Parquet filters keeping the rows dated within ``[start, end]``.
+
+    Timestamp columns are compared exactly.  String columns hold local ISO
+    dates with a UTC offset (``2016-01-04 00:00:00-05:00``), which sort by
+    local date, so the bounds are widened to whole dates a day either side
+    of the window; callers filter exactly once the dates are parsed.
+    """
+    filters = []
+    if pa.types.is_timestamp(date_type):
+        if start is not None:
+            filters.append(("date", ">=", pd.to_datetime(start, utc=True)))
+        if end is not None:
+            filters.append(("date", "<=", pd.to_datetime(end, utc=True)))
+        return filters
+    if start is not None:
+        lower = pd.to_datetime(start, utc=True) - pd.Timedelta(days=1)
+        filters.append(("date", ">=", lower.strftime("%Y-%m-%d")))
+    if end is not None:
+        upper = pd.to_datetime(end, utc=True) + pd.Timedelta(days=2)
+        filters.append(("date", "<", upper.strftime("%Y-%m-%d")))
+    return filters
+
+
+def compact_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """Downcast the ``INDICATOR_COLUMNS`` of *frame* to float32 in place.
+
+    Returns:
+        The same frame, for chaining.
+    """
+    for col in INDICATOR_COLUMNS:
+        if col in frame.columns and frame[col].dtype == np.float64:
+            frame[col] = frame[col].astype(np.float32)
+    return frame
+
+
+def concat_frames(frames: List[pd.DataFrame], compact: bool = False) -> pd.DataFrame:
+    """Concatenate per-file frames, keeping ``CATEGORICAL_COLUMNS`` categorical.
+
+    ``pd.concat`` falls back to object strings when categoricals have
+    different categories, so each frame's column is first recoded onto the
+    sorted union of categories.  The frames are modified in place.
+
+    Args:
+        frames: Frames to concatenate.
+        compact: Downcast indicators to float32 (``compact_frame``) per frame,
+            before concatenating, so the float64 copy is never built.
+    """
+    if compact:
+        for frame in frames:
+            compact_frame(frame)
+    for col in CATEGORICAL_COLUMNS:
+        present = [frame for frame in frames if col in frame.columns]
+        if not present:
+            continue
+        categories = set()
+        for frame in present:
+            if not isinstance(frame[col].dtype, pd.CategoricalDtype):
+                frame[col] = frame[col].astype("category")
+            categories.update(frame[col].cat.categories)
+        dtype = pd.CategoricalDtype(sorted(categories))
+        for frame in present:
+            frame[col] = frame[col].astype(dtype)
+    return pd.concat(frames)
+
+
+def read_parquet_files(
+    parquet_paths: Sequence[str],
+    columns: Optional[Sequence[str]] = None,
+    max_workers: Optional[int] = None,
+    timings: Optional[Dict[str, float]] = None,
+) -> List[pd.DataFrame]:
+    """Read several Parquet files, concurrently when allowed.
+
+    Frames are returned in the order of *parquet_paths* whatever order the
+    reads finish in, so concatenating them gives exactly the serial result.
+
+    Args:
+        parquet_paths: Files to read.
+        columns: Columns to read; ``None`` reads every column.
+        max_workers: Reader threads. ``None`` uses ``DEFAULT_LOAD_WORKERS``;
+            1 reads the files one after another.
+        timings: Optional dict filled with ``path -> seconds`` per file.
+
+    Returns:
+        One DataFrame per path.
+    """
+    selected = projection(columns)
+    workers = DEFAULT_LOAD_WORKERS if max_workers is None else max_workers
+
+    if workers <= 1 or len(parquet_paths) <= 1:
+        results = [read_parquet_timed(path, selected) for path in parquet_paths]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(
+                pool.map(lambda path: read_parquet_timed(path, selected), parquet_paths)
+            )
+
+    if timings is not None:
+        for path, (_, seconds) in zip(parquet_paths, results):
+            timings[path] = seconds
+
+    return [frame for frame, _ in results]
+
+
+def read_consolidated(
+    path: str,
+    tickers: Optional[Iterable[str]] = None,
+    columns: Optional[Sequence[str]] = None,
+    start=None,
+    end=None,
+) -> pd.DataFrame:
+    """Read a consolidated (ticker-sorted) Parquet file with pushed-down filters.
+
+    The ticker and date predicates are handed to the Parquet reader, which
+    skips every row group whose statistics rule it out, so only the row
+    groups of the requested tickers / dates are decompressed.
+
+    Args:
+        path: File written by ``csv_to_parquet.py --consolidate``.
+        tickers: Tickers to keep; ``None`` keeps all.
+        columns: Columns to read; ``None`` reads every column.
+        start: Earliest date to keep (inclusive, UTC); ``None`` for no bound.
+        end: Latest date to keep (inclusive, UTC); ``None`` for no bound.
+
+    Returns:
+        DataFrame of the matching rows, sorted by ticker then date.
+    """
+    filters = []
+    if tickers is not None:
+        filters.append(("ticker", "in", list(tickers)))
+    filters.extend(date_filters(pa.timestamp("ns", tz="UTC"), start, end))
+
+    table = pq.read_table(
+        path,
+        columns=projection(columns),
+        filters=filters or None,
+        read_dictionary=list(CATEGORICAL_COLUMNS),
+    )
+    return normalize_dates(table.unify_dictionaries().to_pandas())
+
+
+def ticker_delta_paths(source: str, ticker: str) -> List[str]:
+    """Return the delta files of *ticker* in the directory *source*, oldest first.
+
+    Only the ticker's ``DELTA_DIR`` folder is listed, so this is cheap
+    enough to call on every read.
+    """
+    return sorted(glob.glob(os.path.join(source, DELTA_DIR, glob.escape(ticker), "*.parquet")))
+
+
+def delta_paths(source: str = DATA_DIR) -> Dict[str, List[str]]:
+    """Map each ticker of the directory *source* to its delta files, oldest first.
+
+    Only the ``DELTA_DIR`` listing is read.
+    """
+    deltas: Dict[str, List[str]] = {}
+    for path in sorted(glob.glob(os.path.join(source, DELTA_DIR, "*", "*.parquet"))):
+        deltas.setdefault(os.path.basename(os.path.dirname(path)), []).append(path)
+    return deltas
+
+
+def source_paths(source: str) -> List[str]:
+    """Return the Parquet file(s) behind *source* (a directory or a file).
+
+    In a directory each ticker's delta files follow its base file, so
+    reading the paths in order keeps every ticker contiguous and in date
+    order.
+    """
+    if os.path.isfile(source):
+        return [source]
+    deltas = delta_paths(source)
+    paths = []
+    for path in sorted(glob.glob(os.path.join(source, "*.parquet"))):
+        paths.append(path)
+        paths.extend(deltas.get(os.path.splitext(os.path.basename(path))[0], []))
+    return paths
+
+
+def ticker_row_groups(metadata) -> Dict[str, List[int]]:
+    """Map each ticker to its row groups using only footer statistics.
+
+    Raises:
+        ValueError: If a row group mixes tickers (file is not ticker-sorted).
+    """
+    ticker_idx = metadata.schema.to_arrow_schema().get_field_index("ticker")
+    row_groups: Dict[str, List[int]] = {}
+    for group in range(metadata.num_row_groups):
+        stats = metadata.row_group(group).column(ticker_idx).statistics
+        if stats is None or not stats.has_min_max or stats.min != stats.max:
+            raise ValueError(
+                f"Row group {group} holds several tickers; rewrite the file "
+                "with csv_to_parquet.py --consolidate."
+            )
+        row_groups.setdefault(stats.min, []).append(group)
+    return row_groups
@@ -0,0 +1,257 @@
+"""Date × ticker price matrices for multi-ticker work.
+
+The dataset is stored long: one row per ``(ticker, date)``.  Comparisons,
+correlations and universe-wide backtests instead want every ticker aligned
+on one date axis, which ``build_price_matrix`` provides as dense NumPy
+arrays (rows are dates, columns are tickers)::
+
+    matrix = load_price_matrix(cache_dir=".cache")
+    close = matrix.field("close")          # shape (len(dates), len(tickers))
+    aapl = matrix.series("AAPL", "returns")
+
+``load_price_matrix`` keeps the built matrix in an uncompressed ``.npz``
+file keyed on the source files' signature, like the frame cache of
+``data_loading.load_all_data``.
+"""
+
+import hashlib
+import os
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from arrow_cache import DEFAULT_CACHE_DIR
+from data_loading import load_all_data
+from fingerprint import source_signature
+from parquet_io import DATA_DIR, source_paths, to_utc_dates
+
+# Fields held by a PriceMatrix.  ``returns`` is derived from ``close``.
+MATRIX_FIELDS: Tuple[str, ...] = ("close", "volume", "returns")
+
+
+class PriceMatrix:
+    """Dense, date-aligned arrays of one or more fields.
+
+    Each field is a float64 array of shape ``(len(dates), len(tickers))``
+    holding NaN where a ticker has no row for a date.  ``mask`` is ``True``
+    where the ticker has a row, so a listed day with a missing value can be
+    told apart from a day the ticker did not trade.
+
+    Attributes:
+        dates: Sorted, unique UTC dates (the row axis).
+        tickers: Sorted tickers (the column axis).
+        mask: Boolean array, ``True`` where a ``(date, ticker)`` row exists.
+    """
+
+    def __init__(
+        self,
+        dates: pd.DatetimeIndex,
+        tickers: pd.Index,
+        fields: Dict[str, np.ndarray],
+        mask: np.ndarray,
+    ):
+        self.dates = dates
+        self.tickers = tickers
+        self.mask = mask
+        self._fields = fields
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        """Names of the fields held, in build order."""
+        return tuple(self._fields)
+
+    def field(self, name: str) -> np.ndarray:
+        """Return the ``(dates, tickers)`` array of *name*.
+
+        Raises:
+            KeyError: If the matrix was built without *name*.
+        """
+        try:
+            return self._fields[name]
+        except KeyError as exc:
+            raise KeyError(f"Price matrix has no field '{name}'.") from exc
+
+    def frame(self, name: str) -> pd.DataFrame:
+        """Return *name* as a DataFrame indexed by date with one column per ticker."""
+        return pd.DataFrame(self.field(name), index=self.dates, columns=self.tickers, copy=False)
+
+    def series(self, ticker: str, name: str = "close") -> pd.Series:
+        """Return one ticker's *name* on the dates it has rows for.
+
+        Raises:
+            KeyError: If the ticker or field is not in the matrix.
+        """
+        position = self.tickers.get_indexer([ticker])[0]
+        if position < 0:
+            raise KeyError(f"Price matrix has no ticker '{ticker}'.")
+        rows = self.mask[:, position]
+        return pd.Series(self.field(name)[rows, position], index=self.dates[rows], name=name)
+
+    def select(
+        self,
+        tickers: Optional[Sequence[str]] = None,
+        start=None,
+        end=None,
+    ) -> "PriceMatrix":
+        """Return the sub-matrix of *tickers* between *start* and *end* (inclusive).
+
+        Dates are compared in UTC; ``None`` leaves that side unbounded.
+
+        Raises:
+            KeyError: If a ticker is not in the matrix.
+        """
+        columns = slice(None)
+        chosen = self.tickers
+        if tickers is not None:
+            columns = self.tickers.get_indexer(list(tickers))
+            if (columns < 0).any():
+                missing = [t for t, c in zip(tickers, columns) if c < 0]
+                raise KeyError(f"Price matrix has no ticker(s) {missing}.")
+            chosen = self.tickers[columns]
+        low = 0 if start is None else self.dates.searchsorted(to_utc_dates(pd.Series([start]))[0])
+        high = (
+            len(self.dates)
+            if end is None
+            else self.dates.searchsorted(to_utc_dates(pd.Series([end]))[0], side="right")
+        )
+        rows = slice(low, high)
+        return PriceMatrix(
+            self.dates[rows],
+            chosen,
+            {name: values[rows, columns] for name, values in self._fields.items()},
+            self.mask[rows, columns],
+        )
+
+
+def _returns(close: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Close-to-close returns along the date axis.
+
+    A return needs a row on both the date and the date before it, so the
+    first date of each ticker and the date after any gap are NaN.
+    """
+    returns = np.full(close.shape, np.nan)
+    both = mask[1:] & mask[:-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns[1:] = np.where(both, close[1:] / close[:-1] - 1, np.nan)
+    return returns
+
+
+def build_price_matrix(
+    frame: pd.DataFrame, fields: Sequence[str] = MATRIX_FIELDS
+) -> PriceMatrix:
+    """Pivot a long ``ticker`` / ``date`` frame into a PriceMatrix.
+
+    Args:
+        frame: Rows with ``ticker``, ``date`` and every stored field (all of
+            *fields* except ``returns``, which needs ``close``).
+        fields: Fields to build.  If a ``(ticker, date)`` pair repeats, the
+            last row wins.
+
+    Returns:
+        The matrix, with tickers and dates sorted.
+    """
+    dates = to_utc_dates(frame["date"]).to_numpy(dtype="datetime64[ns]")
+    date_axis, date_pos = np.unique(dates, return_inverse=True)
+    ticker_axis, ticker_pos = np.unique(
+        frame["ticker"].astype(str).to_numpy(), return_inverse=True
+    )
+    shape = (len(date_axis), len(ticker_axis))
+
+    mask = np.zeros(shape, dtype=bool)
+    mask[date_pos, ticker_pos] = True
+    values: Dict[str, np.ndarray] = {}
+    for name in fields:
+        source = "close" if name == "returns" else name
+        if source not in values:
+            matrix = np.full(shape, np.nan)
+            matrix[date_pos, ticker_pos] = frame[source].to_numpy(dtype=np.float64)
+            values[source] = matrix
+    if "returns" in fields:
+        values["returns"] = _returns(values["close"], mask)
+    return PriceMatrix(
+        pd.DatetimeIndex(date_axis).tz_localize("UTC"),
+        pd.Index(ticker_axis, name="ticker"),
+        {name: values[name] for name in fields},
+        mask,
+    )
+
+
+def _matrix_cache_path(cache_dir: str, source: str, fields: Sequence[str]) -> str:
+    """Return the cache file for *source* and *fields*."""
+    key = hashlib.sha256(f"{os.path.abspath(source)}\0{','.join(fields)}".encode())
+    return os.path.join(cache_dir, f"{key.hexdigest()[:16]}-matrix.npz")
+
+
+def _read_matrix_cache(path: str, signature: str) -> Optional[PriceMatrix]:
+    """Read the matrix cached at *path*, or return ``None`` if it is stale."""
+    if not os.path.isfile(path):
+        return None
+    try:
+        with np.load(path) as cached:
+            if str(cached["signature"]) != signature:
+                return None
+            return PriceMatrix(
+                pd.DatetimeIndex(cached["dates"]).tz_localize("UTC"),
+                pd.Index(cached["tickers"], name="ticker"),
+                {
+                    key[len("field_"):]: cached[key]
+                    for key in cached.files
+                    if key.startswith("field_")
+                },
+                cached["mask"],
+            )
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _write_matrix_cache(path: str, matrix: PriceMatrix, signature: str) -> None:
+    """Write *matrix* to *path*, renaming it into place once complete."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    partial = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez(
+        partial,
+        signature=np.array(signature),
+        dates=matrix.dates.tz_localize(None).to_numpy(),
+        tickers=matrix.tickers.to_numpy(dtype=str),
+        mask=matrix.mask,
+        **{f"field_{name}": matrix.field(name) for name in matrix.fields},
+    )
+    os.replace(partial, path)
+
+
+def load_price_matrix(
+    source: str = DATA_DIR,
+    cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+    fields: Sequence[str] = MATRIX_FIELDS,
+) -> PriceMatrix:
+    """Build the PriceMatrix of *source*, through a cache in *cache_dir*.
+
+    The cache is rebuilt whenever a source file is added, removed or
+    rewritten (see ``fingerprint.source_signature``).
+
+    Args:
+        source: Directory of per-ticker files or a consolidated file.
+        cache_dir: Directory for the cached matrix; ``None`` always builds.
+        fields: Fields to build (see ``MATRIX_FIELDS``).
+
+    Raises:
+        ValueError: If no Parquet files are found.
+
+    Returns:
+        The matrix.
+    """
+    stored = ["ticker", "date", *sorted({"close" if f == "returns" else f for f in fields})]
+    if cache_dir is None:
+        return build_price_matrix(load_all_data(stored, source=source), fields)
+
+    paths = source_paths(source)
+    if not paths:
+        raise ValueError("No Parquet files found.")
+    signature = source_signature(paths)
+    path = _matrix_cache_path(cache_dir, source, fields)
+    matrix = _read_matrix_cache(path, signature)
+    if matrix is None:
+        matrix = build_price_matrix(load_all_data(stored, source=source), fields)
+        _write_matrix_cache(path, matrix, signature)
+    return matrix
@@ -3,44 +3,60 @@
 Provides validation and date-filtered history for a single stock from the
 combined dataset. Used by the backtester and compare-tickers flow.
 """
+import weakref
+
+import numpy as np
 import pandas as pd
-from data_loading import load_all_data
+from data_loading import StockDataset, TickerResolver
+from parquet_io import to_utc_dates
+
+
+def _matches(column, value):
+    """Boolean row mask of ``column == value``.
+
+    Categorical columns are compared on their integer codes, after a single
+    hash lookup of *value* in the categories.
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        categories = column.cat.categories
+        if value not in categories:
+            return np.zeros(len(column), dtype=bool)
+        return column.cat.codes.to_numpy() == categories.get_loc(value)
+    return (column == value).to_numpy()
 
 
 def validate_stock(stock, stocks_df):
     """
     Validate a stock identifier against the dataframe.
 
+    `stocks_df` may be the combined DataFrame or a lazy StockDataset.
+
     - If `stock` is a ticker present in stocks_df['ticker'], return it.
     - If `stock` matches a company_name uniquely, return its ticker.
+    - Failing both, the same checks are retried ignoring case.
     - Otherwise, raise an error.
+
+    A StockDataset resolves through its cached TickerResolver; a DataFrame
+    is indexed afresh on each call.
     """
     if not stock:
         raise TypeError("Please provide a stock to analyze.")
 
     stock_str = str(stock).strip()
 
-    if stock_str in stocks_df["ticker"].values:
-        return stock_str
-
-    matches = stocks_df.loc[
-        stocks_df["company_name"] == stock_str,
-        "ticker",
-    ].unique()
-
-    if len(matches) == 1:
-        return matches[0]
-
-    if len(matches) > 1:
-        msg = (
-            f"Company name '{stock_str}' maps to multiple tickers: "
-            f"{matches.tolist()}"
+    ticker = _resolver_for(stocks_df).resolve(stock_str)
+    if ticker is None:
+        raise TypeError(
+            f"Stock '{stock_str}' is not available in the dataframe."
         )
-        raise ValueError(msg)
+    return ticker
 
-    raise TypeError(
-        f"Stock '{stock_str}' is not available in the dataframe."
-    )
+
+def _resolver_for(stocks_df):
+    """Return an object whose ``resolve`` maps a stock to its ticker."""
+    if isinstance(stocks_df, StockDataset):
+        return stocks_df
+    return TickerResolver.from_frame(stocks_df)
 
 
 def validate_date(start, end, stock_df):
@@ -48,14 +64,13 @@ def validate_date(start, end, stock_df):
     Validate and normalize start/end against the available date range
     of a single-stock dataframe.
     """
-    stock_df = stock_df.copy()
+    # Ensure timezone-aware UTC datetimes (a no-op for loaded data)
+    dates = to_utc_dates(stock_df["date"])
+    return _validate_range(start, end, dates.min(), dates.max())
 
-    # Ensure timezone-aware UTC datetimes
-    stock_df["date"] = pd.to_datetime(stock_df["date"], utc=True)
-
-    min_date = stock_df["date"].min()
-    max_date = stock_df["date"].max()
 
+def _validate_range(start, end, min_date, max_date):
+    """validate_date against a known ``[min_date, max_date]`` range."""
     # Convert start/end to UTC tz-aware
     start_ts = pd.to_datetime(start, utc=True) if start else min_date
     end_ts = pd.to_datetime(end, utc=True) if end else max_date
@@ -73,51 +88,123 @@ def validate_date(start, end, stock_df):
     return start_ts, end_ts
 
 
-def get_stock_history(stock, start=None, end=None, stocks_df=None):  # pylint: disable=too-many-branches
-    """Return a date-filtered history for a stock from the combined dataframe."""
-    if stocks_df is None or not isinstance(stocks_df, pd.DataFrame):
-        raise TypeError("A valid dataframe must be provided.")
+# Columns get_stock_history always needs, whatever projection is requested.
+HISTORY_KEY_COLUMNS = ("date", "ticker")
 
-    if stock in stocks_df["ticker"].values:
-        ticker = stock
+
+def _history_columns(columns):
+    """Return the projection for a history read, or None for all columns."""
+    if columns is None:
+        return None
+    return list(dict.fromkeys([*HISTORY_KEY_COLUMNS, *columns]))
+
+
+def _dataset_history(stock, dataset, start, end, columns=None):
+    """Resolve *stock* against a dataset and read only its rows.
+
+    Returns ``(stock_df, date_range)``.  When the dataset knows the ticker's
+    date range from Parquet statistics, the dates are validated against it
+    and the window is pushed into the read, so ``stock_df`` may hold only
+    the rows around ``[start, end]``; otherwise ``date_range`` is ``None``
+    and ``stock_df`` is the full history.
+    """
+    ticker = dataset.resolve(stock)
+    if ticker is None:
+        raise TypeError(f"Stock '{stock}' not found.")
+
+    date_range = dataset.date_range(ticker)
+    if date_range is None:
+        return dataset.history(ticker, columns), None
+    start_ts, end_ts = _validate_range(start, end, *date_range)
+    return dataset.history(ticker, columns, start_ts, end_ts), date_range
+
+
+
+def _date_window(stock_df, start_ts, end_ts):
+    """Return the rows of *stock_df* dated within ``[start_ts, end_ts]``.
+
+    Sorted dates are cut positionally, which gives a view rather than a
+    copy; unsorted ones fall back to a boolean mask.
+    """
+    dates = stock_df["date"]
+    if dates.is_monotonic_increasing:
+        low = dates.searchsorted(start_ts, side="left")
+        high = dates.searchsorted(end_ts, side="right")
+        # A fresh frame object over the same data, so the attrs and index
+        # set by the caller never reach the source.
+        return stock_df.iloc[low:high].copy(deep=False)
+    return stock_df[(dates >= start_ts) & (dates <= end_ts)]
+
+
+def get_stock_history(stock, start=None, end=None, stocks_df=None, columns=None):  # pylint: disable=too-many-branches,too-many-locals,too-many-statements
+    """Return a date-filtered history for a stock.
+
+    `stocks_df` may be the combined DataFrame or a StockDataset. A lazy
+    StockDataset reads only the requested ticker's file; a materialized one
+    (or ``StockDataset.from_frame``) slices its ticker index, where a plain
+    DataFrame needs a boolean scan over every row.
+
+    `columns` limits the returned columns (``date`` and ``ticker`` are always
+    kept). With a StockDataset the projection is pushed into the Parquet
+    read, so unrequested columns are never decoded. None returns every column.
+
+    With a StockDataset on disk the ticker and date window are pushed into
+    the Parquet reader as well: the available range comes from the file's
+    statistics and only the rows around the window are converted. The
+    ``requested_*``/``adjusted_*`` attrs are set from that range exactly as
+    they are for a full history.
+
+    The result shares its column data with the source wherever it can (a
+    date-sorted history is windowed positionally), so callers must treat it
+    as read-only and add columns to a ``copy(deep=False)`` instead.
+    """
+    projection = _history_columns(columns)
+    date_range = None
+
+    if isinstance(stocks_df, StockDataset):
+        stock_df, date_range = _dataset_history(
+            stock, stocks_df, start, end, projection
+        )
+    elif stocks_df is None or not isinstance(stocks_df, pd.DataFrame):
+        raise TypeError("A valid dataframe must be provided.")
     else:
-        matches = stocks_df.loc[
-            stocks_df["company_name"] == stock,
-            "ticker",
-        ].unique()
-
-        if len(matches) == 1:
-            ticker = matches[0]
-        elif len(matches) > 1:
-            msg = (
-                f"Company name '{stock}' maps to multiple tickers: "
-                f"{matches.tolist()}"
-            )
-            raise ValueError(msg)
-        else:
+        ticker = _resolver_for(stocks_df).resolve(stock)
+        if ticker is None:
             raise TypeError(f"Stock '{stock}' not found.")
+        ticker_rows = _matches(stocks_df["ticker"], ticker)
 
-    stock_df = stocks_df[stocks_df["ticker"] == ticker].copy()
-    if stock_df.empty:
-        raise ValueError(f"No data found for stock '{ticker}'.")
+        if projection is None:
+            stock_df = stocks_df[ticker_rows]
+        else:
+            missing = [col for col in projection if col not in stocks_df.columns]
+            if missing:
+                raise KeyError(f"Columns not found in the dataframe: {missing}")
+            stock_df = stocks_df.loc[ticker_rows, projection]
 
-    stock_df["date"] = pd.to_datetime(
-        stock_df["date"],
-        utc=True,
-        errors="coerce",
-    )
+    if stock_df.empty and date_range is None:
+        raise ValueError(f"No data found for stock '{stock}'.")
+
+    # Loaded data already holds UTC datetimes, so this is a dtype check and
+    # a NaT scan; only caller-built frames with string dates are parsed.
+    raw_dates = stock_df["date"]
+    dates = to_utc_dates(raw_dates, errors="coerce")
 
-    if stock_df["date"].isna().any():
+    if dates.isna().any():
         raise ValueError("Some dates could not be converted to datetime.")
 
-    start_ts, end_ts = validate_date(start, end, stock_df)
+    if dates is not raw_dates:
+        # assign() leaves the source frame (possibly a slice of the shared
+        # in-memory dataset) untouched.
+        stock_df = stock_df.assign(date=dates)
 
-    subset = stock_df[
-        (stock_df["date"] >= start_ts) & (stock_df["date"] <= end_ts)
-    ].copy()
+    if date_range is None:
+        min_date = stock_df["date"].min()
+        max_date = stock_df["date"].max()
+    else:
+        min_date, max_date = date_range
+    start_ts, end_ts = _validate_range(start, end, min_date, max_date)
 
-    min_date = stock_df["date"].min()
-    max_date = stock_df["date"].max()
+    subset = _date_window(stock_df, start_ts, end_ts)
 
     if start is not None:
         requested_start = pd.to_datetime(start, utc=True)
@@ -134,58 +221,155 @@ def get_stock_history(stock, start=None, end=None, stocks_df=None):  # pylint: d
     if subset.empty:
         raise ValueError("No data available for the requested date range.")
 
-    subset.reset_index(drop=True, inplace=True)
+    # A new index rather than reset_index(), which would copy every column.
+    subset.index = pd.RangeIndex(len(subset))
 
     return subset
 
 
-def build_market_series(stocks_df, stock, value_col="close"):
+class MarketSeries:
+    """One ticker's values on sorted UTC dates, indexed for date lookups.
+
+    ``next_nonzero`` is precomputed: for each position it holds the first
+    position at or after it whose value is non-zero (``len`` if none).  A
+    lookup is then one ``searchsorted`` and one array read, and
+    ``next_nonzero_dates`` answers many dates in a single vectorized pass.
     """
-    Build a time-indexed Series for a single stock's values,
-    used by next_nonzero_date.
+
+    def __init__(self, dates: pd.DatetimeIndex, values: np.ndarray, name: str = "close"):
+        """Index *values* on *dates* (UTC, sorted ascending)."""
+        self.dates = dates
+        self.values = values
+        self.name = name
+        self._stamps = dates.asi8
+        count = len(values)
+        nonzero = np.where(values != 0, np.arange(count), count)
+        self.next_nonzero = np.minimum.accumulate(nonzero[::-1])[::-1]
+
+    @classmethod
+    def from_series(cls, series: pd.Series) -> "MarketSeries":
+        """Build from a date-indexed Series (as returned by ``build_market_series``)."""
+        if not series.index.is_monotonic_increasing:
+            series = series.sort_index(kind="stable")
+        dates = pd.DatetimeIndex(to_utc_dates(series.index.to_series()), name="date")
+        return cls(dates, series.to_numpy(), series.name)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def to_series(self) -> pd.Series:
+        """Return the values as a Series indexed by date."""
+        return pd.Series(self.values, index=self.dates, name=self.name)
+
+    def _positions(self, stamps) -> np.ndarray:
+        """Position of each first non-zero value at or after the row on or before each stamp.
+
+        *stamps* are UTC nanoseconds.  ``-1`` where no row is on or before
+        the stamp, ``len(self)`` where no non-zero value follows.
+        """
+        rows = np.searchsorted(self._stamps, stamps, side="right") - 1
+        return np.where(rows >= 0, self.next_nonzero[np.maximum(rows, 0)], -1)
+
+    def next_nonzero_date(self, date) -> pd.Timestamp:
+        """Return the first date at or after *date* with a non-zero value.
+
+        *date* is first padded back to the last row on or before it; naive
+        dates are taken as UTC.
+
+        Raises:
+            ValueError: If no row is on or before *date*, or no non-zero
+                value follows it.
+        """
+        target = pd.Timestamp(date)
+        target = target.tz_localize("UTC") if target.tzinfo is None else target
+        position = int(self._positions(target.value))
+        if position < 0:
+            raise ValueError(f"No date at or before {date} found in index.")
+        if position >= len(self):
+            raise ValueError(f"No non-zero value found on or after {date}")
+        return self.dates[position]
+
+    def next_nonzero_dates(self, dates) -> pd.DatetimeIndex:
+        """Vectorized ``next_nonzero_date`` over *dates*; NaT where it would raise."""
+        stamps = to_utc_dates(pd.Series(dates)).to_numpy(dtype="datetime64[ns]")
+        positions = self._positions(stamps.view(np.int64))
+        valid = (positions >= 0) & (positions < len(self))
+        result = np.full(len(positions), np.datetime64("NaT"), dtype="datetime64[ns]")
+        result[valid] = self.dates.to_numpy(dtype="datetime64[ns]")[positions[valid]]
+        return pd.DatetimeIndex(result).tz_localize("UTC")
+
+
+# MarketSeries built from each StockDataset, per (ticker, column).  Entries
+# go away with their dataset.
+_MARKET_SERIES: "weakref.WeakKeyDictionary[StockDataset, dict]" = weakref.WeakKeyDictionary()
+
+
+def market_series(stocks_df, stock, value_col="close"):
+    """Return *stock*'s *value_col* as a ``MarketSeries``.
+
+    With a StockDataset only ``date`` and *value_col* are read, and the
+    result is cached per dataset, so repeated calls cost a dict lookup.
+    A plain DataFrame is filtered on each call.
+
+    Raises:
+        ValueError: If there are no rows for *stock*.
+        KeyError: If *value_col* is not a column.
     """
-    stock_df = stocks_df[stocks_df["ticker"] == stock].copy()
+    if isinstance(stocks_df, StockDataset):
+        cache = _MARKET_SERIES.setdefault(stocks_df, {})
+        key = (stock, value_col)
+        if key not in cache:
+            if stock not in stocks_df:
+                raise ValueError(f"No data found for stock '{stock}'.")
+            try:
+                stock_df = stocks_df.history(stock, ["date", value_col])
+            except (KeyError, ValueError) as exc:
+                raise KeyError(f"Column '{value_col}' not found for stock '{stock}'.") from exc
+            cache[key] = _series_from_rows(stock_df, stock, value_col)
+        return cache[key]
+    stock_df = stocks_df[_matches(stocks_df["ticker"], stock)]
+    return _series_from_rows(stock_df, stock, value_col)
+
+
+def _series_from_rows(stock_df, stock, value_col):
+    """Build the MarketSeries of one ticker's rows."""
     if stock_df.empty:
         raise ValueError(f"No data found for stock '{stock}'.")
-
-    stock_df["date"] = pd.to_datetime(stock_df["date"], utc=True)
-    stock_df = stock_df.sort_values("date").set_index("date")
-
     if value_col not in stock_df.columns:
         raise KeyError(f"Column '{value_col}' not found for stock '{stock}'.")
-
-    return stock_df[value_col]
+    dates = to_utc_dates(stock_df["date"])
+    values = stock_df[value_col].to_numpy()
+    if not dates.is_monotonic_increasing:
+        order = np.argsort(dates.to_numpy(), kind="stable")
+        dates, values = dates.iloc[order], values[order]
+    return MarketSeries(pd.DatetimeIndex(dates, name="date"), values, value_col)
 
 
-def next_nonzero_date(date, market_series):
-    """
-    Given a target date and a time-indexed Series (market_series),
-    return the first index at or after that date with a non-zero value.
+def build_market_series(stocks_df, stock, value_col="close"):
     """
-    target_ts = pd.to_datetime(date, utc=True)
-
-    indexer = market_series.index.get_indexer(
-        [target_ts],
-        method="pad",
-    )
-    if indexer.size == 0 or indexer[0] == -1:
-        msg = f"No date at or before {date} found in index."
-        raise ValueError(msg)
+    Build a time-indexed Series for a single stock's values,
+    used by next_nonzero_date.
 
-    idx = int(indexer[0])
+    See ``market_series`` for the cached, lookup-ready form.
+    """
+    return market_series(stocks_df, stock, value_col).to_series()
 
-    while idx < len(market_series.index) and market_series.iloc[idx] == 0:
-        idx += 1
 
-    if idx >= len(market_series.index):
-        msg = f"No non-zero value found on or after {date}"
-        raise ValueError(msg)
+def next_nonzero_date(date, market_series):  # pylint: disable=redefined-outer-name
+    """
+    Given a target date and a time-indexed Series (market_series),
+    return the first index at or after that date with a non-zero value.
 
-    return market_series.index[idx]
+    A ``MarketSeries`` is answered from its precomputed index; a plain
+    Series is indexed on each call.
+    """
+    if not isinstance(market_series, MarketSeries):
+        market_series = MarketSeries.from_series(market_series)
+    return market_series.next_nonzero_date(date)
 
 
 if __name__ == "__main__":
-    ALL_STOCKS_DF = load_all_data()
+    ALL_STOCKS_DF = StockDataset()
 
     STOCK_HISTORY = get_stock_history(
         "AAPL",
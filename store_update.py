@@ -0,0 +1,327 @@
+"""Append new trading days to the per-ticker Parquet store, and compact it.
+
+Usage::
+
+    # Append a CSV or Parquet file of new bars for any number of tickers
+    python store_update.py append new_bars.csv [--source data]
+
+    # Fold the appended rows back into each ticker's base file
+    python store_update.py compact [--source data]
+
+``append`` never rewrites history: each ticker's new rows go to a small
+delta file under ``parquet_io.DELTA_DIR``, which every reader in
+``data_loading`` merges after the base file.  A daily refresh therefore
+costs time in the rows added (plus a bounded warm-up read for the
+indicators, see ``INDICATOR_WARMUP``), not in the length of the history.
+``compact`` rewrites the base files of tickers with deltas, which is the
+full-history cost paid once in a while instead of every day.
+
+Readers list a ticker's delta files on every read, and
+``data_loading.shared_dataset`` replaces its handle once the files change,
+so a running app sees appended and compacted data without a restart.
+"""
+
+import argparse
+import glob
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from adjustment import TOTAL_RETURN_COLUMN
+from csv_to_parquet import apply_schema, categorize, read_source_file, write_with_stats
+from catalog import CATALOG_LABELS
+from data_loading import StockDataset
+from parquet_io import (
+    DATA_DIR,
+    DELTA_DIR,
+    INDICATOR_COLUMNS,
+    concat_frames,
+    delta_paths,
+    normalize_dates,
+)
+from indicators import OHLCV_INPUTS, TRADING_YEAR, compute_indicators
+
+# Stored rows read per ticker when appended bars lack the indicators.  The
+# longest window is a trading year; the exponential means (ema_12, macd)
+# forget their seed to within 1e-16 over two.
+INDICATOR_WARMUP = 2 * TRADING_YEAR
+
+# Columns appended bars may leave out: filled with 0 (no event), carried
+# forward from the stored history, or recomputed.
+EVENT_COLUMNS = ("dividends", "stock splits")
+DERIVED_COLUMNS = (*INDICATOR_COLUMNS, TOTAL_RETURN_COLUMN, *CATALOG_LABELS)
+
+# Tickers append_bars accepts, as they name files and folders: letters,
+# digits and ``. - ^ =`` (``BRK.B``, ``^GSPC``), never a path separator or a
+# leading ``.`` / ``_`` (hidden and ``DELTA_DIR`` entries).
+TICKER_PATTERN = re.compile(r"[A-Za-z0-9^][A-Za-z0-9.^=-]*")
+
+
+def _tail(paths: Sequence[str], columns: Sequence[str], rows: int) -> pd.DataFrame:
+    """Read the last *rows* rows of *paths* (oldest first), whole row groups at a time."""
+    parts: List[pd.DataFrame] = []
+    count = 0
+    for path in reversed(paths):
+        parquet_file = pq.ParquetFile(path)
+        present = [col for col in columns if col in parquet_file.schema_arrow.names]
+        for group in reversed(range(parquet_file.num_row_groups)):
+            part = parquet_file.read_row_group(group, columns=present).to_pandas()
+            parts.insert(0, normalize_dates(part))
+            count += len(part)
+            if count >= rows:
+                break
+        if count >= rows:
+            break
+    if not parts:
+        return pd.DataFrame(columns=list(columns))
+    return pd.concat(parts, ignore_index=True).iloc[-rows:].reset_index(drop=True)
+
+
+def _complete_bars(
+    rows: pd.DataFrame, reference: pd.DataFrame, history: Sequence[str]
+) -> pd.DataFrame:
+    """Give one ticker's new *rows* the columns and dtypes of *reference*.
+
+    Args:
+        rows: New bars of one ticker, sorted by date.
+        reference: Empty frame with the stored file's columns and dtypes.
+        history: The ticker's stored files, oldest first (empty for a new
+            ticker).
+
+    Missing columns must be ``EVENT_COLUMNS`` or ``DERIVED_COLUMNS``.
+    """
+    rows = rows.reset_index(drop=True)
+    missing = [col for col in reference.columns if col not in rows.columns]
+
+    tail = pd.DataFrame()
+    if history and any(col in DERIVED_COLUMNS for col in missing):
+        wanted = ["date", *OHLCV_INPUTS, TOTAL_RETURN_COLUMN, *CATALOG_LABELS]
+        tail = _tail(history, wanted, INDICATOR_WARMUP)
+    for col in missing:
+        if col in EVENT_COLUMNS:
+            rows[col] = 0.0
+        elif col in CATALOG_LABELS:
+            rows[col] = tail[col].iloc[-1] if col in tail.columns and len(tail) else None
+    computed = [col for col in missing if col in INDICATOR_COLUMNS]
+    if computed:
+        inputs = ["date", *OHLCV_INPUTS]
+        warm = tail[inputs] if len(tail) else rows[inputs].iloc[:0]
+        fresh = compute_indicators(pd.concat([warm, rows[inputs]], ignore_index=True))
+        for col in computed:
+            rows[col] = fresh[col].to_numpy()[len(warm):]
+    if TOTAL_RETURN_COLUMN in missing:
+        if TOTAL_RETURN_COLUMN in tail.columns and len(tail):
+            # Continue the stored index: it moves with the (adjusted) close.
+            scale = tail[TOTAL_RETURN_COLUMN].iloc[-1] / tail["close"].iloc[-1]
+        else:
+            scale = 1 / rows["close"].iloc[0]
+        rows[TOTAL_RETURN_COLUMN] = rows["close"] * scale
+
+    for col, dtype in reference.dtypes.items():
+        if col != "date" and dtype.kind in "biuf" and rows[col].dtype != dtype:
+            rows[col] = rows[col].astype(dtype)
+    return rows[list(reference.columns)]
+
+
+def _check_tickers(tickers: pd.Series, origin: str) -> None:
+    """Reject missing tickers, and tickers ``TICKER_PATTERN`` does not match.
+
+    Checked before the column is cast to ``str``, which would turn a
+    missing ticker into ``"None"`` or ``"nan"``.
+    """
+    unnamed = int((tickers.isna() | (tickers.astype(str).str.strip() == "")).sum())
+    if unnamed:
+        raise ValueError(f"{origin}: {unnamed} bar(s) have no ticker.")
+    unsafe = sorted(
+        {str(ticker) for ticker in tickers.unique() if not TICKER_PATTERN.fullmatch(str(ticker))}
+    )
+    if unsafe:
+        raise ValueError(f"{origin}: ticker(s) {unsafe} cannot name a file.")
+
+
+def append_bars(  # pylint: disable=too-many-locals
+    bars: pd.DataFrame, source: str = DATA_DIR, origin: str = "bars"
+) -> Dict[str, object]:
+    """Append *bars* to the per-ticker store in *source*.
+
+    Every ticker's bars are checked before anything is written: dates must
+    be unique and later than the ticker's last stored date, so appending
+    the same file twice fails instead of duplicating rows.  Each existing
+    ticker gets one delta file; a ticker new to the store gets a base
+    file.  Stored columns the bars lack are filled in (see
+    ``_complete_bars``): ``dividends`` / ``stock splits`` as 0, labels from
+    the last stored row, indicators and the total-return index from the
+    last ``INDICATOR_WARMUP`` stored rows.
+
+    Args:
+        bars: Rows with ``ticker``, ``date`` and any stored columns, for any
+            number of tickers.  Columns are cast to
+            ``csv_to_parquet.STOCK_SCHEMA`` strictly.
+        source: Directory of per-ticker files.
+        origin: Where *bars* came from, for error messages.
+
+    Raises:
+        ValueError: If *source* is not a directory of Parquet files, or a
+            bar does not fit the store (ticker, column, type or date).
+
+    Returns:
+        Report dict with ``appended`` (ticker -> rows written), ``created``
+        (tickers new to the store) and ``seconds``.
+    """
+    started = time.perf_counter()
+    dataset = StockDataset(source, cache_dir=None)
+    if not os.path.isdir(source) or dataset.empty:
+        raise ValueError(f"{source} is not a directory of per-ticker Parquet files.")
+    missing = [col for col in ("ticker", "date") if col not in bars.columns]
+    if missing:
+        raise ValueError(f"{origin}: missing column(s) {missing}.")
+    _check_tickers(bars["ticker"], origin)
+    bars = apply_schema(bars.copy(), origin)
+    bars["ticker"] = bars["ticker"].astype(str)
+    bars = bars.sort_values(["ticker", "date"], kind="stable")
+
+    reference_path = dataset.path_for(dataset.tickers[0])
+    stored = pq.read_schema(reference_path).names
+    extra = [col for col in bars.columns if col not in stored]
+    if extra:
+        raise ValueError(f"{origin}: column(s) {extra} are not in the store.")
+    underived = [
+        col for col in stored
+        if col not in bars.columns
+        and col not in (*EVENT_COLUMNS, *DERIVED_COLUMNS)
+        and not col.startswith("__")
+    ]
+    if underived:
+        raise ValueError(f"{origin}: missing column(s) {underived}, which cannot be derived.")
+
+    groups = []
+    for ticker, rows in bars.groupby("ticker", sort=True):
+        repeated = int(rows["date"].duplicated().sum())
+        if repeated:
+            raise ValueError(f"{origin}: {ticker} has {repeated} repeated date(s).")
+        if ticker in dataset:
+            last = dataset.date_range(ticker)
+            last = last[1] if last else _tail(dataset.paths_for(ticker), ["date"], 1)["date"].max()
+            if rows["date"].iloc[0] <= last:
+                raise ValueError(
+                    f"{origin}: {ticker} bars start at {rows['date'].iloc[0]}, not after "
+                    f"the last stored date {last}."
+                )
+        groups.append((ticker, rows))
+
+    report: Dict[str, object] = {"appended": {}, "created": []}
+    for ticker, rows in groups:
+        existing = ticker in dataset
+        base = dataset.path_for(ticker) if existing else reference_path
+        reference = pq.read_schema(base).empty_table().to_pandas()
+        frame = categorize(
+            _complete_bars(rows, reference, dataset.paths_for(ticker) if existing else [])
+        )
+        if existing:
+            folder = Path(source) / DELTA_DIR / ticker
+            folder.mkdir(parents=True, exist_ok=True)
+            path = folder / f"{ticker}-{rows['date'].iloc[0]:%Y%m%dT%H%M%S}.parquet"
+        else:
+            path = Path(source) / f"{ticker}.parquet"
+            report["created"].append(ticker)
+        write_with_stats(frame, path)
+        report["appended"][ticker] = len(frame)
+    report["seconds"] = time.perf_counter() - started
+    return report
+
+
+def compact_store(source: str = DATA_DIR, tickers: Optional[Sequence[str]] = None) -> List[str]:
+    """Fold each ticker's delta files into its base file.
+
+    Base files are rewritten in row groups of ``INDICATOR_WARMUP`` rows, so
+    appends read at most two row groups of history per ticker.  The deltas
+    are first moved aside (to ``DELTA_DIR/.<TICKER>``, which readers
+    ignore), the merged base file is renamed into place, then the deltas
+    are deleted.  A run interrupted part-way is finished by the
+    next one, which skips moved-aside rows the base file already holds.
+
+    Args:
+        source: Directory of per-ticker files.
+        tickers: Tickers to compact; ``None`` compacts every ticker with
+            deltas.
+
+    Returns:
+        The tickers compacted, sorted.
+    """
+    pending = {
+        os.path.basename(folder)[1:]: folder
+        for folder in glob.glob(os.path.join(source, DELTA_DIR, ".*"))
+    }
+    for ticker in delta_paths(source):
+        if tickers is None or ticker in tickers:
+            folder = os.path.join(source, DELTA_DIR, ticker)
+            aside = os.path.join(source, DELTA_DIR, f".{ticker}")
+            if ticker in pending:
+                # Left by an interrupted run: keep its files with the new ones.
+                for path in glob.glob(os.path.join(folder, "*.parquet")):
+                    os.replace(path, os.path.join(aside, os.path.basename(path)))
+                os.rmdir(folder)
+            else:
+                os.replace(folder, aside)
+            pending[ticker] = aside
+
+    compacted = []
+    for ticker, folder in sorted(pending.items()):
+        if tickers is not None and ticker not in tickers:
+            continue
+        base = Path(source) / f"{ticker}.parquet"
+        frames = [apply_schema(pd.read_parquet(base), base)]
+        last = frames[0]["date"].max()
+        for path in sorted(glob.glob(os.path.join(folder, "*.parquet"))):
+            delta = apply_schema(pd.read_parquet(path), path)
+            frames.append(delta[delta["date"] > last])
+        merged = categorize(concat_frames(frames).reset_index(drop=True))
+        # Row groups of INDICATOR_WARMUP rows keep the next appends' _tail short.
+        write_with_stats(merged, base, INDICATOR_WARMUP)
+        shutil.rmtree(folder)
+        compacted.append(ticker)
+    try:
+        os.rmdir(os.path.join(source, DELTA_DIR))
+    except OSError:
+        pass  # Missing, or other tickers still have deltas.
+    return compacted
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments for the store updater."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    append = commands.add_parser("append", help="Append a CSV or Parquet file of new bars")
+    append.add_argument("bars", type=Path, help="File of new bars (ticker, date, OHLCV, ...)")
+    compact = commands.add_parser("compact", help="Fold delta files into the base files")
+    compact.add_argument("tickers", nargs="*", help="Tickers to compact (default: all)")
+    for command in (append, compact):
+        command.add_argument(
+            "--source", default=DATA_DIR, help=f"Per-ticker data directory (default: {DATA_DIR})"
+        )
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Entry point: run the append or compact command."""
+    args = parse_args()
+    if args.command == "append":
+        report = append_bars(read_source_file(args.bars), args.source, str(args.bars))
+        rows = sum(report["appended"].values())
+        print(
+            f"Appended {rows} row(s) for {len(report['appended'])} ticker(s) "
+            f"({len(report['created'])} new) in {report['seconds']:.2f}s"
+        )
+    else:
+        compacted = compact_store(args.source, args.tickers or None)
+        print(f"Compacted {len(compacted)} ticker(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,9 +11,9 @@ Import from this package to keep backtester.py clean:
     from strategies import REGISTRY, run_strategy, get_strategy_display_names
 """
 
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
-from strategies.buy_and_hold import buy_and_hold
+from strategies.buy_and_hold import buy_and_hold, buy_and_hold_matrix
 from strategies.moving_average import moving_average_crossover
 from strategies.momentum import momentum
 
@@ -39,6 +39,12 @@ DISPLAY_NAMES: Dict[str, str] = {
     "momentum": "Momentum",
 }
 
+# Dataset columns every strategy reads from ``prices``.  Strategies compute
+# anything else they need (e.g. SMAs) themselves.  ``close`` is adjusted for
+# splits and dividends (see adjustment.py), so trading it earns the total
+# return and needs no per-run correction.
+REQUIRED_COLUMNS: Tuple[str, ...] = ("date", "close")
+
 # Optional: info text shown on home page when this strategy is selected.
 # Key = same as REGISTRY key. Omit if no callout needed.
 STRATEGY_INFO: Dict[str, str] = {
@@ -80,7 +86,8 @@ def run_strategy(prices, strategy: str, initial_capital: float, full_df, **kwarg
         prices: Date-filtered single-stock DataFrame.
         strategy: Human-readable strategy name (case-insensitive).
         initial_capital: Starting cash in dollars.
-        full_df: Full combined dataset passed through to strategies that
+        full_df: Full dataset (combined DataFrame or lazy
+            ``data_loading.StockDataset``) passed through to strategies that
             need market-wide context.
         **kwargs: Extra keyword arguments forwarded to the strategy function
             (e.g. ``lookback_days``, ``trade_proportion`` for momentum).
@@ -106,8 +113,10 @@ def run_strategy(prices, strategy: str, initial_capital: float, full_df, **kwarg
 __all__ = [
     "DISPLAY_NAMES",
     "REGISTRY",
+    "REQUIRED_COLUMNS",
     "STRATEGY_INFO",
     "buy_and_hold",
+    "buy_and_hold_matrix",
     "display_name_to_key",
     "get_strategy_display_names",
     "momentum",
@@ -15,8 +15,11 @@ The returned DataFrame contains every original column plus:
     drawdown       - rolling drawdown from the running portfolio peak
 """
 
+import numpy as np
 import pandas as pd
 
+from strategies.common import working_frame
+
 
 def buy_and_hold(
     prices: pd.DataFrame,
@@ -34,7 +37,7 @@ def buy_and_hold(
     Returns:
         DataFrame with strategy columns appended.
     """
-    result = prices.copy()
+    result = working_frame(prices)
 
     first_price = float(result["close"].iloc[0])
     shares = initial_capital / first_price
@@ -49,3 +52,25 @@ def buy_and_hold(
     )
 
     return result
+
+
+def buy_and_hold_matrix(close: np.ndarray, initial_capital: float) -> np.ndarray:
+    """Buy and hold every column of a date × ticker close matrix at once.
+
+    Vectorized counterpart of ``buy_and_hold`` for a
+    ``price_matrix.PriceMatrix``: each ticker invests *initial_capital* at
+    its first non-NaN close and holds.
+
+    Args:
+        close: Close prices, shape ``(dates, tickers)``, NaN where missing.
+        initial_capital: Starting cash in dollars, per ticker.
+
+    Returns:
+        Portfolio value per date and ticker (``daily_value``), NaN wherever
+        *close* is NaN.
+    """
+    valid = ~np.isnan(close)
+    first = valid.argmax(axis=0)
+    first_price = close[first, np.arange(close.shape[1])]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return close * (initial_capital / first_price)
@@ -0,0 +1,19 @@
+"""Helpers shared by the strategy modules.
+
+Kept out of ``strategies/__init__.py``, which imports every strategy
+module, so the strategies can import them without a cycle.
+"""
+
+import pandas as pd
+
+
+def working_frame(prices: pd.DataFrame) -> pd.DataFrame:
+    """Return the frame a strategy writes its columns into.
+
+    A shallow copy with a fresh ``RangeIndex``: strategies only add
+    columns, so the price columns are shared with *prices* rather than
+    copied, and the caller's frame is left unchanged.
+    """
+    result = prices.copy(deep=False)
+    result.index = pd.RangeIndex(len(result))
+    return result
@@ -28,6 +28,8 @@ The returned DataFrame contains every original column plus:
 import numpy as np
 import pandas as pd
 
+from strategies.common import working_frame
+
 # Default parameters (used when dispatched from the registry)
 DEFAULT_LOOKBACK_DAYS: int = 20
 DEFAULT_TRADE_PROPORTION: int = 10  # percent
@@ -129,8 +131,7 @@ def momentum(
     """
     _validate_inputs(prices, initial_capital)
 
-    result = prices.copy()
-    result = result.reset_index(drop=True)
+    result = working_frame(prices)
     result = _compute_momentum_trades(result, lookback_days)
     result = _simulate_momentum_trades(result, initial_capital, trade_proportion)
 
@@ -37,11 +37,14 @@ Edge cases handled
 * Non-positive ``initial_capital``        -> ``ValueError``
 * No crossover in the date range          -> stays 100 % cash; metrics compute
 * Multiple crossovers                     -> each transition is traded correctly
-* Input DataFrame not mutated             -> strategy works on an internal copy
+* Input DataFrame not mutated             -> strategy adds its columns to a
+                                             shallow copy (price data shared)
 """
 
 import pandas as pd
 
+from strategies.common import working_frame
+
 # Module-level constants
 
 SHORT_WINDOW: int = 50
@@ -94,7 +97,7 @@ def _validate_inputs(prices: pd.DataFrame, initial_capital: float) -> None:
 def _compute_sma_signals(price_df: pd.DataFrame) -> pd.DataFrame:
     """Add SMA columns and entry / exit signal columns to *price_df*.
 
-    Columns added (in-place on a copy):
+    Columns added (in-place on the working frame):
 
     * ``sma_50``  - 50-period rolling mean of ``close``
     * ``sma_200`` - 200-period rolling mean of ``close``
@@ -102,7 +105,7 @@ def _compute_sma_signals(price_df: pd.DataFrame) -> pd.DataFrame:
     * ``trade``   - diff of ``signal``: +1 buy, -1 sell, 0 hold
 
     Args:
-        price_df: Working copy with a ``close`` column.
+        price_df: Working frame with a ``close`` column.
 
     Returns:
         The same DataFrame with the four new columns appended.
@@ -209,8 +212,7 @@ def moving_average_crossover(
     """
     _validate_inputs(prices, initial_capital)
 
-    result = prices.copy()
-    result = result.reset_index(drop=True)
+    result = working_frame(prices)
     result = _compute_sma_signals(result)
     result = _simulate_trades(result, initial_capital)
 
@@ -0,0 +1,63 @@
+"""Builders shared by the TradeRewind test modules."""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+
+def make_prices(n, close_values=None, ticker="AAPL", company="Apple Inc."):
+    """Minimal DataFrame that satisfies strategy + metrics contracts."""
+    dates = pd.date_range("2000-01-03", periods=n, freq="B", tz="UTC")
+    closes = list(close_values) if close_values is not None else [100.0] * n
+    return pd.DataFrame({
+        "date": dates,
+        "close": closes,
+        "open": closes,
+        "high": closes,
+        "low": closes,
+        "volume": [1_000_000] * n,
+        "ticker": [ticker] * n,
+        "company_name": [company] * n,
+        "return_1d": [0.001] * n,
+        "return_5d": [0.005] * n,
+        "return_20d": [0.02] * n,
+        "sma_200": [100.0] * n,
+        "rsi_14": [50.0] * n,
+        "atr_14": [1.0] * n,
+        "volatility_20d": [0.01] * n,
+        "volume_ratio": [1.0] * n,
+    })
+
+
+OHLCV = ["open", "high", "low", "close", "volume"]
+
+
+def make_ticker_frames():
+    """The AAPL and MSFT histories that make up ``make_full_df``."""
+    return [
+        make_prices(250, ticker="AAPL", company="Apple Inc."),
+        make_prices(250, ticker="MSFT", company="Microsoft Corporation"),
+    ]
+
+
+def make_full_df():
+    """A small combined dataset with two tickers."""
+    return pd.concat(make_ticker_frames(), ignore_index=True)
+
+
+def temp_dir(test):
+    """Return a temporary directory removed when *test* finishes."""
+    path = Path(tempfile.mkdtemp())
+    test.addCleanup(shutil.rmtree, path, ignore_errors=True)
+    return path
+
+
+def write_store(directory, *frames):
+    """Write each frame to ``<directory>/<TICKER>.parquet`` and return *directory*."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for frame in frames:
+        frame.to_parquet(directory / f"{frame['ticker'].iloc[0]}.parquet", index=False)
+    return directory
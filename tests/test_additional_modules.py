@@ -1,26 +1,34 @@
 """Comprehensive tests for TradeRewind — targeting 100 % line coverage.
 
 Covers every module not already at 100 %:
-    metrics, data_loading, stock_history, backtester, csv_to_parquet,
+    metrics, stock_history, backtester, indicators, adjustment,
     graph_generation, ui_shared, charts/__init__, charts/common,
     charts/buy_and_hold_chart, charts/moving_average_chart,
     strategies/__init__ (remaining lines).
 
+The data store is tested in test_data_store.py (reading) and
+test_data_conversion.py (writing); helpers.py holds the shared builders.
+
 Run with::
 
-    python -m pytest tests/test_full_coverage.py -v --tb=short
+    python -m pytest tests/test_additional_modules.py -v --tb=short
 """
 # pylint: disable=unused-argument
 
 import tempfile
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
 import unittest
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from helpers import make_full_df, make_prices, make_ticker_frames, temp_dir, write_store
+
 from charts.common import prepare_plot_df
 from charts import strategy_dashboard
 from charts.buy_and_hold_chart import build as bah_build
@@ -29,18 +37,36 @@ from charts.common import(
     add_portfolio_traces,
     build_metrics_df,
 )
-from csv_to_parquet import convert_csv_file, convert_folder
-from data_loading import load_all_data
+from csv_to_parquet import (
+    convert_csv_file,
+    convert_folder,
+    verify_folder,
+)
+from data_loading import (
+    StockDataset,
+    TickerResolver,
+    shared_dataset,
+)
+from parquet_io import INDICATOR_COLUMNS
+from adjustment import TOTAL_RETURN_COLUMN, adjust_prices, adjustment_factors
+from indicators import compute_indicators, format_verification, verify_indicators
 from metrics import compute_metrics
 from strategies import display_name_to_key, get_strategy_display_names
 from strategies.moving_average import moving_average_crossover
 from strategies.buy_and_hold import buy_and_hold
-from backtester import main_backtest, InvalidTickerError
+from backtester import (
+    BACKTEST_COLUMNS,
+    InvalidTickerError,
+    get_dataset,
+    main_backtest,
+    preload,
+)
 from stock_history import(
     validate_stock,
     validate_date,
     get_stock_history,
     build_market_series,
+    market_series,
     next_nonzero_date,
 )
 from ui_shared import render_logo, apply_shared_ui
@@ -50,37 +76,6 @@ from charts.moving_average_chart import(
     _add_trade_markers,
 )
 from ui_shared import inject_custom_style
-# Helpers
-
-def _make_prices(n, close_values=None, ticker="AAPL", company="Apple Inc."):
-    """Minimal DataFrame that satisfies strategy + metrics contracts."""
-    dates = pd.date_range("2000-01-03", periods=n, freq="B", tz="UTC")
-    closes = list(close_values) if close_values is not None else [100.0] * n
-    return pd.DataFrame({
-        "date": dates,
-        "close": closes,
-        "open": closes,
-        "high": closes,
-        "low": closes,
-        "volume": [1_000_000] * n,
-        "ticker": [ticker] * n,
-        "company_name": [company] * n,
-        "return_1d": [0.001] * n,
-        "return_5d": [0.005] * n,
-        "return_20d": [0.02] * n,
-        "sma_200": [100.0] * n,
-        "rsi_14": [50.0] * n,
-        "atr_14": [1.0] * n,
-        "volatility_20d": [0.01] * n,
-        "volume_ratio": [1.0] * n,
-    })
-
-
-def _make_full_df():
-    """A small combined dataset with two tickers."""
-    a = _make_prices(250, ticker="AAPL", company="Apple Inc.")
-    b = _make_prices(250, ticker="MSFT", company="Microsoft Corporation")
-    return pd.concat([a, b], ignore_index=True)
 
 
 # metrics.py
@@ -89,7 +84,7 @@ class TestComputeMetrics(unittest.TestCase):
     from an enriched strategy DataFrame."""
 
     def _run(self, n=50):
-        df = _make_prices(n, close_values=[100.0 + i * 0.5 for i in range(n)])
+        df = make_prices(n, close_values=[100.0 + i * 0.5 for i in range(n)])
         # Simulate buy-and-hold columns needed by compute_metrics
         shares = 10000.0 / df["close"].iloc[0]
         df["position"] = shares
@@ -126,29 +121,12 @@ class TestComputeMetrics(unittest.TestCase):
         self.assertLessEqual(self._run()["Max Drawdown"], 0)
 
 
-# data_loading.py
-class TestLoadAllData(unittest.TestCase):
-    """Verify load_all_data reads parquet files and handles missing data."""
-
-    def test_returns_dataframe(self):
-        """Loading the real ./data directory should produce a non-empty DataFrame."""
-        df = load_all_data()
-        self.assertIsInstance(df, pd.DataFrame)
-        self.assertGreater(len(df), 0)
-
-    def test_raises_when_no_files(self):
-        """A ValueError should be raised when no parquet files exist."""
-        with patch("data_loading.glob.glob", return_value=[]):
-            with self.assertRaises(ValueError):
-                load_all_data()
-
-
 # stock_history.py
 class TestValidateStock(unittest.TestCase):
     """Verify validate_stock resolves tickers and company names correctly."""
 
     def setUp(self):
-        self.df = _make_full_df()
+        self.df = make_full_df()
 
     def test_valid_ticker(self):
         """A known ticker symbol should be returned as-is."""
@@ -180,12 +158,58 @@ class TestValidateStock(unittest.TestCase):
         with self.assertRaises(ValueError):
             validate_stock("Apple Inc.", df)
 
+    def test_categorical_columns(self):
+        """Categorical ticker/company columns should resolve like object columns."""
+        df = self.df.astype({"ticker": "category", "company_name": "category"})
+        self.assertEqual(validate_stock("AAPL", df), "AAPL")
+        self.assertEqual(validate_stock("Microsoft Corporation", df), "MSFT")
+        # An unused category is not an available ticker.
+        with self.assertRaises(TypeError):
+            validate_stock("AAPL", df[df["ticker"] != "AAPL"])
+
+
+class TestTickerResolver(unittest.TestCase):
+    """Verify TickerResolver and its use by validate_stock / get_stock_history."""
+
+    def setUp(self):
+        self.df = make_full_df()
+
+    def test_case_insensitive_aliases(self):
+        """Tickers and company names should resolve regardless of case."""
+        resolver = TickerResolver.from_frame(self.df)
+        self.assertEqual(resolver.resolve("msft"), "MSFT")
+        self.assertEqual(resolver.resolve("APPLE INC."), "AAPL")
+        self.assertIsNone(resolver.resolve("zzzz"))
+        self.assertEqual(validate_stock("aapl", self.df), "AAPL")
+        self.assertEqual(len(get_stock_history("microsoft corporation", None, None, self.df)), 250)
+
+    def test_ambiguous_alias_raises(self):
+        """A name shared by several tickers should stay ambiguous in any case."""
+        resolver = TickerResolver([("AAPL", "Apple Inc."), ("APC", "Apple Inc.")])
+        self.assertEqual(resolver.tickers_for_company("Apple Inc."), ["AAPL", "APC"])
+        for name in ("Apple Inc.", "apple inc."):
+            with self.assertRaises(ValueError):
+                resolver.resolve(name)
+
+    def test_dataset_builds_resolver_once(self):
+        """A dataset should read company names once and answer tickers without them."""
+        dataset = StockDataset.from_frame(self.df)
+        with patch.object(
+            StockDataset, "company_names", autospec=True,
+            side_effect=StockDataset.company_names,
+        ) as mock_names:
+            self.assertEqual(validate_stock("AAPL", dataset), "AAPL")
+            mock_names.assert_not_called()
+            for _ in range(3):
+                self.assertEqual(validate_stock("Apple Inc.", dataset), "AAPL")
+        self.assertEqual(mock_names.call_count, 1)
+
 
 class TestValidateDate(unittest.TestCase):
     """Verify validate_date normalizes and rejects invalid date ranges."""
 
     def setUp(self):
-        self.df = _make_prices(250, ticker="AAPL")
+        self.df = make_prices(250, ticker="AAPL")
 
     def test_none_dates_use_min_max(self):
         """Passing None for both dates should default to the full data range."""
@@ -208,7 +232,7 @@ class TestGetStockHistory(unittest.TestCase):
     """Verify get_stock_history filters data correctly and raises on bad input."""
 
     def setUp(self):
-        self.df = _make_full_df()
+        self.df = make_full_df()
 
     def test_returns_dataframe(self):
         """Valid ticker with no date constraints should return a non-empty DataFrame."""
@@ -243,6 +267,14 @@ class TestGetStockHistory(unittest.TestCase):
         with self.assertRaises(ValueError):
             get_stock_history("Apple Inc.", None, None, df)
 
+    def test_categorical_ticker_history(self):
+        """Histories from a categorical frame should match the object-dtype result."""
+        df = self.df.astype({"ticker": "category", "company_name": "category"})
+        result = get_stock_history("Apple Inc.", None, None, df)
+        expected = get_stock_history("AAPL", None, None, self.df)
+        self.assertEqual(len(result), len(expected))
+        self.assertTrue((result["ticker"] == "AAPL").all())
+
     def test_empty_stock_data_raises(self):
         """Requesting a ticker with no rows in the df should raise TypeError."""
         df = self.df.copy()
@@ -252,7 +284,7 @@ class TestGetStockHistory(unittest.TestCase):
 
     def test_date_coercion_error(self):
         """Unparseable date strings in the data should raise ValueError."""
-        df = _make_prices(10, ticker="TEST")
+        df = make_prices(10, ticker="TEST")
         df["date"] = "not-a-date"
         with self.assertRaises(ValueError):
             get_stock_history("TEST", None, None, df)
@@ -272,19 +304,91 @@ class TestGetStockHistory(unittest.TestCase):
         result = get_stock_history("AAPL", None, "2090-01-01", self.df)
         self.assertIn("adjusted_end_date", result.attrs)
 
+    def test_column_projection(self):
+        """Only the requested columns (plus date and ticker) should be returned."""
+        result = get_stock_history("AAPL", None, None, self.df, columns=["close", "rsi_14"])
+        self.assertEqual(list(result.columns), ["date", "ticker", "close", "rsi_14"])
+
+    def test_missing_projected_column_raises(self):
+        """Projecting a column the dataframe does not have should raise KeyError."""
+        with self.assertRaises(KeyError):
+            get_stock_history("AAPL", None, None, self.df, columns=["nonexistent"])
+
     def test_empty_result_after_filter_raises(self):
         """If date filtering produces zero rows, a ValueError should be raised."""
-        df = _make_prices(10, ticker="XX")
+        df = make_prices(10, ticker="XX")
         df["date"] = pd.to_datetime("2000-01-03", utc=True)
         with self.assertRaises(ValueError):
             get_stock_history("XX", "2020-01-01", "2020-06-01", df)
 
 
+class TestHistoryFromDataset(unittest.TestCase):
+    """Verify stock_history reads a lazy StockDataset one ticker at a time."""
+
+    def setUp(self):
+        self.data_dir = str(write_store(temp_dir(self), *make_ticker_frames()))
+        self.dataset = StockDataset(self.data_dir)
+
+    def test_get_stock_history_projection(self):
+        """Projected histories keep date and ticker plus the requested columns."""
+        result = get_stock_history("AAPL", None, None, self.dataset, columns=["close"])
+        self.assertEqual(list(result.columns), ["date", "ticker", "close"])
+
+    def test_company_lookup(self):
+        """Company names should map back to their tickers."""
+        self.assertEqual(self.dataset.tickers_for_company("Apple Inc."), ["AAPL"])
+        self.assertEqual(validate_stock("Apple Inc.", self.dataset), "AAPL")
+        self.assertEqual(validate_stock("MSFT", self.dataset), "MSFT")
+
+    def test_get_stock_history_touches_one_file(self):
+        """A ticker history from the lazy dataset should read a single file."""
+        with patch("data_loading.pd.read_parquet", wraps=pd.read_parquet) as mock_read:
+            result = get_stock_history("AAPL", "2000-02-01", None, self.dataset)
+        self.assertEqual(mock_read.call_count, 1)
+        self.assertEqual(set(result["ticker"]), {"AAPL"})
+        self.assertGreater(len(result), 0)
+
+    def test_pushdown_matches_dataframe_path(self):
+        """Pushed-down windows should match the DataFrame path, attrs included."""
+        frame = self.dataset.load(["AAPL"])
+        for start, end in [("1999-06-01", "2000-03-01"), ("2000-06-01", "2001-06-01")]:
+            lazy = get_stock_history("AAPL", start, end, self.dataset)
+            eager = get_stock_history("AAPL", start, end, frame)
+            pd.testing.assert_frame_equal(lazy, eager)
+            self.assertEqual(lazy.attrs, eager.attrs)
+        with self.assertRaises(ValueError):
+            get_stock_history("AAPL", "1990-01-01", "1990-06-01", self.dataset)
+
+    def test_pushdown_with_string_dates(self):
+        """String dates with UTC offsets should still be filtered exactly."""
+        prices = make_prices(60)
+        prices["date"] = prices["date"].dt.tz_convert("America/New_York").astype(str)
+        with tempfile.TemporaryDirectory() as tmp:
+            prices.to_parquet(Path(tmp) / "AAPL.parquet", index=False)
+            dataset = StockDataset(tmp)
+            self.assertEqual(dataset.date_range("AAPL")[0], make_prices(1)["date"].iloc[0])
+            result = get_stock_history("AAPL", "2000-01-10", "2000-01-14", dataset)
+        self.assertEqual(len(result), 5)
+        self.assertEqual(str(result["date"].dt.tz), "UTC")
+
+    def test_get_stock_history_unknown_raises(self):
+        """An unknown stock in the lazy dataset should raise TypeError."""
+        with self.assertRaises(TypeError):
+            get_stock_history("ZZZZ", None, None, self.dataset)
+
+    def test_build_market_series_from_dataset(self):
+        """build_market_series should accept the lazy dataset as well."""
+        series = build_market_series(self.dataset, "MSFT")
+        self.assertEqual(len(series), 250)
+        with self.assertRaises(ValueError):
+            build_market_series(self.dataset, "ZZZZ")
+
+
 class TestBuildMarketSeries(unittest.TestCase):
     """Verify build_market_series extracts a time-indexed Series for a stock."""
 
     def setUp(self):
-        self.df = _make_full_df()
+        self.df = make_full_df()
 
     def test_returns_series(self):
         """A valid ticker should produce a pandas Series of close prices."""
@@ -306,7 +410,7 @@ class TestNextNonzeroDate(unittest.TestCase):
     """Verify next_nonzero_date finds the first non-zero value at or after a date."""
 
     def setUp(self):
-        self.df = _make_full_df()
+        self.df = make_full_df()
         self.series = build_market_series(self.df, "AAPL")
 
     def test_returns_timestamp(self):
@@ -334,18 +438,60 @@ class TestNextNonzeroDate(unittest.TestCase):
         with self.assertRaises(ValueError):
             next_nonzero_date(s.index[0], s)
 
+
+class TestMarketSeries(unittest.TestCase):
+    """Verify MarketSeries lookups against the original forward scan."""
+
+    def setUp(self):
+        values = [0, 0, 5, 0, 7, 0, 0, 3, 0, 0]
+        self.df = make_prices(10, close_values=values)
+        self.series = market_series(self.df, "AAPL")
+
+    def _scan(self, date):
+        """The original walk: pad back, then step forward over zeros."""
+        position = self.series.dates.searchsorted(pd.Timestamp(date), side="right") - 1
+        while position < len(self.series) and self.series.values[position] == 0:
+            position += 1
+        return self.series.dates[position] if position < len(self.series) else pd.NaT
+
+    def test_matches_scan_and_batch(self):
+        """Single and batch lookups should agree with a forward scan on every date."""
+        dates = self.series.dates[:8] + pd.Timedelta(hours=12)
+        expected = [self._scan(date) for date in dates]
+        self.assertEqual([self.series.next_nonzero_date(d) for d in dates], expected)
+        self.assertEqual(list(self.series.next_nonzero_dates(dates)), expected)
+        self.assertEqual(next_nonzero_date(dates[3], self.series), expected[3])
+
+    def test_batch_marks_misses_as_nat(self):
+        """Dates before the series or after its last non-zero value give NaT."""
+        found = self.series.next_nonzero_dates(["1999-01-01", self.series.dates[-1]])
+        self.assertTrue(found.isna().all())
+        with self.assertRaises(ValueError):
+            self.series.next_nonzero_date(self.series.dates[-1])
+
+    def test_cached_per_dataset(self):
+        """A StockDataset's series should be read once and reused."""
+        dataset = StockDataset.from_frame(make_full_df())
+        with patch.object(dataset, "history", wraps=dataset.history) as mock_history:
+            first = market_series(dataset, "MSFT")
+            self.assertIs(market_series(dataset, "MSFT"), first)
+        mock_history.assert_called_once_with("MSFT", ["date", "close"])
+        with self.assertRaises(KeyError):
+            market_series(dataset, "MSFT", value_col="nonexistent")
+
+
 # backtester.py
 class TestBacktester(unittest.TestCase):
     """Verify main_backtest orchestrates the pipeline and handles bad data."""
 
-    @patch("backtester.df", _make_full_df())
+    @patch("backtester.get_dataset", make_full_df)
     @patch("backtester.get_stock_history")
     @patch("backtester.run_strategy")
     @patch("backtester.compute_metrics")
     @patch("backtester.strategy_dashboard")
     def test_main_backtest_returns_tuple(self, mock_dash, mock_met, mock_strat, mock_hist):
         """A successful backtest should return (results_df, summary_dict, figure, metrics_df)."""
-        prices = _make_prices(50)
+        prices = make_prices(50)
         results = prices.copy()
         results["daily_value"] = 10000.0
         results["daily_returns"] = 0.0
@@ -358,52 +504,196 @@ class TestBacktester(unittest.TestCase):
         r, s, f, m = main_backtest("AAPL", None, None, "Buy and Hold", 10000.0)
         self.assertIsInstance(s, dict)
         self.assertIsInstance(f, go.Figure)
+        self.assertEqual(mock_hist.call_args.kwargs["columns"], BACKTEST_COLUMNS)
 
-    @patch("backtester.df", pd.DataFrame())
+    @patch("backtester.get_dataset", pd.DataFrame)
     def test_main_backtest_empty_df_raises(self):
-        """An empty module-level DataFrame should raise InvalidTickerError."""
+        """An empty shared dataset should raise InvalidTickerError."""
         with self.assertRaises(InvalidTickerError):
             main_backtest("AAPL", None, None, "Buy and Hold", 10000.0)
 
-    @patch("backtester.df", None)
-    def test_main_backtest_none_df_raises(self):
-        """A None module-level DataFrame should raise InvalidTickerError."""
+    @patch("backtester.get_dataset", return_value=None)
+    def test_main_backtest_none_df_raises(self, mock_get):
+        """A missing dataset should raise InvalidTickerError."""
         with self.assertRaises(InvalidTickerError):
             main_backtest("AAPL", None, None, "Buy and Hold", 10000.0)
 
-# csv_to_parquet.py
-class TestCsvToParquet(unittest.TestCase):
-    """Verify CSV-to-Parquet conversion for single files and entire folders."""
+    @patch("backtester.strategy_dashboard", return_value=(None, None))
+    def test_main_backtest_peak_allocation(self, mock_dash):
+        """A backtest should allocate little beyond its own history and columns.
+
+        The history is a view of the in-memory dataset and strategies add
+        columns to shallow copies, so the traced peak is about 2-2.7 times
+        the history's size (it was 7.5-9 with the old copies); each full
+        copy of the history adds about one more multiple.
+        """
+        rows = 20_000
+        prices = make_prices(rows, close_values=np.linspace(50.0, 150.0, rows))
+        dataset = StockDataset.from_frame(prices)
+        history_bytes = prices[list(BACKTEST_COLUMNS)].memory_usage(index=False).sum()
+        before = prices.copy()
+        with patch("backtester.get_dataset", return_value=dataset):
+            for strategy in ("Buy and Hold", "Moving Average Crossover", "Momentum"):
+                main_backtest("AAPL", None, None, strategy, 10000.0)
+                tracemalloc.start()
+                try:
+                    main_backtest("AAPL", None, None, strategy, 10000.0)
+                    peak = tracemalloc.get_traced_memory()[1]
+                finally:
+                    tracemalloc.stop()
+                self.assertLess(peak, 3.5 * history_bytes, strategy)
+        pd.testing.assert_frame_equal(dataset.materialize()[list(before.columns)], before)
+
+    @patch.dict("data_loading._SHARED", clear=True)
+    @patch("data_loading.StockDataset")
+    def test_dataset_created_once_on_first_use(self, mock_dataset):
+        """Concurrent first calls should share one lazily created dataset."""
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            handles = list(pool.map(lambda _: get_dataset(), range(32)))
+        mock_dataset.assert_called_once_with("data")
+        self.assertTrue(all(handle is handles[0] for handle in handles))
+
+    @patch.dict("data_loading._SHARED", clear=True)
+    @patch("data_loading.StockDataset")
+    def test_preload_materializes(self, mock_dataset):
+        """preload(materialize=True) should load the shared dataset into memory."""
+        mock_dataset.return_value.is_materialized = False
+        self.assertIs(preload(), mock_dataset.return_value)
+        mock_dataset.return_value.materialize.assert_not_called()
+        preload(materialize=True)
+        mock_dataset.return_value.materialize.assert_called_once_with()
+        self.assertIs(shared_dataset(), get_dataset())
+
+
+# indicators.py
+class TestIndicators(unittest.TestCase):
+    """Verify the indicator recomputation and its ingest and verify modes."""
 
-    def test_convert_csv_file(self):
-        """A single CSV should be converted to a readable Parquet file."""
-        with tempfile.TemporaryDirectory() as tmp:
-            csv_path = Path(tmp) / "test.csv"
-            pd.DataFrame({"a": [1, 2]}).to_csv(csv_path, index=False)
-            out = convert_csv_file(csv_path, Path(tmp))
-            self.assertTrue(out.exists())
-            df = pd.read_parquet(out)
-            self.assertEqual(len(df), 2)
-
-    def test_convert_folder(self):
-        """All CSVs in a folder should each produce a corresponding Parquet file."""
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        frames = []
+        for ticker in ("AAPL", "MSFT"):
+            closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 300)))
+            frame = make_prices(300, closes, ticker=ticker)
+            frame["high"] = frame["close"] * 1.01
+            frame["low"] = frame["close"] * 0.98
+            frame["volume"] = rng.integers(1_000, 5_000, 300)
+            frames.append(frame)
+        self.prices = pd.concat(frames, ignore_index=True)
+
+    def test_kernels(self):
+        """Values should follow the documented definitions, per ticker."""
+        computed = compute_indicators(self.prices)
+        aapl = self.prices[self.prices["ticker"] == "AAPL"]
+        close = aapl["close"]
+        self.assertTrue(np.isnan(computed["sma_20"][18]))
+        self.assertAlmostEqual(computed["sma_20"][19], close[:20].mean())
+        self.assertAlmostEqual(computed["return_5d"][5], close[5] / close[0] - 1)
+        self.assertAlmostEqual(computed["high_52w"][299], aapl["high"][48:300].max())
+        # True range is at least high - low, more after a gap.
+        self.assertGreaterEqual(computed["atr_14"][13], 0.03 * close[:14].mean())
+        self.assertEqual(computed["ema_12"][0], close[0])
+        self.assertEqual(compute_indicators(make_prices(30, range(1, 31)))["rsi_14"][29], 100)
+
+        # Row order and the other ticker should not matter.
+        shuffled = self.prices.sample(frac=1, random_state=1)
+        pd.testing.assert_frame_equal(compute_indicators(shuffled), computed.loc[shuffled.index])
+        pd.testing.assert_frame_equal(
+            compute_indicators(aapl.drop(columns="ticker")), computed.loc[aapl.index]
+        )
+        with self.assertRaises(ValueError):
+            compute_indicators(self.prices.drop(columns="volume"))
+
+    def test_shipped_file_verifies(self):
+        """The kernels should reproduce a shipped file's indicator columns."""
+        report = verify_indicators(pd.read_parquet("data/AAPL.parquet"))
+        self.assertEqual(report["missing"], [])
+        self.assertEqual(set(report["columns"]), set(INDICATOR_COLUMNS))
+        for result in report["columns"].values():
+            self.assertEqual(result["mismatched"], 0)
+
+    def test_verify_reports_mismatches(self):
+        """A tampered value should be reported by column and ticker."""
+        frame = self.prices.drop(columns=[c for c in INDICATOR_COLUMNS if c in self.prices])
+        frame = frame.join(compute_indicators(self.prices))
+        frame.loc[450, "sma_50"] += 1
+        frame = frame.drop(columns="bb_lower")
+        report = verify_indicators(frame)
+        self.assertEqual(report["missing"], ["bb_lower"])
+        self.assertEqual(report["columns"]["sma_50"]["mismatched"], 1)
+        self.assertEqual(report["columns"]["sma_50"]["tickers"], ["MSFT"])
+        self.assertAlmostEqual(report["columns"]["sma_50"]["max_abs_diff"], 1)
+        self.assertEqual(report["columns"]["sma_20"]["mismatched"], 0)
+        self.assertIn("sma_50: 1 row(s)", format_verification(report))
+
+    def test_ingest_recomputes(self):
+        """convert_folder should recompute on request and verify_folder agree."""
         with tempfile.TemporaryDirectory() as tmp:
-            in_dir = Path(tmp) / "in"
-            out_dir = Path(tmp) / "out"
+            in_dir, out_dir = Path(tmp) / "in", Path(tmp) / "out"
             in_dir.mkdir()
-            pd.DataFrame({"x": [1]}).to_csv(in_dir / "a.csv", index=False)
-            pd.DataFrame({"x": [2]}).to_csv(in_dir / "b.csv", index=False)
-            convert_folder(in_dir, out_dir)
-            self.assertEqual(len(list(out_dir.glob("*.parquet"))), 2)
+            for ticker, rows in self.prices.groupby("ticker"):
+                rows.to_csv(in_dir / f"{ticker}.csv", index=False)
+
+            stale = verify_folder(in_dir)
+            self.assertGreater(stale["AAPL.csv"]["columns"]["sma_200"]["mismatched"], 0)
+            convert_folder(in_dir, out_dir, indicators=True)
+            written = pd.read_parquet(out_dir / "AAPL.parquet")
+            self.assertIn("macd", written.columns)
+            for report in verify_folder(out_dir, "*.parquet").values():
+                self.assertFalse(any(r["mismatched"] for r in report["columns"].values()))
+
+            # Switching recomputation off is a different conversion.
+            report = convert_folder(in_dir, out_dir, incremental=True)
+            self.assertEqual(report["converted"], ["AAPL.csv", "MSFT.csv"])
+
+
+# adjustment.py
+class TestPriceAdjustment(unittest.TestCase):
+    """Verify split / dividend back-adjustment and the total-return index."""
 
-    def test_convert_folder_creates_output_dir(self):
-        """The output directory should be created automatically if it doesn't exist."""
+    def setUp(self):
+        closes = [100.0, 100.0, 50.0, 50.0, 49.0]
+        self.raw = make_prices(5, closes)
+        self.raw["volume"] = [10, 10, 20, 20, 20]
+        self.raw["dividends"] = [0.0, 0.0, 0.0, 0.0, 0.5]
+        self.raw["stock splits"] = [0.0, 0.0, 2.0, 0.0, 0.0]
+
+    def test_factors(self):
+        """Earlier rows should be scaled by every later split and dividend."""
+        prices, volumes = adjustment_factors(
+            self.raw["close"].to_numpy(),
+            self.raw["dividends"].to_numpy(),
+            self.raw["stock splits"].to_numpy(),
+        )
+        np.testing.assert_allclose(prices, [0.495, 0.495, 0.99, 0.99, 1.0])
+        np.testing.assert_allclose(volumes, [2, 2, 1, 1, 1])
+
+    def test_adjust_prices(self):
+        """A split should leave no jump, and the index should start at 1."""
+        msft = self.raw.assign(ticker="MSFT", dividends=0.0)
+        frame = pd.concat([msft, self.raw], ignore_index=True).sample(frac=1, random_state=3)
+        adjust_prices(frame)
+        aapl = frame[frame["ticker"] == "AAPL"].sort_values("date")
+        np.testing.assert_allclose(aapl["close"], [49.5, 49.5, 49.5, 49.5, 49.0])
+        np.testing.assert_allclose(aapl["high"], aapl["close"])
+        self.assertEqual(aapl["volume"].tolist(), [20, 20, 20, 20, 20])
+        np.testing.assert_allclose(aapl[TOTAL_RETURN_COLUMN], aapl["close"] / 49.5)
+        msft = frame[frame["ticker"] == "MSFT"].sort_values("date")
+        np.testing.assert_allclose(msft["close"], [50.0, 50.0, 50.0, 50.0, 49.0])
+        with self.assertRaises(ValueError):
+            adjust_prices(self.raw.drop(columns="open"))
+
+    def test_ingest_adjusts(self):
+        """convert_csv_file should store adjusted prices and the index."""
         with tempfile.TemporaryDirectory() as tmp:
-            in_dir = Path(tmp) / "in"
-            out_dir = Path(tmp) / "new_out"
-            in_dir.mkdir()
-            convert_folder(in_dir, out_dir)
-            self.assertTrue(out_dir.exists())
+            self.raw.to_csv(Path(tmp) / "AAPL.csv", index=False)
+            written = pd.read_parquet(
+                convert_csv_file(Path(tmp) / "AAPL.csv", Path(tmp), adjust=True, indicators=True)
+            )
+        self.assertEqual(written["close"].iloc[0], 49.5)
+        self.assertEqual(written[TOTAL_RETURN_COLUMN].iloc[0], 1.0)
+        self.assertEqual(written["sma_200"].isna().sum(), 5)
+
 
 # ui_shared.py
 class TestUiShared(unittest.TestCase):
@@ -440,6 +730,7 @@ class TestUiShared(unittest.TestCase):
         apply_shared_ui()
         mock_st.markdown.assert_called_once()
 
+
 # strategies/__init__.py — remaining lines
 class TestStrategiesInit(unittest.TestCase):
     """Verify strategy registry helpers for UI dropdowns and dispatch."""
@@ -467,6 +758,7 @@ class TestStrategiesInit(unittest.TestCase):
         result = display_name_to_key("Some Unknown Strategy")
         self.assertEqual(result, "some unknown strategy")
 
+
 # charts/common.py
 class TestBuildMetricsDf(unittest.TestCase):
     """Verify build_metrics_df converts a raw summary dict into a display table."""
@@ -483,6 +775,7 @@ class TestBuildMetricsDf(unittest.TestCase):
         df = build_metrics_df({"total_return": 0.1})
         self.assertEqual(df.iloc[0]["Metric"], "Total Return")
 
+
 class TestAddPortfolioTraces(unittest.TestCase):
     """Verify add_portfolio_traces adds the expected Plotly traces to a figure."""
 
@@ -520,6 +813,7 @@ class TestAddPortfolioTraces(unittest.TestCase):
         add_portfolio_traces(fig, df, 1, 1)
         self.assertEqual(len(fig.data), 0)
 
+
 class TestAddInitialCapitalLine(unittest.TestCase):
     """Verify add_initial_capital_line draws a reference line on the figure."""
 
@@ -528,18 +822,19 @@ class TestAddInitialCapitalLine(unittest.TestCase):
         fig = make_subplots(rows=1, cols=1)
         add_initial_capital_line(fig, 10000.0, 1, 1)
 
+
 # charts/__init__.py — strategy_dashboard
 class TestStrategyDashboard(unittest.TestCase):
     """Verify strategy_dashboard routes to the correct chart builder."""
 
     def _make_bah_results(self):
-        df = _make_prices(50, close_values=[100.0 + i for i in range(50)])
+        df = make_prices(50, close_values=[100.0 + i for i in range(50)])
         return buy_and_hold(df, 10000.0, pd.DataFrame())
 
     def _make_ma_results(self):
         n = 300
         prices = list(range(1, n + 1))
-        df = _make_prices(n, close_values=prices)
+        df = make_prices(n, close_values=prices)
         return moving_average_crossover(df, 10000.0, pd.DataFrame())
 
     def _summary(self, results):
@@ -570,17 +865,19 @@ class TestStrategyDashboard(unittest.TestCase):
         fig, _ = strategy_dashboard(r, "  buy and hold  ", self._summary(r), 10000.0)
         self.assertIsInstance(fig, go.Figure)
 
+
 # charts/buy_and_hold_chart.py
 class TestBuyAndHoldChart(unittest.TestCase):
     """Verify the Buy-and-Hold chart builder produces a valid Plotly figure."""
 
     def test_build_returns_figure(self):
         """build() should return a go.Figure with portfolio traces and a capital line."""
-        df = _make_prices(50, close_values=[100.0 + i for i in range(50)])
+        df = make_prices(50, close_values=[100.0 + i for i in range(50)])
         results = buy_and_hold(df, 10000.0, pd.DataFrame())
         fig = bah_build(results, {"Total Return": 0.1}, 10000.0)
         self.assertIsInstance(fig, go.Figure)
 
+
 # charts/moving_average_chart.py
 class TestMovingAverageChart(unittest.TestCase):
     """Verify the Moving Average chart builder and its helper functions."""
@@ -588,7 +885,7 @@ class TestMovingAverageChart(unittest.TestCase):
     def _results(self):
         n = 300
         prices = list(range(1, n + 1))
-        df = _make_prices(n, close_values=prices)
+        df = make_prices(n, close_values=prices)
         return moving_average_crossover(df, 10000.0, pd.DataFrame())
 
     def test_build_returns_figure(self):
@@ -624,6 +921,7 @@ class TestMovingAverageChart(unittest.TestCase):
         _add_trade_markers(fig, df, 1, 1)
         self.assertEqual(len(fig.data), 0)
 
+
 # backtester.InvalidTickerError
 class TestInvalidTickerError(unittest.TestCase):
     """Verify the custom InvalidTickerError exception behaves correctly."""
@@ -637,6 +935,7 @@ class TestInvalidTickerError(unittest.TestCase):
         e = InvalidTickerError("test")
         self.assertEqual(str(e), "test")
 
+
 # Moving Average chart sell markers
 class TestMovingAverageChartSellMarkers(unittest.TestCase):
     """Verify the MA chart renders sell (Death Cross) markers when present."""
@@ -649,7 +948,7 @@ class TestMovingAverageChartSellMarkers(unittest.TestCase):
             [100.0 + i * 0.5 for i in range(250)]
             + [225.0 - i * 1.5 for i in range(250)]
         )
-        df = _make_prices(n, close_values=prices)
+        df = make_prices(n, close_values=prices)
         results = moving_average_crossover(df, 10000.0, pd.DataFrame())
         fig = ma_build(results, {"Total Return": 0.1}, 10000.0)
         self.assertIsInstance(fig, go.Figure)
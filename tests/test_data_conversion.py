@@ -0,0 +1,510 @@
+"""Tests for writing the stock data store.
+
+Covers csv_to_parquet (per-ticker, incremental, streamed and consolidated
+conversion) and store_update (appending and compacting delta files).
+
+Run with::
+
+    python -m pytest tests/test_data_conversion.py -v --tb=short
+"""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from helpers import OHLCV, make_prices, temp_dir, write_store
+
+from csv_to_parquet import (
+    MANIFEST_NAME,
+    consolidate_folder,
+    convert_csv_file,
+    convert_folder,
+    format_report,
+    main as convert_main,
+    stream_csv_file,
+)
+from catalog import build_catalog, read_catalog
+from data_loading import (
+    StockDataset,
+    load_all_data,
+    read_file_stats,
+    shared_dataset,
+)
+from parquet_io import delta_paths, read_consolidated
+from indicators import compute_indicators
+from store_update import append_bars, compact_store
+from stock_history import get_stock_history
+
+
+# csv_to_parquet.py
+class TestCsvToParquet(unittest.TestCase):
+    """Verify CSV-to-Parquet conversion for single files and entire folders."""
+
+    def test_convert_csv_file(self):
+        """A single CSV should be converted to a readable Parquet file."""
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = Path(tmp) / "test.csv"
+            pd.DataFrame({"a": [1, 2]}).to_csv(csv_path, index=False)
+            out = convert_csv_file(csv_path, Path(tmp))
+            self.assertTrue(out.exists())
+            df = pd.read_parquet(out)
+            self.assertEqual(len(df), 2)
+
+    def test_cli_skips_catalog_without_tickers(self):
+        """An empty folder or a CSV without tickers should convert without a catalog."""
+        with tempfile.TemporaryDirectory() as tmp:
+            in_dir, out_dir = Path(tmp) / "in", Path(tmp) / "out"
+            in_dir.mkdir()
+            for expected in ("no Parquet files", "has no 'ticker' column"):
+                with patch("sys.argv", ["csv_to_parquet.py", str(in_dir), str(out_dir)]), \
+                        patch("builtins.print") as mock_print:
+                    convert_main()
+                self.assertIn(expected, mock_print.call_args.args[0])
+                pd.DataFrame({"a": [1, 2]}).to_csv(in_dir / "generic.csv", index=False)
+            self.assertTrue((out_dir / "generic.parquet").exists())
+            self.assertFalse((out_dir / "_catalog.json").exists())
+
+    def test_cli_updates_catalog_incrementally(self):
+        """An incremental run that converts nothing should not rebuild the catalog."""
+        with tempfile.TemporaryDirectory() as tmp:
+            in_dir, out_dir = Path(tmp) / "in", Path(tmp) / "out"
+            in_dir.mkdir()
+            for ticker in ("AAPL", "MSFT"):
+                make_prices(5, ticker=ticker).to_csv(in_dir / f"{ticker}.csv", index=False)
+            argv = ["csv_to_parquet.py", str(in_dir), str(out_dir), "--incremental"]
+            with patch("sys.argv", argv), patch("builtins.print"):
+                convert_main()
+                with patch("catalog.build_catalog", wraps=build_catalog) as mock_build:
+                    convert_main()
+                    mock_build.assert_not_called()
+                    make_prices(6, ticker="MSFT").to_csv(in_dir / "MSFT.csv", index=False)
+                    convert_main()
+                mock_build.assert_called_once_with(str(out_dir), ["MSFT"])
+            self.assertEqual(read_catalog(str(out_dir)).loc["MSFT", "rows"], 6)
+
+    def test_convert_csv_file_writes_categoricals(self):
+        """Ticker-level string columns should be stored as categoricals."""
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = Path(tmp) / "AAPL.csv"
+            make_prices(5).to_csv(csv_path, index=False)
+            df = pd.read_parquet(convert_csv_file(csv_path, Path(tmp)))
+            self.assertIsInstance(df["ticker"].dtype, pd.CategoricalDtype)
+            self.assertEqual(df["close"].dtype, float)
+
+    def test_convert_csv_file_writes_timestamps(self):
+        """Dates should be stored as UTC timestamps; unparseable dates raise."""
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = Path(tmp) / "AAPL.csv"
+            prices = make_prices(5)
+            prices.to_csv(csv_path, index=False)
+            schema = pq.read_schema(convert_csv_file(csv_path, Path(tmp)))
+            self.assertEqual(str(schema.field("date").type), "timestamp[ns, tz=UTC]")
+            prices["date"] = "not-a-date"
+            prices.to_csv(csv_path, index=False)
+            with self.assertRaises(ValueError):
+                convert_csv_file(csv_path, Path(tmp))
+
+    def test_convert_folder(self):
+        """All CSVs in a folder should each produce a corresponding Parquet file."""
+        with tempfile.TemporaryDirectory() as tmp:
+            in_dir = Path(tmp) / "in"
+            out_dir = Path(tmp) / "out"
+            in_dir.mkdir()
+            pd.DataFrame({"x": [1]}).to_csv(in_dir / "a.csv", index=False)
+            pd.DataFrame({"x": [2]}).to_csv(in_dir / "b.csv", index=False)
+            convert_folder(in_dir, out_dir)
+            self.assertEqual(len(list(out_dir.glob("*.parquet"))), 2)
+
+    def test_convert_folder_creates_output_dir(self):
+        """The output directory should be created automatically if it doesn't exist."""
+        with tempfile.TemporaryDirectory() as tmp:
+            in_dir = Path(tmp) / "in"
+            out_dir = Path(tmp) / "new_out"
+            in_dir.mkdir()
+            convert_folder(in_dir, out_dir)
+            self.assertTrue(out_dir.exists())
+
+    def test_stray_value_strict_and_coerce(self):
+        """A non-numeric volume should raise by default and become null with coerce."""
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = Path(tmp) / "AAPL.csv"
+            prices = make_prices(5)
+            prices["volume"] = prices["volume"].astype(object)
+            prices.loc[2, "volume"] = "1.2k"
+            prices.to_csv(csv_path, index=False)
+            with self.assertRaisesRegex(ValueError, "'volume'.*'1.2k'"):
+                convert_csv_file(csv_path, Path(tmp))
+            df = pd.read_parquet(convert_csv_file(csv_path, Path(tmp), errors="coerce"))
+            self.assertEqual(str(df["volume"].dtype), "Int64")
+            self.assertTrue(pd.isna(df["volume"].iloc[2]))
+            stats = read_file_stats(Path(tmp) / "AAPL.parquet")
+            self.assertEqual(stats["null_counts"]["volume"], 1)
+            out_path = Path(tmp) / "all" / "all.parquet"
+            with self.assertRaisesRegex(ValueError, "'volume'"):
+                consolidate_folder(Path(tmp), out_path)
+            df = pd.read_parquet(consolidate_folder(Path(tmp), out_path, errors="coerce"))
+            self.assertTrue(pd.isna(df["volume"].iloc[2]))
+
+    def test_cli_rejects_ignored_options(self):
+        """Options a mode cannot honour should be rejected rather than dropped."""
+        for options in (["--stream", "--coerce"], ["--stream", "--workers", "2"],
+                        ["--consolidate", "--incremental"], ["--stream", "--consolidate"]):
+            with patch("sys.argv", ["csv_to_parquet.py", "in", "out", *options]), \
+                    patch("sys.stderr"), self.assertRaises(SystemExit):
+                convert_main()
+
+    def test_file_stats_in_footer(self):
+        """Per-file, streamed and consolidated outputs should carry their stats."""
+        with tempfile.TemporaryDirectory() as tmp:
+            in_dir = Path(tmp) / "in"
+            in_dir.mkdir()
+            prices = make_prices(5)
+            prices.to_csv(in_dir / "AAPL.csv", index=False)
+            expected = {
+                "rows": 5,
+                "date_min": prices["date"].iloc[0].isoformat(),
+                "date_max": prices["date"].iloc[-1].isoformat(),
+            }
+            outputs = [
+                convert_csv_file(in_dir / "AAPL.csv", Path(tmp)),
+                *stream_csv_file(in_dir / "AAPL.csv", Path(tmp) / "stream"),
+                consolidate_folder(in_dir, Path(tmp) / "all.parquet"),
+            ]
+            for out in outputs:
+                stats = read_file_stats(out)
+                self.assertEqual({key: stats[key] for key in expected}, expected)
+                self.assertEqual(stats["null_counts"]["close"], 0)
+            prices.to_parquet(Path(tmp) / "bare.parquet", index=False)
+            self.assertIsNone(read_file_stats(Path(tmp) / "bare.parquet"))
+
+
+class TestIncrementalConversion(unittest.TestCase):
+    """Verify convert_folder's manifest and incremental mode."""
+
+    def setUp(self):
+        self.root = temp_dir(self)
+        self.in_dir = self.root / "in"
+        self.out_dir = self.root / "out"
+        self.in_dir.mkdir()
+        for ticker in ("AAPL", "MSFT"):
+            make_prices(5, ticker=ticker).to_csv(self.in_dir / f"{ticker}.csv", index=False)
+        self.first = convert_folder(self.in_dir, self.out_dir)
+
+    def test_unchanged_inputs_skipped(self):
+        """A second incremental run should convert nothing."""
+        self.assertEqual(self.first["converted"], ["AAPL.csv", "MSFT.csv"])
+        self.assertTrue((self.out_dir / MANIFEST_NAME).is_file())
+        with patch("csv_to_parquet.convert_csv_file") as mock_convert:
+            report = convert_folder(self.in_dir, self.out_dir, incremental=True)
+        mock_convert.assert_not_called()
+        self.assertEqual(report["skipped"], ["AAPL.csv", "MSFT.csv"])
+        self.assertIn("skipped 2", format_report(report))
+
+    def test_only_changed_input_converted(self):
+        """Edited files are rewritten; touched-but-identical files are not."""
+        make_prices(6, ticker="AAPL").to_csv(self.in_dir / "AAPL.csv", index=False)
+        msft = self.in_dir / "MSFT.csv"
+        stat = msft.stat()
+        os.utime(msft, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        report = convert_folder(self.in_dir, self.out_dir, incremental=True)
+        self.assertEqual(report["converted"], ["AAPL.csv"])
+        self.assertEqual(report["skipped"], ["MSFT.csv"])
+        self.assertEqual(len(pd.read_parquet(self.out_dir / "AAPL.parquet")), 6)
+
+    def test_schema_version_and_missing_output_reconvert(self):
+        """A new schema version or a deleted output forces reconversion."""
+        (self.out_dir / "MSFT.parquet").unlink()
+        report = convert_folder(self.in_dir, self.out_dir, incremental=True)
+        self.assertEqual(report["converted"], ["MSFT.csv"])
+        with patch("csv_to_parquet.SCHEMA_VERSION", 99):
+            report = convert_folder(self.in_dir, self.out_dir, incremental=True)
+        self.assertEqual(len(report["converted"]), 2)
+
+    def test_failures_collected_and_retried(self):
+        """A bad file should be reported, not abort the run, and be retried."""
+        prices = make_prices(5, ticker="BAD")
+        prices["date"] = "not-a-date"
+        prices.to_csv(self.in_dir / "BAD.csv", index=False)
+        report = convert_folder(self.in_dir, self.out_dir, incremental=True)
+        self.assertEqual(list(report["failed"]), ["BAD.csv"])
+        self.assertEqual(len(report["skipped"]), 2)
+        self.assertFalse((self.out_dir / "BAD.parquet").exists())
+        report = convert_folder(self.in_dir, self.out_dir, incremental=True)
+        self.assertEqual(list(report["failed"]), ["BAD.csv"])
+
+    def test_process_pool_matches_serial(self):
+        """Worker processes should give the same ordered report and files."""
+        prices = make_prices(5, ticker="BAD")
+        prices["date"] = "not-a-date"
+        prices.to_csv(self.in_dir / "BAD.csv", index=False)
+        make_prices(5, ticker="XOM").to_csv(self.in_dir / "XOM.csv", index=False)
+        pooled_dir = self.root / "pooled"
+        report = convert_folder(self.in_dir, pooled_dir, workers=2)
+        self.assertEqual(report["workers"], 2)
+        self.assertEqual(report["converted"], ["AAPL.csv", "MSFT.csv", "XOM.csv"])
+        self.assertEqual(list(report["failed"]), ["BAD.csv"])
+        self.assertIn("failed 1", format_report(report))
+        pd.testing.assert_frame_equal(
+            pd.read_parquet(pooled_dir / "AAPL.parquet"),
+            pd.read_parquet(self.out_dir / "AAPL.parquet"),
+        )
+
+
+class TestStreamingConversion(unittest.TestCase):
+    """Verify block-wise CSV conversion through a ParquetWriter."""
+
+    def setUp(self):
+        self.root = temp_dir(self)
+        self.csv_path = self.root / "dump.csv"
+        self.out_dir = self.root / "out"
+        aapl = make_prices(200, ticker="AAPL", company="Apple Inc.")
+        msft = make_prices(200, ticker="MSFT", company="Microsoft Corporation")
+        # Interleaved, as in a date-ordered vendor dump.
+        pd.concat([aapl, msft]).sort_values("date", kind="stable").to_csv(
+            self.csv_path, index=False
+        )
+
+    def test_split_by_ticker(self):
+        """Each ticker should get its own file, in date order, in full row groups."""
+        paths = stream_csv_file(self.csv_path, self.out_dir, block_size=8 << 10,
+                                split_by_ticker=True)
+        self.assertEqual([path.name for path in paths], ["AAPL.parquet", "MSFT.parquet"])
+        self.assertEqual(pq.read_metadata(paths[0]).num_row_groups, 1)
+        spilled = stream_csv_file(self.csv_path, self.root / "spilled",
+                                  block_size=8 << 10, split_by_ticker=True,
+                                  buffer_rows=50, row_group_rows=64)
+        metadata = pq.read_metadata(spilled[1])
+        self.assertEqual(
+            [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)],
+            [64, 64, 64, 8],
+        )
+        self.assertEqual(sorted(path.name for path in spilled[0].parent.iterdir()),
+                         ["AAPL.parquet", "MSFT.parquet"])
+        for out_dir in (self.out_dir, spilled[0].parent):
+            history = StockDataset(str(out_dir)).history("MSFT")
+            pd.testing.assert_series_equal(
+                history["date"], make_prices(200)["date"], check_names=False
+            )
+            self.assertEqual(set(history["ticker"]), {"MSFT"})
+
+    @unittest.skipUnless(os.path.isdir("/proc/self/fd"), "needs /proc/self/fd")
+    def test_split_keeps_few_files_open(self):
+        """Hundreds of tickers should convert under a small open-file limit."""
+        resource = __import__("resource")
+        frames = [make_prices(3, ticker=f"T{i:03d}") for i in range(300)]
+        pd.concat(frames).sort_values("date", kind="stable").to_csv(self.csv_path, index=False)
+        limits = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(
+            resource.RLIMIT_NOFILE, (len(os.listdir("/proc/self/fd")) + 32, limits[1])
+        )
+        try:
+            paths = stream_csv_file(self.csv_path, self.out_dir, block_size=8 << 10,
+                                    split_by_ticker=True, buffer_rows=200)
+        finally:
+            resource.setrlimit(resource.RLIMIT_NOFILE, limits)
+        self.assertEqual(len(paths), 300)
+        self.assertEqual(pq.read_metadata(paths[0]).num_rows, 3)
+
+    def test_failure_removes_partial_files(self):
+        """A value that does not fit should leave no partial or part files behind."""
+        frame = pd.read_csv(self.csv_path).astype({"close": object})
+        frame.loc[len(frame) - 1, "close"] = "not-a-price"
+        frame.to_csv(self.csv_path, index=False)
+        for split in (False, True):
+            with self.assertRaises(pa.ArrowInvalid):
+                stream_csv_file(self.csv_path, self.out_dir, block_size=8 << 10,
+                                split_by_ticker=split, buffer_rows=50)
+            self.assertEqual(list(self.out_dir.iterdir()), [])
+
+    def test_single_output_compact(self):
+        """Without splitting, one file is written, with float32 indicators if asked."""
+        paths = stream_csv_file(self.csv_path, self.out_dir, block_size=8 << 10,
+                                compact=True)
+        self.assertEqual([path.name for path in paths], ["dump.parquet"])
+        schema = pq.read_schema(paths[0])
+        self.assertEqual(str(schema.field("rsi_14").type), "float")
+        self.assertEqual(str(schema.field("close").type), "double")
+        self.assertEqual(pq.read_metadata(paths[0]).num_rows, 400)
+
+    def test_split_requires_ticker(self):
+        """Splitting a CSV without a ticker column should raise ValueError."""
+        pd.DataFrame({"a": [1, 2]}).to_csv(self.csv_path, index=False)
+        with self.assertRaises(ValueError):
+            stream_csv_file(self.csv_path, self.out_dir, split_by_ticker=True)
+
+
+class TestConsolidatedLayout(unittest.TestCase):
+    """Verify the consolidated (ticker-sorted, row group per ticker) layout."""
+
+    def setUp(self):
+        self.root = temp_dir(self)
+        in_dir = self.root / "in"
+        in_dir.mkdir()
+        # Written out of ticker order to check the sort.
+        make_prices(30, ticker="MSFT", company="Microsoft Corporation").to_csv(
+            in_dir / "MSFT.csv", index=False
+        )
+        make_prices(20, ticker="AAPL", company="Apple Inc.").to_csv(
+            in_dir / "AAPL.csv", index=False
+        )
+        self.path = consolidate_folder(in_dir, self.root / "out" / "all.parquet")
+
+    def test_one_row_group_per_ticker(self):
+        """Each ticker should be stored as its own row group, in ticker order."""
+        metadata = pq.read_metadata(self.path)
+        self.assertEqual(metadata.num_row_groups, 2)
+        self.assertEqual(
+            [metadata.row_group(i).num_rows for i in range(2)], [20, 30]
+        )
+
+    def test_no_matching_files_raises(self):
+        """Consolidating an empty folder should raise ValueError."""
+        with self.assertRaises(ValueError):
+            consolidate_folder(self.root / "out", self.root / "x.parquet")
+
+    def test_read_consolidated_filters(self):
+        """Ticker and date filters should return only the matching rows."""
+        frame = read_consolidated(
+            str(self.path), ["MSFT"], ["date", "ticker", "close"],
+            start="2000-01-05", end="2000-01-10",
+        )
+        self.assertEqual(set(frame["ticker"]), {"MSFT"})
+        self.assertEqual(len(frame), 4)
+
+    def test_load_all_data_from_consolidated(self):
+        """load_all_data(source=<file>) should read the consolidated layout."""
+        frame = load_all_data(source=str(self.path))
+        self.assertEqual(len(frame), 50)
+        self.assertEqual(list(frame["ticker"].iloc[[0, -1]]), ["AAPL", "MSFT"])
+
+    def test_dataset_reads_single_row_group(self):
+        """StockDataset over the consolidated file should map tickers to row groups."""
+        dataset = StockDataset(str(self.path))
+        self.assertEqual(dataset.tickers, ["AAPL", "MSFT"])
+        history = dataset.history("MSFT", columns=["date", "close"])
+        self.assertEqual(len(history), 30)
+        self.assertEqual(len(dataset.load(["AAPL"])), 20)
+        self.assertEqual(dataset.tickers_for_company("Apple Inc."), ["AAPL"])
+        result = get_stock_history("Microsoft Corporation", None, None, dataset)
+        self.assertEqual(len(result), 30)
+
+    def test_dataset_date_window_uses_filters(self):
+        """Dated histories from the consolidated file should use filtered reads."""
+        dataset = StockDataset(str(self.path))
+        self.assertEqual(len(dataset.history("MSFT", start="2000-01-05", end="2000-01-10")), 4)
+        result = get_stock_history("MSFT", "1999-12-01", "2000-01-10", dataset)
+        self.assertEqual(len(result), 6)
+        self.assertIn("adjusted_start_date", result.attrs)
+
+
+# store_update.py
+class TestStoreUpdate(unittest.TestCase):
+    """Verify appending delta files to the store and compacting them."""
+
+    def setUp(self):
+        self.full = {
+            ticker: make_prices(60, 100 + np.arange(60.0), ticker=ticker)
+            for ticker in ("AAPL", "MSFT")
+        }
+        self.source = str(write_store(
+            temp_dir(self), *(frame.iloc[:50] for frame in self.full.values())
+        ))
+        self.bars = pd.concat(
+            [frame.iloc[50:][["ticker", "date", *OHLCV]] for frame in self.full.values()]
+        )
+
+    def test_append_is_merged_on_read(self):
+        """Appended rows should read back as if they were in the base file."""
+        base = Path(self.source) / "AAPL.parquet"
+        before = base.stat().st_mtime_ns
+        report = append_bars(self.bars, self.source)
+        self.assertEqual(report["appended"], {"AAPL": 10, "MSFT": 10})
+        self.assertEqual(base.stat().st_mtime_ns, before)
+        self.assertEqual(len(delta_paths(self.source)["AAPL"]), 1)
+
+        history = StockDataset(self.source, cache_dir=None).history("AAPL")
+        expected = self.full["AAPL"]
+        self.assertEqual(history["date"].tolist(), expected["date"].tolist())
+        self.assertEqual(history["company_name"].iloc[-1], "Apple Inc.")
+        self.assertTrue((history["volume"] == 1_000_000).all())
+        np.testing.assert_allclose(
+            history["return_20d"].iloc[50:], compute_indicators(expected)["return_20d"][50:]
+        )
+        self.assertEqual(
+            StockDataset(self.source, cache_dir=None).date_range("AAPL")[1],
+            expected["date"].iloc[-1],
+        )
+        combined = load_all_data(source=self.source)
+        self.assertEqual(len(combined), 120)
+        self.assertTrue(combined["ticker"].is_monotonic_increasing)
+
+    def test_append_validates_before_writing(self):
+        """Dates must advance and columns must fit, or nothing is written."""
+        append_bars(self.bars.iloc[:5], self.source)
+        with self.assertRaisesRegex(ValueError, "not after"):
+            append_bars(self.bars, self.source)
+        self.assertEqual(set(delta_paths(self.source)), {"AAPL"})
+        with self.assertRaisesRegex(ValueError, "repeated"):
+            append_bars(pd.concat([self.bars.iloc[5:6]] * 2), self.source)
+        with self.assertRaisesRegex(ValueError, "not in the store"):
+            append_bars(self.bars.iloc[5:].assign(extra=1.0), self.source)
+        for tickers, message in (([None, "AAPL"], "no ticker"), (["", "AAPL"], "no ticker"),
+                                 (["../X", "AAPL"], "cannot name a file"),
+                                 (["_delta", "AAPL"], "cannot name a file")):
+            with self.assertRaisesRegex(ValueError, message):
+                append_bars(self.bars.iloc[5:7].assign(ticker=tickers), self.source)
+        report = append_bars(self.bars.iloc[10:].assign(ticker="NEW"), self.source)
+        self.assertEqual(report["created"], ["NEW"])
+        self.assertIsNone(pd.read_parquet(Path(self.source) / "NEW.parquet")["company_name"][0])
+
+    def test_open_handles_follow_appends_and_compaction(self):
+        """A handle created earlier should see later appends, compactions and tickers."""
+        dataset = StockDataset(self.source, cache_dir=None)
+        self.assertEqual(len(dataset.history("AAPL")), 50)
+        self.assertEqual(dataset.date_range("AAPL")[1], self.full["AAPL"]["date"].iloc[49])
+        append_bars(self.bars.iloc[:5], self.source)
+        self.assertEqual(len(dataset.history("AAPL")), 55)
+        self.assertEqual(dataset.date_range("AAPL")[1], self.full["AAPL"]["date"].iloc[54])
+        compact_store(self.source)
+        self.assertEqual(len(dataset.history("AAPL")), 55)
+        self.assertEqual(dataset.date_range("AAPL")[1], self.full["AAPL"]["date"].iloc[54])
+
+        with patch("data_loading.DATA_DIR", self.source), \
+                patch.dict("data_loading._SHARED", clear=True):
+            shared = shared_dataset(materialize=True)
+            self.assertIs(shared_dataset(), shared)
+            append_bars(self.bars.iloc[10:].assign(ticker="NEW"), self.source)
+            refreshed = shared_dataset()
+        self.assertIsNot(refreshed, shared)
+        self.assertTrue(refreshed.is_materialized)
+        self.assertEqual(len(refreshed.history("NEW")), 10)
+
+    def test_compact_folds_deltas(self):
+        """Compaction should keep the rows, drop the deltas and finish interrupted runs."""
+        append_bars(self.bars.iloc[:5], self.source)
+        append_bars(self.bars.iloc[5:], self.source)
+        merged = load_all_data(source=self.source)
+        self.assertEqual(compact_store(self.source, ["MSFT"]), ["MSFT"])
+        self.assertEqual(set(delta_paths(self.source)), {"AAPL"})
+        # An interrupted run: AAPL's deltas already folded but not deleted.
+        folder = Path(self.source) / "_delta" / "AAPL"
+        folder.rename(folder.with_name(".AAPL"))
+        first = sorted(folder.with_name(".AAPL").glob("*.parquet"))[0]
+        pd.concat([self.full["AAPL"].iloc[:50], pd.read_parquet(first)]).to_parquet(
+            Path(self.source) / "AAPL.parquet", index=False
+        )
+        self.assertEqual(compact_store(self.source), ["AAPL"])
+        self.assertEqual(delta_paths(self.source), {})
+        self.assertFalse((Path(self.source) / "_delta").exists())
+        pd.testing.assert_frame_equal(
+            load_all_data(source=self.source)[["ticker", "date", "close"]],
+            merged[["ticker", "date", "close"]],
+            check_categorical=False,
+        )
@@ -0,0 +1,563 @@
+"""Tests for reading the stock data store.
+
+Covers data_loading, arrow_cache, catalog, fingerprint and price_matrix.
+
+Run with::
+
+    python -m pytest tests/test_data_store.py -v --tb=short
+"""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from helpers import (
+    OHLCV,
+    make_full_df,
+    make_prices,
+    make_ticker_frames,
+    temp_dir,
+    write_store,
+)
+
+from csv_to_parquet import consolidate_folder, convert_csv_file
+from catalog import build_catalog, load_catalog, read_catalog, write_catalog
+from data_loading import (
+    StockDataset,
+    build_ticker_index,
+    load_all_data,
+    memory_report,
+    sort_by_ticker,
+)
+from fingerprint import dataset_fingerprint, ticker_fingerprints
+from parquet_io import INDICATOR_COLUMNS, to_utc_dates
+from metrics import compute_matrix_metrics, compute_metrics
+from price_matrix import build_price_matrix, load_price_matrix
+from strategies import get_strategy_display_names, run_strategy
+from strategies.buy_and_hold import buy_and_hold, buy_and_hold_matrix
+from backtester import main_backtest
+from store_update import append_bars
+from stock_history import get_stock_history
+
+
+# data_loading.py
+class TestLoadAllData(unittest.TestCase):
+    """Verify load_all_data reads parquet files and handles missing data."""
+
+    def test_returns_dataframe(self):
+        """Loading the real ./data directory should produce a non-empty DataFrame."""
+        df = load_all_data()
+        self.assertIsInstance(df, pd.DataFrame)
+        self.assertGreater(len(df), 0)
+
+    def test_raises_when_no_files(self):
+        """A ValueError should be raised when no parquet files exist."""
+        with patch("data_loading.glob.glob", return_value=[]):
+            with self.assertRaises(ValueError):
+                load_all_data()
+
+
+class TestDateNormalization(unittest.TestCase):
+    """Verify dates are parsed to UTC once, as they are read."""
+
+    def test_offset_strings_match_pandas(self):
+        """Mixed-offset ISO strings should parse like pd.to_datetime(utc=True)."""
+        raw = pd.Series(["2016-01-04 00:00:00-05:00", "2016-07-01 00:00:00-04:00"])
+        expected = pd.to_datetime(raw, utc=True)
+        pd.testing.assert_series_equal(to_utc_dates(raw), expected)
+
+    def test_typed_column_returned_as_is(self):
+        """An already-normalized column should not be copied or reparsed."""
+        dates = make_prices(5)["date"]
+        self.assertIs(to_utc_dates(dates), dates)
+
+    def test_loaded_string_dates_are_typed(self):
+        """Files with string dates should load with a UTC datetime column."""
+        prices = make_prices(5)
+        prices["date"] = prices["date"].dt.tz_convert("America/New_York").astype(str)
+        with tempfile.TemporaryDirectory() as tmp:
+            prices.to_parquet(Path(tmp) / "AAPL.parquet", index=False)
+            frame = load_all_data(source=tmp)
+            history = StockDataset(tmp).history("AAPL")
+        for loaded in (frame, history):
+            pd.testing.assert_series_equal(
+                loaded["date"], make_prices(5)["date"], check_names=False
+            )
+
+
+class TestStockDataset(unittest.TestCase):
+    """Verify the lazy StockDataset maps tickers to files and reads on demand."""
+
+    def setUp(self):
+        self.data_dir = str(write_store(temp_dir(self), *make_ticker_frames()))
+        self.dataset = StockDataset(self.data_dir)
+
+    def test_tickers_from_file_names(self):
+        """Tickers should come from the file names without reading any data."""
+        with patch("data_loading.pd.read_parquet") as mock_read:
+            dataset = StockDataset(self.data_dir)
+            self.assertEqual(dataset.tickers, ["AAPL", "MSFT"])
+            self.assertIn("AAPL", dataset)
+            self.assertFalse(dataset.empty)
+            mock_read.assert_not_called()
+
+    def test_memory_footprint(self):
+        """The footprint should be zero until the dataset is materialized."""
+        self.assertEqual(
+            self.dataset.memory_footprint(),
+            {"tickers": 2, "materialized": False, "rows": 0, "bytes": 0},
+        )
+        frame = self.dataset.materialize()
+        footprint = self.dataset.memory_footprint()
+        self.assertEqual(footprint["rows"], 500)
+        self.assertEqual(footprint["bytes"], frame.memory_usage(index=False, deep=True).sum())
+
+    def test_empty_directory(self):
+        """A directory without Parquet files should produce an empty handle."""
+        with tempfile.TemporaryDirectory() as tmp:
+            dataset = StockDataset(tmp)
+            self.assertTrue(dataset.empty)
+            with self.assertRaises(ValueError):
+                dataset.load()
+
+    def test_unknown_ticker_path_raises(self):
+        """Asking for a ticker without a file should raise KeyError."""
+        with self.assertRaises(KeyError):
+            self.dataset.path_for("ZZZZ")
+
+    def test_load_subset_reads_only_requested(self):
+        """load() should open only the files of the requested tickers."""
+        with patch("data_loading.pd.read_parquet", wraps=pd.read_parquet) as mock_read:
+            frame = self.dataset.load(["MSFT"])
+        self.assertEqual(mock_read.call_count, 1)
+        self.assertEqual(set(frame["ticker"]), {"MSFT"})
+
+    def test_history_column_projection(self):
+        """history()/load() should only return the requested columns."""
+        frame = self.dataset.history("AAPL", columns=["date", "close"])
+        self.assertEqual(list(frame.columns), ["date", "close"])
+        frame = self.dataset.load(columns=["ticker", "close"])
+        self.assertEqual(list(frame.columns), ["ticker", "close"])
+        self.assertEqual(len(frame), 500)
+
+    def test_load_all_data_projection(self):
+        """load_all_data(columns=...) should project every file it reads."""
+        paths = [str(Path(self.data_dir) / "AAPL.parquet")]
+        with patch("data_loading.glob.glob", return_value=paths):
+            frame = load_all_data(columns=["date", "close"])
+        self.assertEqual(list(frame.columns), ["date", "close"])
+
+    def test_parallel_load_matches_serial(self):
+        """Threaded reads should produce exactly the serial result, with timings."""
+        paths = [str(Path(self.data_dir) / f"{t}.parquet") for t in ("MSFT", "AAPL")]
+        timings = {}
+        with patch("data_loading.glob.glob", return_value=paths):
+            serial = load_all_data(max_workers=1)
+            parallel = load_all_data(max_workers=4, timings=timings)
+        pd.testing.assert_frame_equal(serial, parallel)
+        self.assertEqual(list(parallel["ticker"].iloc[[0, -1]]), ["AAPL", "MSFT"])
+        self.assertEqual(set(timings), set(paths))
+        self.assertTrue(all(seconds >= 0 for seconds in timings.values()))
+
+    def test_materialized_history_is_slice(self):
+        """A materialized dataset should serve histories from its ticker index."""
+        frame = self.dataset.materialize()
+        self.assertTrue(self.dataset.is_materialized)
+        self.assertEqual(self.dataset.tickers, ["AAPL", "MSFT"])
+        with patch("data_loading.pd.read_parquet") as mock_read:
+            history = self.dataset.history("MSFT")
+            result = get_stock_history("MSFT", "2000-02-01", None, self.dataset)
+            mock_read.assert_not_called()
+        self.assertEqual(len(history), 250)
+        self.assertTrue((history["ticker"] == "MSFT").all())
+        self.assertGreater(len(result), 0)
+        # The shared frame must not be modified by a history request.
+        self.assertEqual(frame["date"].dtype, self.dataset.history("AAPL")["date"].dtype)
+
+    def test_from_frame_groups_tickers(self):
+        """from_frame should group interleaved rows and index each ticker."""
+        frame = make_full_df().sample(frac=1.0, random_state=0)
+        dataset = StockDataset.from_frame(frame)
+        history = dataset.history("AAPL")
+        self.assertEqual(len(history), 250)
+        self.assertTrue((history["ticker"] == "AAPL").all())
+        self.assertEqual(dataset.company_names()["MSFT"], "Microsoft Corporation")
+        self.assertEqual(len(dataset.load(["MSFT"], columns=["close"])), 250)
+        with self.assertRaises(KeyError):
+            dataset.history("ZZZZ")
+
+    def test_build_ticker_index_rejects_interleaved(self):
+        """Non-contiguous ticker rows cannot be indexed by slices."""
+        frame = pd.DataFrame({"ticker": ["A", "B", "A"]})
+        with self.assertRaises(ValueError):
+            build_ticker_index(frame)
+        self.assertEqual(build_ticker_index(sort_by_ticker(frame))["A"], slice(0, 2))
+        grouped = pd.DataFrame({"ticker": ["A", "A", "B"], "close": [1.0, 2.0, 3.0]},
+                               index=[5, 6, 7])
+        result = sort_by_ticker(grouped)
+        self.assertEqual(list(result.index), [0, 1, 2])
+        self.assertEqual(list(grouped.index), [5, 6, 7])
+        self.assertTrue(np.shares_memory(result["close"].to_numpy(), grouped["close"].to_numpy()))
+
+    def test_build_ticker_index_skips_null_tickers(self):
+        """Rows without a ticker should not be indexed under a real ticker."""
+        for dtype in ("category", object):
+            frame = pd.DataFrame({"ticker": pd.Series(["A", "B", None, None], dtype=dtype)})
+            self.assertEqual(
+                build_ticker_index(frame), {"A": slice(0, 1), "B": slice(1, 2)}
+            )
+
+    def test_load_keeps_categoricals(self):
+        """Repeated string columns should load as one shared categorical dtype."""
+        frame = self.dataset.load()
+        for col in ("ticker", "company_name"):
+            self.assertIsInstance(frame[col].dtype, pd.CategoricalDtype)
+        self.assertEqual(list(frame["ticker"].cat.categories), ["AAPL", "MSFT"])
+
+    def test_memory_report_shows_saving(self):
+        """memory_report should show categoricals as smaller than object strings."""
+        report = memory_report(self.dataset.load())
+        self.assertGreater(report.loc["ticker", "saving"], 0)
+        self.assertEqual(report.loc["close", "saving"], 0)
+        self.assertEqual(report.loc["TOTAL", "bytes"], report["bytes"].iloc[:-1].sum())
+
+    def test_date_range_from_statistics(self):
+        """date_range should come from the footer without reading rows."""
+        with patch("data_loading.pd.read_parquet") as mock_read:
+            first, last = self.dataset.date_range("AAPL")
+        mock_read.assert_not_called()
+        dates = make_prices(250)["date"]
+        self.assertEqual((first, last), (dates.iloc[0], dates.iloc[-1]))
+
+    def test_history_pushes_date_window(self):
+        """A dated history read should skip rows outside the window."""
+        history = self.dataset.history("AAPL", start="2000-02-01", end="2000-02-29")
+        self.assertEqual(len(history), 21)
+
+
+class TestCompactMode(unittest.TestCase):
+    """Verify float32 indicators and their accuracy against float64."""
+
+    def test_indicators_downcast_prices_kept(self):
+        """compact=True should store indicators as float32 and keep close float64."""
+        with tempfile.TemporaryDirectory() as tmp:
+            make_prices(20).to_parquet(Path(tmp) / "AAPL.parquet", index=False)
+            frame = load_all_data(source=tmp, compact=True)
+            history = StockDataset(tmp, compact=True).history("AAPL")
+        for loaded in (frame, history):
+            self.assertEqual(loaded["close"].dtype, "float64")
+            self.assertEqual(loaded["return_1d"].dtype, "float32")
+            self.assertEqual(loaded["volume_ratio"].dtype, "float32")
+
+    def test_convert_csv_file_compact(self):
+        """The converter should write float32 indicators when compact is set."""
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = Path(tmp) / "AAPL.csv"
+            make_prices(5).to_csv(csv_path, index=False)
+            schema = pq.read_schema(convert_csv_file(csv_path, Path(tmp), compact=True))
+        self.assertEqual(str(schema.field("sma_200").type), "float")
+        self.assertEqual(str(schema.field("close").type), "double")
+
+    def test_metrics_match_float64(self):
+        """Every strategy's metrics on AAPL's shipped history should agree to 1e-6 relative."""
+        full = StockDataset()
+        compact = StockDataset(compact=True)
+        for strategy in get_strategy_display_names():
+            metrics = [
+                compute_metrics(
+                    run_strategy(
+                        get_stock_history("AAPL", None, None, dataset),
+                        strategy, 10_000.0, dataset,
+                    ),
+                    10_000.0,
+                )
+                for dataset in (full, compact)
+            ]
+            for key, value in metrics[0].items():
+                self.assertAlmostEqual(
+                    metrics[1][key], value, delta=1e-6 * max(abs(value), 1e-9),
+                    msg=f"{strategy}: {key}",
+                )
+        self.assertIn("sma_200", INDICATOR_COLUMNS)
+        self.assertNotIn("close", INDICATOR_COLUMNS)
+
+
+# arrow_cache.py
+class TestArrowCache(unittest.TestCase):
+    """Verify the memory-mapped Arrow IPC cache and its invalidation."""
+
+    def setUp(self):
+        root = temp_dir(self)
+        self.cache_dir = str(root / "cache")
+        self.data_dir = write_store(
+            root / "data",
+            make_prices(30, ticker="MSFT", company="Microsoft Corporation"),
+            make_prices(20),
+        )
+
+    def _load(self, **kwargs):
+        return load_all_data(source=str(self.data_dir), cache_dir=self.cache_dir, **kwargs)
+
+    def test_cache_matches_parquet(self):
+        """A cold and a warm cached load should equal the Parquet load."""
+        expected = load_all_data(source=str(self.data_dir))
+        pd.testing.assert_frame_equal(self._load(), expected)
+        pd.testing.assert_frame_equal(self._load(), expected)
+        self.assertEqual(len(list(Path(self.cache_dir).glob("*.arrow"))), 1)
+
+    def test_warm_load_reads_no_parquet(self):
+        """A current cache should be mapped without opening any Parquet file."""
+        self._load()
+        with patch("data_loading.pd.read_parquet") as mock_read:
+            frame = self._load(columns=["ticker", "close"])
+        mock_read.assert_not_called()
+        self.assertEqual(list(frame.columns), ["ticker", "close"])
+        self.assertEqual(len(frame), 50)
+
+    def test_touched_source_rebuilds(self):
+        """Changing a source file's mtime should invalidate the cache."""
+        self._load()
+        path = self.data_dir / "AAPL.parquet"
+        make_prices(5, ticker="AAPL").to_parquet(path, index=False)
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertEqual(len(self._load()), 35)
+
+    def test_dataset_materialize_uses_cache(self):
+        """StockDataset(cache_dir=...) should materialize through the cache."""
+        dataset = StockDataset(str(self.data_dir), cache_dir=self.cache_dir)
+        dataset.materialize()
+        self.assertEqual(len(dataset.history("MSFT")), 30)
+        self.assertTrue(any(Path(self.cache_dir).glob("*.arrow")))
+
+    def test_materialized_cache_stays_mapped(self):
+        """Materializing through a warm cache should keep the mapped, read-only columns."""
+        self._load()
+        dataset = StockDataset(str(self.data_dir), cache_dir=self.cache_dir)
+        for frame in (self._load(), dataset.materialize()):
+            self.assertFalse(frame["close"].to_numpy().flags.writeable)
+
+
+# catalog.py
+class TestCatalog(unittest.TestCase):
+    """Verify the ticker catalog file, its staleness check and its uses."""
+
+    def setUp(self):
+        self.data_dir = str(write_store(
+            temp_dir(self) / "data",
+            make_prices(30, ticker="MSFT", company="Microsoft Corporation"),
+            make_prices(20),
+        ))
+
+    def test_write_and_read(self):
+        """A written catalog should read back without touching price data."""
+        self.assertIsNone(read_catalog(self.data_dir))
+        path = write_catalog(self.data_dir)
+        self.assertEqual(path, os.path.join(self.data_dir, "_catalog.json"))
+        with patch("data_loading.pd.read_parquet") as mock_read:
+            catalog = load_catalog(self.data_dir)
+        mock_read.assert_not_called()
+        self.assertEqual(list(catalog.index), ["AAPL", "MSFT"])
+        self.assertEqual(catalog.loc["MSFT", "company_name"], "Microsoft Corporation")
+        self.assertIsNone(catalog.loc["MSFT", "sector"])
+        self.assertEqual(catalog.loc["AAPL", "rows"], 20)
+        self.assertEqual(
+            catalog.loc["AAPL", "last_date"], pd.Timestamp("2000-01-28", tz="UTC")
+        )
+        pd.testing.assert_frame_equal(catalog, build_catalog(self.data_dir), check_dtype=False)
+
+    def test_stale_catalog_is_ignored(self):
+        """Changing a source file should make read_catalog return None."""
+        write_catalog(self.data_dir)
+        path = Path(self.data_dir) / "AAPL.parquet"
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertIsNone(read_catalog(self.data_dir))
+        with patch("catalog.build_catalog", wraps=build_catalog) as mock_build:
+            load_catalog(self.data_dir)
+            load_catalog(self.data_dir)
+        mock_build.assert_called_once_with(self.data_dir, ["AAPL"])
+        self.assertIsNotNone(read_catalog(self.data_dir))
+
+    def test_company_names_prefer_catalog(self):
+        """Company names should come from a current catalog, else from the files."""
+        expected = {"AAPL": "Apple Inc.", "MSFT": "Microsoft Corporation"}
+        self.assertEqual(StockDataset(self.data_dir).company_names(), expected)
+        write_catalog(self.data_dir)
+        with patch("data_loading.pq.ParquetFile", side_effect=AssertionError("file read")):
+            self.assertEqual(StockDataset(self.data_dir).company_names(), expected)
+
+    def test_load_catalog_without_write_access(self):
+        """A catalog that cannot be written should still be built and kept in memory."""
+        with patch("data_loading.os.replace", side_effect=PermissionError):
+            catalog = load_catalog(self.data_dir)
+        self.assertEqual(list(catalog.index), ["AAPL", "MSFT"])
+        self.assertIsNone(read_catalog(self.data_dir))
+        self.assertEqual(sorted(os.listdir(self.data_dir)), ["AAPL.parquet", "MSFT.parquet"])
+        with patch("catalog.build_catalog") as mock_build:
+            self.assertIs(load_catalog(self.data_dir), catalog)
+        mock_build.assert_not_called()
+
+    def test_date_range_falls_back_to_catalog(self):
+        """A file without date statistics should take its range from the catalog."""
+        path = Path(self.data_dir) / "AAPL.parquet"
+        pq.write_table(
+            pa.Table.from_pandas(make_prices(20), preserve_index=False),
+            path,
+            write_statistics=False,
+        )
+        self.assertIsNone(StockDataset(self.data_dir).date_range("AAPL"))
+        write_catalog(self.data_dir)
+        self.assertEqual(
+            StockDataset(self.data_dir).date_range("AAPL"),
+            (pd.Timestamp("2000-01-03", tz="UTC"), pd.Timestamp("2000-01-28", tz="UTC")),
+        )
+
+
+# fingerprint.py
+class TestFingerprint(unittest.TestCase):
+    """Verify dataset and per-ticker fingerprints and the backtest cache keyed on them."""
+
+    def setUp(self):
+        self.root = temp_dir(self)
+        self.source = write_store(
+            self.root / "data",
+            *(make_prices(60, 100 + np.arange(60.0), ticker=t) for t in ("AAPL", "MSFT")),
+        )
+
+    def test_fingerprints_track_each_ticker(self):
+        """A rewrite, touch or append should change only the affected fingerprints."""
+        with patch("pandas.read_parquet", side_effect=AssertionError("column read")):
+            dataset = dataset_fingerprint(str(self.source))
+            tickers = ticker_fingerprints(str(self.source))
+        self.assertEqual(list(tickers), ["AAPL", "MSFT"])
+        self.assertEqual(dataset_fingerprint(str(self.source)), dataset)
+        handle = StockDataset(str(self.source), cache_dir=None)
+        self.assertEqual(handle.fingerprint(), dataset)
+        self.assertEqual(handle.fingerprint("MSFT"), tickers["MSFT"])
+        self.assertIsNone(StockDataset.from_frame(make_full_df()).fingerprint())
+
+        # Same name, size and mtime, different contents: caught by the footer.
+        path = self.source / "AAPL.parquet"
+        stat = path.stat()
+        make_prices(60, 200 + np.arange(60.0)).to_parquet(path, index=False)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        changed = ticker_fingerprints(str(self.source))
+        self.assertNotEqual(changed["AAPL"], tickers["AAPL"])
+        self.assertEqual(changed["MSFT"], tickers["MSFT"])
+        self.assertNotEqual(dataset_fingerprint(str(self.source)), dataset)
+
+        os.utime(self.source / "MSFT.parquet", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        self.assertNotEqual(ticker_fingerprints(str(self.source))["MSFT"], tickers["MSFT"])
+        bars = make_prices(61, 100 + np.arange(61.0), ticker="AAPL").iloc[60:]
+        append_bars(bars[["ticker", "date", *OHLCV]], str(self.source))
+        self.assertNotEqual(ticker_fingerprints(str(self.source))["AAPL"], changed["AAPL"])
+
+    def test_consolidated_fingerprints_come_from_row_groups(self):
+        """Each ticker of a consolidated file should be fingerprinted from its row groups."""
+        in_dir = self.root / "csv"
+        in_dir.mkdir()
+        for ticker, base in (("AAPL", 100), ("MSFT", 300)):
+            make_prices(30, base + np.arange(30.0), ticker=ticker).to_csv(
+                in_dir / f"{ticker}.csv", index=False
+            )
+        path = str(consolidate_folder(in_dir, self.root / "all.parquet"))
+        tickers = ticker_fingerprints(path)
+        self.assertEqual(list(tickers), ["AAPL", "MSFT"])
+        self.assertNotEqual(tickers["AAPL"], tickers["MSFT"])
+        handle = StockDataset(path, cache_dir=None)
+        self.assertEqual(handle.fingerprint("AAPL"), tickers["AAPL"])
+        self.assertEqual(handle.fingerprint(), dataset_fingerprint(path))
+        with self.assertRaises(KeyError):
+            handle.fingerprint("ZZZZ")
+
+    @patch("backtester.strategy_dashboard", return_value=(None, None))
+    def test_main_backtest_is_cached_per_fingerprint(self, mock_dash):
+        """Repeated backtests should reuse results until the data changes."""
+        dataset = StockDataset(str(self.source), cache_dir=None)
+        with patch("backtester.get_dataset", return_value=dataset):
+            first = main_backtest("AAPL", None, None, "Buy and Hold", 10000.0)
+            first[0]["close"] = 0.0
+            again = main_backtest("AAPL", None, None, "Buy and Hold", 10000.0)
+            self.assertEqual(mock_dash.call_count, 1)
+            self.assertTrue((again[0]["close"] > 0).all())
+            main_backtest("AAPL", None, None, "Buy and Hold", 20000.0)
+            self.assertEqual(mock_dash.call_count, 2)
+            bars = make_prices(61, 100 + np.arange(61.0), ticker="AAPL").iloc[60:]
+            append_bars(bars[["ticker", "date", *OHLCV]], str(self.source))
+            appended = main_backtest("AAPL", None, None, "Buy and Hold", 10000.0)
+            self.assertEqual(mock_dash.call_count, 3)
+            self.assertEqual(len(appended[0]), 61)
+            # Data changing during a run: the result is not stored.
+            with patch.object(dataset, "fingerprint", side_effect=["a", "b"] * 2):
+                main_backtest("AAPL", None, None, "Buy and Hold", 30000.0)
+                main_backtest("AAPL", None, None, "Buy and Hold", 30000.0)
+            self.assertEqual(mock_dash.call_count, 5)
+
+
+# price_matrix.py
+class TestPriceMatrix(unittest.TestCase):
+    """Verify the date x ticker price matrix, its cache and its consumers."""
+
+    def setUp(self):
+        root = temp_dir(self)
+        self.cache_dir = str(root / "cache")
+        self.aapl = make_prices(6, [10.0, 11.0, 12.0, 9.0, 10.0, 15.0])
+        # MSFT starts two business days later and skips its third day.
+        self.msft = make_prices(5, [20.0, 22.0, 21.0, 24.0, 30.0], ticker="MSFT").iloc[2:]
+        self.msft = self.msft.drop(index=4).reset_index(drop=True)
+        self.data_dir = write_store(root / "data", self.aapl, self.msft)
+
+    def test_build_aligns_dates(self):
+        """Tickers should share one date axis, with NaN and mask for missing rows."""
+        matrix = build_price_matrix(pd.concat([self.msft, self.aapl], ignore_index=True))
+        self.assertEqual(list(matrix.tickers), ["AAPL", "MSFT"])
+        self.assertEqual(matrix.field("close").shape, (6, 2))
+        self.assertEqual(list(matrix.mask[:, 1]), [False, False, True, True, False, False])
+        self.assertTrue(np.isnan(matrix.field("volume")[0, 1]))
+        np.testing.assert_allclose(
+            matrix.field("returns")[:, 1], [np.nan, np.nan, np.nan, 24 / 21 - 1, np.nan, np.nan]
+        )
+        pd.testing.assert_series_equal(
+            matrix.series("AAPL"), self.aapl.set_index("date")["close"], check_names=False
+        )
+        window = matrix.select(["MSFT"], "2000-01-05", "2000-01-06")
+        self.assertEqual(window.field("close").tolist(), [[21.0], [24.0]])
+        with self.assertRaises(KeyError):
+            matrix.series("GOOG")
+
+    def test_cached_matrix_matches_and_rebuilds(self):
+        """A cached matrix should equal a fresh build and go stale with its sources."""
+        fresh = load_price_matrix(str(self.data_dir), cache_dir=None)
+        load_price_matrix(str(self.data_dir), cache_dir=self.cache_dir)
+        with patch("price_matrix.load_all_data") as mock_load:
+            cached = load_price_matrix(str(self.data_dir), cache_dir=self.cache_dir)
+        mock_load.assert_not_called()
+        self.assertEqual(cached.fields, fresh.fields)
+        pd.testing.assert_index_equal(cached.dates, fresh.dates)
+        for name in fresh.fields:
+            np.testing.assert_array_equal(cached.field(name), fresh.field(name))
+
+        path = self.data_dir / "AAPL.parquet"
+        make_prices(2).to_parquet(path, index=False)
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        rebuilt = load_price_matrix(str(self.data_dir), cache_dir=self.cache_dir)
+        self.assertEqual(int(rebuilt.mask[:, 0].sum()), 2)
+
+    def test_matrix_metrics_match_per_ticker(self):
+        """Matrix buy-and-hold metrics should equal compute_metrics per ticker."""
+        matrix = load_price_matrix(str(self.data_dir), cache_dir=None)
+        values = buy_and_hold_matrix(matrix.field("close"), 10000.0)
+        report = compute_matrix_metrics(values, 10000.0, matrix.tickers)
+        for prices in (self.aapl, self.msft):
+            expected = compute_metrics(buy_and_hold(prices, 10000.0, None), 10000.0)
+            for name in report.columns:
+                self.assertAlmostEqual(report.loc[prices["ticker"][0], name], expected[name])